@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark API cold start.
+
+Measures, over several fresh processes:
+- import time of src.api.main
+- time from launching `python -m src.api` to the first successful response
+
+    python benchmarks/bench_api_startup.py --runs 5
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import src.api.main; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def measure_import():
+    """Return the import time of src.api.main in a fresh interpreter."""
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT,
+                            check=True, capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def free_port():
+    """Return a TCP port that is currently free on localhost."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_request(timeout=30.0):
+    """Return seconds from process launch until GET / succeeds."""
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.api", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError("server did not answer in time")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    imports = [measure_import() for _ in range(args.runs)]
+    first_requests = [measure_first_request() for _ in range(args.runs)]
+    print(f"{'metric':>26} {'median':>9} {'min':>9} {'max':>9}")
+    for label, samples in (("import src.api.main", imports),
+                           ("launch to first response", first_requests)):
+        print(f"{label:>26} {statistics.median(samples) * 1000:>7.0f}ms "
+              f"{min(samples) * 1000:>7.0f}ms {max(samples) * 1000:>7.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark bulk color generation against the generate_random_colors path.
+
+Compares colors per second of generate_random_colors() (random.choices over
+a list of names) with the vectorized uint8 RGB and packed hex generators at
+1e6 to 1e8 colors. The list-based path is skipped above --legacy-max.
+
+    python benchmarks/bench_colors.py
+    python benchmarks/bench_colors.py --max-exponent 7 --palette tableau10
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from random_colors import generate_color_array, generate_hex_buffer, generate_random_colors  # noqa: E402
+
+
+def time_call(func):
+    """Return the wall-clock time of one call of func."""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--min-exponent', type=int, default=6)
+    parser.add_argument('--max-exponent', type=int, default=8)
+    parser.add_argument('--legacy-max', type=float, default=1e7,
+                        help="largest count to run generate_random_colors at (default: 1e7)")
+    parser.add_argument('--palette', default='red_blue')
+    args = parser.parse_args(argv)
+
+    # Keep the legacy path's INFO lines out of the measurement output
+    logging.disable(logging.CRITICAL)
+
+    print(f"{'colors':>12} {'list path':>16} {'uint8 RGB':>16} {'hex buffer':>16} {'speedup':>8}")
+    for exponent in range(args.min_exponent, args.max_exponent + 1):
+        count = 10 ** exponent
+        rgb_time = time_call(lambda: generate_color_array(count, palette=args.palette, seed=0))
+        hex_time = time_call(lambda: generate_hex_buffer(count, palette=args.palette, seed=0))
+        if count <= args.legacy_max:
+            legacy_time = time_call(lambda: generate_random_colors(count))
+            legacy_col = f"{count / legacy_time:>14,.0f}/s"
+            speedup = f"{legacy_time / rgb_time:>7.1f}x"
+        else:
+            legacy_col = f"{'skipped':>16}"
+            speedup = f"{'-':>8}"
+        print(f"{count:>12,} {legacy_col} {count / rgb_time:>14,.0f}/s "
+              f"{count / hex_time:>14,.0f}/s {speedup}")
+
+
+if __name__ == "__main__":
+    main()
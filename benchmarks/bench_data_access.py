@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark loading many seasons of results from the Parquet cache.
+
+Fills a temporary cache with a synthetic history (75 seasons of 20 rounds
+with 20 cars by default) and reports the median time of load_results() over
+every season, which is what a notebook pays on each run once the cache is
+warm. Needs pyarrow.
+
+    python benchmarks/bench_data_access.py
+    python benchmarks/bench_data_access.py --seasons 100 --repeat 10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data_access import (  # noqa: E402
+    RESULT_COLUMNS, RESULTS, _cache_path, _write_parquet, load_results, typed_frame
+)
+
+FIRST_SEASON = 1950
+
+
+def fill_cache(cache_dir, seasons, rounds, cars):
+    """Write one synthetic Parquet file per season and return the number of rows."""
+    count = 0
+    for season in range(FIRST_SEASON, FIRST_SEASON + seasons):
+        records = [{
+            "season": season, "round": round_num, "raceName": f"Grand Prix {round_num}",
+            "circuitId": f"circuit{round_num}", "date": f"{season}-05-{round_num:02d}",
+            "driverId": f"driver{(season + round_num * 7 + position) % 60}",
+            "constructorId": f"team{position % 10}", "number": position, "grid": position,
+            "position": position, "positionText": str(position), "points": max(0, 11 - position),
+            "laps": 57, "status": "Engine" if (season + position) % 11 == 0 else "Finished",
+            "time": 5400.0 + position if position < 5 else None,
+            "fastestLapRank": position, "fastestLapTime": 92.0 + position / 10,
+        } for round_num in range(1, rounds + 1) for position in range(1, cars + 1)]
+        _write_parquet(typed_frame(records, RESULT_COLUMNS), _cache_path(cache_dir, RESULTS, season))
+        count += len(records)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seasons', type=int, default=75)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--cars', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    # Past seasons only, so nothing counts as the current, expiring season
+    years = range(FIRST_SEASON, FIRST_SEASON + args.seasons)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        count = fill_cache(cache_dir, args.seasons, args.rounds, args.cars)
+        print(f"{count:,} results cached in {args.seasons} seasons")
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            frame = load_results(years, cache_dir=cache_dir)
+            times.append(time.perf_counter() - start)
+        memory = frame.memory_usage(deep=True).sum() / 2 ** 20
+        print(f"load_results: {statistics.median(times) * 1000:.0f}ms median, "
+              f"{len(frame):,} rows, {memory:.1f} MiB in memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark micro-batched against one-at-a-time model inference.
+
+Trains a lap-time model on synthetic laps and fires concurrent
+single-lap prediction requests through MicroBatcher, once with batching
+disabled (max_batch_size=1) and once per batch size, reporting throughput,
+mean batch size and request latency percentiles.
+
+    python benchmarks/bench_inference.py
+    python benchmarks/bench_inference.py --requests 20000 --concurrency 512
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from functools import partial
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models.inference import MicroBatcher  # noqa: E402
+from src.models.lap_times import (  # noqa: E402
+    COMPOUNDS, predict_lap_time_batch, train_lap_time_model
+)
+
+CIRCUITS = [f"circuit{i}" for i in range(24)]
+
+
+def synthetic_laps(n, rng):
+    """Generate n random laps and their lap times."""
+    laps = [{"circuit": CIRCUITS[rng.integers(len(CIRCUITS))],
+             "lap": int(rng.integers(1, 60)), "total_laps": 60,
+             "tyre_age": int(rng.integers(0, 35)),
+             "compound": COMPOUNDS[rng.integers(3)]} for _ in range(n)]
+    times = [80 + CIRCUITS.index(lap["circuit"]) + 2 * (1 - lap["lap"] / 60)
+             + 0.05 * lap["tyre_age"] + rng.normal(0, 0.2) for lap in laps]
+    return laps, times
+
+
+async def run(batcher, laps, concurrency):
+    """Send every lap as its own request with a fixed number in flight."""
+    pending = iter(laps)
+
+    async def client():
+        for lap in pending:
+            await batcher.predict([lap])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await batcher.stop()
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 16, 64, 256])
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    model = train_lap_time_model(*synthetic_laps(5000, rng))
+    laps, _ = synthetic_laps(args.requests, rng)
+
+    print(f"{args.requests:,} requests, {args.concurrency} in flight")
+    print(f"{'max batch':>10} {'req/s':>10} {'mean batch':>11} {'p50':>9} {'p99':>9}")
+    for size in args.batch_sizes:
+        batcher = MicroBatcher(partial(predict_lap_time_batch, model),
+                               max_batch_size=size, max_wait=args.max_wait_ms / 1000)
+        elapsed = asyncio.run(run(batcher, laps, args.concurrency))
+        metrics = batcher.metrics()
+        print(f"{size:>10} {args.requests / elapsed:>10,.0f} {metrics['mean_batch_size']:>11} "
+              f"{metrics['latency_ms']['p50']:>7.2f}ms {metrics['latency_ms']['p99']:>7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
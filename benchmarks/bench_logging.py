@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-call logging overhead of the random generator scripts.
+
+Compares the default path (synchronous handlers, list reloaded and logged on
+every call) with the high-throughput path (QueueListener in a background
+thread and one BatchSummary line per batch). Log output goes to a temporary
+directory and stdout is discarded.
+
+    python benchmarks/bench_logging.py --calls 20000 --count 100
+"""
+
+import argparse
+import contextlib
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import random_colors  # noqa: E402
+import random_words  # noqa: E402
+from log_utils import BatchSummary  # noqa: E402
+
+
+def reset_logging():
+    """Remove and close all root handlers."""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+
+def run(module, generate, label, calls, count, high_throughput):
+    """Return the mean seconds per generator call for one logging mode."""
+    reset_logging()
+    listener = module.setup_logging(high_throughput=high_throughput)
+    summary = BatchSummary(label) if high_throughput else None
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        generate(count, summary=summary)
+    if summary is not None:
+        summary.flush()
+    elapsed = time.perf_counter() - start
+
+    if listener is not None:
+        listener.stop()
+    reset_logging()
+    return elapsed / calls
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=20000)
+    parser.add_argument('--count', type=int, default=100,
+                        help="items generated per call (default: 100)")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir, open(os.devnull, 'w') as devnull:
+        cwd = os.getcwd()
+        os.chdir(tmpdir)
+        try:
+            with contextlib.redirect_stdout(devnull):
+                for module, generate, label in (
+                        (random_words, random_words.generate_random_words, "words"),
+                        (random_colors, random_colors.generate_random_colors, "colors")):
+                    default = run(module, generate, label, args.calls, args.count, False)
+                    fast = run(module, generate, label, args.calls, args.count, True)
+                    results.append((label, default, fast))
+        finally:
+            os.chdir(cwd)
+
+    print(f"{args.calls:,} calls of {args.count} items each")
+    print(f"{'generator':>10} {'default':>14} {'high-throughput':>16} {'speedup':>8}")
+    for label, default, fast in results:
+        print(f"{label:>10} {default * 1e6:>11.1f} us {fast * 1e6:>13.1f} us "
+              f"{default / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Benchmark parallel word and color generation across worker counts.
+
+Writes the generated values to os.devnull so the numbers reflect
+generation and encoding throughput, and reports scaling against one worker.
+
+    python benchmarks/bench_parallel.py --count 50000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from parallel_random import default_workers  # noqa: E402
+from random_colors import write_random_colors_parallel  # noqa: E402
+from random_words import write_random_words_parallel  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=20_000_000)
+    parser.add_argument('--max-workers', type=int, default=default_workers())
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    worker_counts = sorted({1, 2, 4, 8, 16, 32, args.max_workers} & set(range(1, args.max_workers + 1)))
+    for name, write in (("words", write_random_words_parallel),
+                        ("colors", write_random_colors_parallel)):
+        baseline = None
+        print(f"{name}: {args.count:,} values")
+        print(f"{'workers':>8} {'seconds':>9} {'values/s':>16} {'scaling':>8}")
+        for workers in worker_counts:
+            start = time.perf_counter()
+            write(os.devnull, args.count, seed=args.seed, workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>9.2f} {args.count / elapsed:>14,.0f}/s "
+                  f"{baseline / elapsed:>7.2f}x")
+        print()
+
+
+if __name__ == "__main__":
+    main()
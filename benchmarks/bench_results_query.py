@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark filter queries against the local results store.
+
+Fills a temporary store with a synthetic full history (75 seasons of 20
+rounds with 20 classified cars by default) and reports the median latency
+of typical /query/results filters, including walking every page of a
+large result set with cursors.
+
+    python benchmarks/bench_results_query.py
+    python benchmarks/bench_results_query.py --seasons 100 --repeat 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.results_store import ResultsStore  # noqa: E402
+
+QUERIES = {
+    "constructor podiums at circuit since 2010": dict(
+        constructor="team3", circuit="circuit5", season_from=2010, position_to=3),
+    "all results for one driver": dict(driver="driver7", limit=1000),
+    "winners in a season range": dict(season_from=1980, season_to=1989, position_to=1),
+    "retirements at one circuit": dict(circuit="circuit12", status="Engine"),
+}
+
+
+def fill_store(store, seasons, rounds, cars):
+    """Insert a synthetic history and return the number of rows."""
+    rows = []
+    for season in range(1950, 1950 + seasons):
+        for round_num in range(1, rounds + 1):
+            for position in range(1, cars + 1):
+                driver = f"driver{(season + round_num * 7 + position) % 60}"
+                status = "Engine" if (season + position) % 11 == 0 else "Finished"
+                rows.append((season, round_num, position, "GP", f"circuit{round_num}",
+                             f"{season}-01-01", driver, f"team{position % 10}", position,
+                             str(position), 0.0, status, 50))
+    store.insert_rows(rows)
+    return len(rows)
+
+
+def median_ms(func, repeat):
+    """Return the median wall-clock time of func in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def walk_pages(store, page_size):
+    """Page through every stored result with cursors."""
+    cursor = None
+    while True:
+        page = store.query(limit=page_size, cursor=cursor)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seasons', type=int, default=75)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--cars', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultsStore(os.path.join(tmp, "results.sqlite3"))
+        count = fill_store(store, args.seasons, args.rounds, args.cars)
+        print(f"{count:,} results stored")
+        print(f"{'query':<45} {'rows':>6} {'median':>10}")
+        for name, filters in QUERIES.items():
+            rows = len(store.query(**filters)["results"])
+            elapsed = median_ms(lambda: store.query(**filters), args.repeat)
+            print(f"{name:<45} {rows:>6} {elapsed:>8.2f}ms")
+        elapsed = median_ms(lambda: walk_pages(store, 1000), max(1, args.repeat // 4))
+        print(f"{'walk every page (1000 per page)':<45} {count:>6} {elapsed:>8.2f}ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark WordSampler against the random.choices path.
+
+Compares draws per second of random.choices over get_word_list() with the
+alias-table WordSampler at 1e3 to 1e8 draws. random.choices builds a Python
+list of every draw, so it is skipped above --choices-max to keep memory sane.
+
+    python benchmarks/bench_word_sampler.py
+    python benchmarks/bench_word_sampler.py --max-exponent 6
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.random_words import WordSampler, get_word_list  # noqa: E402
+
+
+def time_call(func, repeat):
+    """Return the best wall-clock time of func over repeat runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--min-exponent', type=int, default=3)
+    parser.add_argument('--max-exponent', type=int, default=8)
+    parser.add_argument('--choices-max', type=float, default=1e7,
+                        help="largest draw count to run random.choices at (default: 1e7)")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    words = get_word_list()
+    sampler = WordSampler(words, seed=0)
+    weighted = WordSampler(words, weights=range(1, len(words) + 1), seed=0)
+
+    print(f"{'draws':>12} {'random.choices':>16} {'WordSampler':>16} "
+          f"{'weighted':>16} {'speedup':>8}")
+    for exponent in range(args.min_exponent, args.max_exponent + 1):
+        k = 10 ** exponent
+        repeat = args.repeat if k <= 10 ** 6 else 1
+
+        uniform_time = time_call(lambda: sampler.sample(k), repeat)
+        weighted_time = time_call(lambda: weighted.sample(k), repeat)
+        if k <= args.choices_max:
+            choices_time = time_call(lambda: random.choices(words, k=k), repeat)
+            choices_col = f"{k / choices_time:>12,.0f}/s"
+            speedup = f"{choices_time / uniform_time:>7.1f}x"
+        else:
+            choices_col = f"{'skipped':>14}"
+            speedup = f"{'-':>8}"
+
+        print(f"{k:>12,} {choices_col:>16} {k / uniform_time:>14,.0f}/s "
+              f"{k / weighted_time:>14,.0f}/s {speedup}")
+
+
+if __name__ == "__main__":
+    main()
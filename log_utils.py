@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Logging helpers for high-throughput use of the random generator scripts.
+
+setup_queue_logging() moves handler I/O onto a background thread: the
+calling thread only enqueues records, and a QueueListener formats them and
+writes to stdout and the log file. BatchSummary replaces per-call log lines
+with one summary line every few thousand calls.
+"""
+
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Number of recorded calls between summary log lines
+DEFAULT_SUMMARY_EVERY = 10000
+
+
+class _QueueListener(QueueListener):
+    """QueueListener that tracks whether it is running, so stop() is idempotent."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.running = False
+
+    def start(self):
+        super().start()
+        self.running = True
+
+    def stop(self):
+        if self.running:
+            self.running = False
+            super().stop()
+
+
+def setup_queue_logging(log_file, level=logging.INFO):
+    """Configure the root logger to hand records to a background thread.
+
+    Args:
+        log_file: Path of the log file to append to
+        level: Root logger level (default: INFO)
+
+    The root logger's existing handlers are removed and closed.
+
+    Returns:
+        The started QueueListener; it is also stopped automatically at exit
+    """
+    formatter = logging.Formatter(LOG_FORMAT)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    file_handler = logging.FileHandler(log_file, mode='a')
+    for handler in (stream_handler, file_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+
+    listener = _QueueListener(log_queue, stream_handler, file_handler,
+                             respect_handler_level=True)
+    listener.start()
+    atexit.register(_stop_listener, listener, (stream_handler, file_handler))
+    return listener
+
+
+def _stop_listener(listener, handlers):
+    """Flush queued records and close the listener's handlers."""
+    listener.stop()
+    for handler in handlers:
+        handler.close()
+
+
+class BatchSummary:
+    """Aggregate generator calls and log one summary line per batch.
+
+    Pass an instance as the summary argument of generate_random_words() or
+    generate_random_colors() to skip their per-call logging.
+    """
+
+    def __init__(self, label, every=DEFAULT_SUMMARY_EVERY, logger=None):
+        """
+        Args:
+            label: Name of the generated items, e.g. "words"
+            every: Number of calls between summary lines
+            logger: Logger to write summaries to (default: root logger)
+        """
+        self.label = label
+        self.every = every
+        self.logger = logger or logging.getLogger()
+        self.calls = 0
+        self.items = 0
+        self._pending_calls = 0
+        self._pending_items = 0
+
+    def record(self, count):
+        """Record one generator call that produced count items."""
+        self._pending_calls += 1
+        self._pending_items += count
+        if self._pending_calls >= self.every:
+            self.flush()
+
+    def flush(self):
+        """Log a summary of the calls recorded since the last flush."""
+        if not self._pending_calls:
+            return
+        self.calls += self._pending_calls
+        self.items += self._pending_items
+        self.logger.info("Generated %d %s in %d calls (%d %s in %d calls total)",
+                         self._pending_items, self.label, self._pending_calls,
+                         self.items, self.label, self.calls)
+        self._pending_calls = 0
+        self._pending_items = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Sharded multi-process random generation with reproducible streams.
+
+A requested count is split into fixed-size shards. Shard i draws from the
+i-th child of np.random.SeedSequence(seed).spawn(...), so every shard has a
+statistically independent stream and the merged output depends only on
+(seed, count, shard_size), never on how many workers produced it.
+
+Shards are dispatched to a process pool with a bounded window of in-flight
+work and yielded back in shard order, so memory stays flat even when
+generating billions of values.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Number of values generated by each worker task
+DEFAULT_SHARD_SIZE = 1 << 20
+
+# In-flight shards allowed per worker before the producer waits
+SHARDS_IN_FLIGHT_PER_WORKER = 2
+
+
+def default_workers():
+    """Return the number of worker processes to use by default."""
+    return os.cpu_count() or 1
+
+
+def shard_sizes(count, shard_size=DEFAULT_SHARD_SIZE):
+    """Split count into consecutive shard sizes.
+
+    Args:
+        count: Total number of values to generate
+        shard_size: Maximum number of values per shard
+
+    Returns:
+        List of shard sizes summing to count
+    """
+    if count < 0:
+        raise ValueError("count must be non-negative")
+    if shard_size <= 0:
+        raise ValueError("shard_size must be positive")
+    full, remainder = divmod(count, shard_size)
+    return [shard_size] * full + ([remainder] if remainder else [])
+
+
+def iter_shards(shard_fn, count, seed=None, workers=None, shard_size=DEFAULT_SHARD_SIZE):
+    """Run shard_fn over every shard and yield the results in shard order.
+
+    Args:
+        shard_fn: Picklable callable taking (size, seed_sequence)
+        count: Total number of values to generate
+        seed: Root seed; None draws fresh OS entropy
+        workers: Number of worker processes (default: os.cpu_count()).
+            With one worker the shards run in the calling process.
+        shard_size: Maximum number of values per shard
+
+    Yields:
+        shard_fn results, in shard order
+    """
+    sizes = shard_sizes(count, shard_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    workers = default_workers() if workers is None else workers
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    if workers == 1 or len(sizes) <= 1:
+        for size, shard_seed in zip(sizes, seeds):
+            yield shard_fn(size, shard_seed)
+        return
+
+    window = workers * SHARDS_IN_FLIGHT_PER_WORKER
+    with ProcessPoolExecutor(max_workers=min(workers, len(sizes))) as pool:
+        pending = deque()
+        tasks = zip(sizes, seeds)
+
+        def submit_next():
+            task = next(tasks, None)
+            if task is not None:
+                pending.append(pool.submit(shard_fn, *task))
+
+        for _ in range(window):
+            submit_next()
+        while pending:
+            result = pending.popleft().result()
+            submit_next()
+            yield result
@@ -1,15 +1,76 @@
 #!/usr/bin/env python3
 """
 Script to output random red or blue colors.
+
+Very large counts can be sharded across a process pool; the output depends
+only on the seed and count, not on the number of workers:
+
+    python random_colors.py --count 1000000000 --out colors.txt --seed 42 --workers 8
+
+Bulk RGB output for synthetic chart series is generated in vectorized chunks
+from a named palette, a perceptually distinct N-color palette, or the full
+RGB space:
+
+    python random_colors.py --count 100000000 --out colors.bin --format rgb --palette tableau10
+    python random_colors.py --count 1000000 --out series.csv --format csv --distinct 12
 """
 
+import argparse
 import random
 import logging
+import re
 import sys
+from functools import partial
+
+import numpy as np
+
+from log_utils import setup_queue_logging
+from parallel_random import DEFAULT_SHARD_SIZE, iter_shards
+
+_color_array = None
+_color_tuple = None
+
+HEX_COLOR = re.compile(r'#[0-9a-fA-F]{6}')
 
+# Named palettes of color name to hex value
+PALETTES = {
+    'red_blue': {'red': '#ff0000', 'blue': '#0000ff'},
+    'tableau10': {
+        'blue': '#4e79a7', 'orange': '#f28e2b', 'red': '#e15759', 'teal': '#76b7b2',
+        'green': '#59a14f', 'yellow': '#edc948', 'purple': '#b07aa1', 'pink': '#ff9da7',
+        'brown': '#9c755f', 'gray': '#bab0ac',
+    },
+    'grayscale': {'black': '#000000', 'dark_gray': '#555555', 'light_gray': '#aaaaaa',
+                  'white': '#ffffff'},
+}
+DEFAULT_PALETTE = 'red_blue'
 
-def setup_logging():
-    """Configure logging for the script."""
+# Output formats understood by write_colors()
+COLOR_FORMATS = ('rgb', 'hex', 'csv')
+
+# Number of colors generated and encoded per write batch
+COLOR_CHUNK_SIZE = 1 << 20
+
+# Lowercase two-digit hex and zero-padded three-digit decimal for every byte
+_HEX_DIGITS = np.frombuffer(''.join(f'{i:02x}' for i in range(256)).encode('ascii'),
+                            dtype=np.uint8).reshape(256, 2)
+_HEX_PAIRS = _HEX_DIGITS.copy().view('<u2').ravel().astype('<u8')
+_DEC_DIGITS = np.frombuffer(''.join(f'{i:03d}' for i in range(256)).encode('ascii'),
+                            dtype=np.uint8).reshape(256, 3)
+
+
+def setup_logging(high_throughput=False):
+    """Configure logging for the script.
+
+    Args:
+        high_throughput: Hand records to a background QueueListener instead
+            of writing to stdout and the log file on the calling thread
+
+    Returns:
+        The QueueListener when high_throughput is set, otherwise None
+    """
+    if high_throughput:
+        return setup_queue_logging('random_colors.log')
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(levelname)s - %(message)s',
@@ -28,29 +89,422 @@ def get_color_list():
     return colors
 
 
-def generate_random_colors(count=1):
+def _cached_colors():
+    """Return the color list as a tuple, loading it only once per process."""
+    global _color_tuple
+    if _color_tuple is None:
+        _color_tuple = tuple(get_color_list())
+    return _color_tuple
+
+
+def generate_random_colors(count=1, summary=None):
     """Generate a specified number of random colors.
 
     Args:
         count: Number of random colors to generate (default: 1)
+        summary: Optional log_utils.BatchSummary. When given, the color list
+            is loaded once and per-call logging is replaced by the summary.
 
     Returns:
         List of randomly selected colors (red or blue)
     """
+    if summary is not None:
+        selected_colors = random.choices(_cached_colors(), k=count)
+        summary.record(count)
+        return selected_colors
+
     logging.info(f"Generating {count} random color(s)")
     colors = get_color_list()
     selected_colors = random.choices(colors, k=count)
     logging.info(f"Successfully generated {len(selected_colors)} random color(s)")
-    logging.debug(f"Generated colors: {', '.join(selected_colors)}")
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug("Generated colors: %s", ', '.join(selected_colors))
     return selected_colors
 
 
-def main():
+def get_color_array():
+    """Return the color list as a cached NumPy array of interned strings."""
+    global _color_array
+    if _color_array is None:
+        _color_array = np.array([sys.intern(color) for color in get_color_list()], dtype=object)
+    return _color_array
+
+
+def generate_random_color_array(count, seed=None):
+    """Generate random colors in a single vectorized batch.
+
+    Args:
+        count: Number of random colors to generate
+        seed: Seed for the batch (default: None, unseeded)
+
+    Returns:
+        NumPy object array of randomly selected colors
+    """
+    if count < 0:
+        raise ValueError("count must be non-negative")
+    colors = get_color_array()
+    rng = np.random.default_rng(seed)
+    return colors.take(rng.integers(0, len(colors), size=count))
+
+
+def _color_shard(size, seed, encode=False):
+    """Generate one shard of colors inside a worker process.
+
+    Args:
+        size: Number of colors in the shard
+        seed: np.random.SeedSequence for the shard
+        encode: Return newline-terminated UTF-8 bytes instead of an array
+
+    Returns:
+        NumPy object array of colors, or encoded bytes when encode is True
+    """
+    colors = generate_random_color_array(size, seed=seed)
+    if encode:
+        return ('\n'.join(colors) + '\n').encode('utf-8') if size else b''
+    return colors
+
+
+def generate_random_colors_parallel(count, seed=None, workers=None, shard_size=DEFAULT_SHARD_SIZE):
+    """Generate random colors across a process pool.
+
+    Each shard draws from its own seed-derived stream, so a given seed and
+    count always produce the same colors whatever the number of workers.
+
+    Args:
+        count: Number of random colors to generate
+        seed: Root seed (default: None, unseeded)
+        workers: Number of worker processes (default: one per CPU)
+        shard_size: Number of colors generated per worker task
+
+    Returns:
+        NumPy object array of randomly selected colors
+    """
+    logging.info(f"Generating {count} random color(s) with {workers or 'default'} workers")
+    shards = list(iter_shards(_color_shard, count, seed=seed, workers=workers,
+                              shard_size=shard_size))
+    if not shards:
+        return np.empty(0, dtype=object)
+    return np.concatenate(shards)
+
+
+def write_random_colors_parallel(path, count, seed=None, workers=None,
+                                 shard_size=DEFAULT_SHARD_SIZE):
+    """Stream random colors to a file, one per line, generated in parallel.
+
+    Args:
+        path: Output file path
+        count: Total number of random colors to write
+        seed: Root seed (default: None, unseeded)
+        workers: Number of worker processes (default: one per CPU)
+        shard_size: Number of colors generated per worker task
+
+    Returns:
+        Number of colors written
+    """
+    logging.info(f"Writing {count} random color(s) to {path} with {workers or 'default'} workers")
+    shard_fn = partial(_color_shard, encode=True)
+    written = 0
+    with open(path, 'wb') as fh:
+        for data in iter_shards(shard_fn, count, seed=seed, workers=workers, shard_size=shard_size):
+            fh.write(data)
+            # Every item in an encoded shard is newline-terminated
+            written += data.count(b'\n')
+    logging.info(f"Successfully wrote {written} random color(s) to {path}")
+    return written
+
+
+def get_palette(palette=DEFAULT_PALETTE):
+    """Resolve a palette to a uint8 RGB table.
+
+    Args:
+        palette: Name of an entry in PALETTES, a mapping of name to #RRGGBB
+            value, a sequence of #RRGGBB values, an (N, 3) array of 0-255 RGB values,
+            or None for the full 24-bit RGB space
+
+    Returns:
+        (N, 3) uint8 NumPy array, or None for the full RGB space
+    """
+    if palette is None:
+        return None
+    if isinstance(palette, str):
+        if palette not in PALETTES:
+            raise ValueError(f"unknown palette {palette!r}; choose from {sorted(PALETTES)}")
+        palette = PALETTES[palette]
+    if hasattr(palette, 'values'):
+        palette = list(palette.values())
+
+    if len(palette) and isinstance(palette[0], str):
+        for value in palette:
+            if not isinstance(value, str) or not HEX_COLOR.fullmatch(value):
+                raise ValueError(f"palette color {value!r} is not a #RRGGBB hex value")
+        table = np.array([[int(value[i:i + 2], 16) for i in (1, 3, 5)]
+                          for value in palette], dtype=np.uint8)
+    else:
+        values = np.asarray(palette)
+        if values.size and (values.dtype.kind not in 'iu'
+                            or values.min() < 0 or values.max() > 255):
+            raise ValueError("palette RGB values must be integers from 0 to 255")
+        table = values.astype(np.uint8)
+    if table.ndim != 2 or table.shape[1] != 3 or len(table) == 0:
+        raise ValueError("palette must contain at least one RGB color")
+    return table
+
+
+def _sample_rgb(rng, count, table):
+    """Draw count RGB rows from table, or from the full RGB space if None."""
+    if table is None:
+        return rng.integers(0, 256, size=(count, 3), dtype=np.uint8)
+    return table[rng.integers(0, len(table), size=count)]
+
+
+def generate_color_array(count, palette=DEFAULT_PALETTE, seed=None):
+    """Generate random colors as a uint8 RGB array in one vectorized call.
+
+    Args:
+        count: Number of colors to generate
+        palette: Palette accepted by get_palette() (default: red_blue);
+            None samples the full RGB space
+        seed: Seed or np.random.Generator (default: None, unseeded)
+
+    Returns:
+        (count, 3) uint8 NumPy array of RGB values
+    """
+    if count < 0:
+        raise ValueError("count must be non-negative")
+    return _sample_rgb(np.random.default_rng(seed), count, get_palette(palette))
+
+
+def encode_hex(rgb, separator=b'\n'):
+    """Pack RGB rows into a '#rrggbb' text buffer without a Python loop.
+
+    Args:
+        rgb: (N, 3) uint8 array of RGB values
+        separator: Single byte written after every color (default: newline)
+
+    Returns:
+        bytes of N fixed-width '#rrggbb' entries
+    """
+    rgb = np.asarray(rgb, dtype=np.uint8)
+    # Each entry is exactly 8 bytes, so build it as one little-endian uint64
+    rows = np.full(len(rgb), ord('#') | (separator[0] << 56), dtype='<u8')
+    for channel in range(3):
+        rows |= _HEX_PAIRS[rgb[:, channel]] << np.uint64(8 + 16 * channel)
+    return rows.tobytes()
+
+
+def encode_csv(rgb):
+    """Format RGB rows as 'r,g,b' CSV lines without a Python loop.
+
+    Every value is laid out as three zero-padded digits, then the leading
+    zeros are masked out, so the result is plain variable-width CSV.
+
+    Args:
+        rgb: (N, 3) uint8 array of RGB values
+
+    Returns:
+        bytes of N newline-terminated CSV rows
+    """
+    rgb = np.asarray(rgb, dtype=np.uint8)
+    out = np.empty((len(rgb), 12), dtype=np.uint8)
+    digits = _DEC_DIGITS[rgb]
+    keep = np.ones((len(rgb), 12), dtype=bool)
+    for channel in range(3):
+        start = channel * 4
+        out[:, start:start + 3] = digits[:, channel]
+        out[:, start + 3] = ord(',') if channel < 2 else ord('\n')
+        values = rgb[:, channel]
+        keep[:, start] = values >= 100
+        keep[:, start + 1] = values >= 10
+    return out[keep].tobytes()
+
+
+def generate_hex_buffer(count, palette=DEFAULT_PALETTE, seed=None, separator=b'\n'):
+    """Generate random colors as a packed '#rrggbb' buffer.
+
+    Args:
+        count: Number of colors to generate
+        palette: Palette accepted by get_palette() (default: red_blue)
+        seed: Seed or np.random.Generator (default: None, unseeded)
+        separator: Single byte written after every color (default: newline)
+
+    Returns:
+        bytes of count fixed-width 8-byte entries
+    """
+    if count < 0:
+        raise ValueError("count must be non-negative")
+    table = get_palette(palette)
+    rng = np.random.default_rng(seed)
+    if table is None:
+        return encode_hex(_sample_rgb(rng, count, None), separator)
+    # Encode each palette entry once and draw whole 8-byte entries
+    entries = np.frombuffer(encode_hex(table, separator), dtype='<u8')
+    return entries[rng.integers(0, len(table), size=count)].tobytes()
+
+
+def rgb_to_lab(rgb):
+    """Convert sRGB values to CIELAB (D65) for perceptual distance.
+
+    Args:
+        rgb: (..., 3) array of 0-255 sRGB values
+
+    Returns:
+        (..., 3) float64 array of L*, a*, b* values
+    """
+    srgb = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(srgb > 0.04045, ((srgb + 0.055) / 1.055) ** 2.4, srgb / 12.92)
+    xyz = linear @ np.array([[0.4124564, 0.2126729, 0.0193339],
+                             [0.3575761, 0.7151522, 0.1191920],
+                             [0.1804375, 0.0721750, 0.9503041]])
+    xyz /= np.array([0.95047, 1.0, 1.08883])
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    return np.stack([116 * f[..., 1] - 16,
+                     500 * (f[..., 0] - f[..., 1]),
+                     200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def distinct_palette(n, seed=None, min_distance=None, candidates=4096):
+    """Build an N-color palette whose colors are far apart perceptually.
+
+    Greedy farthest-point selection in CIELAB over random candidate colors:
+    each pick maximises its distance (CIE76 delta E) to everything already
+    chosen, with all distances updated in one vectorized step per pick.
+
+    Args:
+        n: Number of colors in the palette
+        seed: Seed or np.random.Generator (default: None, unseeded)
+        min_distance: Optional minimum pairwise delta E; ValueError is
+            raised if the palette cannot meet it
+        candidates: Number of random candidate colors to choose from
+
+    Returns:
+        (n, 3) uint8 NumPy array of RGB values
+    """
+    if n <= 0:
+        raise ValueError("n must be positive")
+    if candidates < n:
+        raise ValueError("candidates must be at least n")
+
+    rng = np.random.default_rng(seed)
+    pool = rng.integers(0, 256, size=(candidates, 3), dtype=np.uint8)
+    lab = rgb_to_lab(pool)
+
+    chosen = [int(rng.integers(0, candidates))]
+    nearest = np.linalg.norm(lab - lab[chosen[0]], axis=1)
+    achieved = np.inf
+    for _ in range(n - 1):
+        pick = int(np.argmax(nearest))
+        achieved = min(achieved, float(nearest[pick]))
+        chosen.append(pick)
+        np.minimum(nearest, np.linalg.norm(lab - lab[pick], axis=1), out=nearest)
+
+    if min_distance is not None and achieved < min_distance:
+        raise ValueError(f"could only separate {n} colors by delta E {achieved:.1f}, "
+                         f"below the requested {min_distance}")
+    return pool[chosen]
+
+
+def write_colors(path, count, fmt='rgb', palette=DEFAULT_PALETTE, seed=None,
+                 chunk_size=COLOR_CHUNK_SIZE):
+    """Generate random colors and write them to disk in vectorized chunks.
+
+    Args:
+        path: Output file path
+        count: Total number of colors to write
+        fmt: 'rgb' for packed 3-byte binary triples, 'hex' for '#rrggbb'
+            lines, or 'csv' for 'r,g,b' rows under a header
+        palette: Palette accepted by get_palette() (default: red_blue);
+            None samples the full RGB space
+        seed: Seed for the stream (default: None, unseeded)
+        chunk_size: Number of colors generated and written per batch
+
+    Returns:
+        Number of colors written
+    """
+    if fmt not in COLOR_FORMATS:
+        raise ValueError(f"unknown format {fmt!r}; choose from {COLOR_FORMATS}")
+    if count < 0:
+        raise ValueError("count must be non-negative")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+    logging.info(f"Writing {count} {fmt} color(s) to {path}")
+    table = get_palette(palette)
+    rng = np.random.default_rng(seed)
+    with open(path, 'wb') as fh:
+        if fmt == 'csv':
+            fh.write(b'r,g,b\n')
+        remaining = count
+        while remaining > 0:
+            size = min(chunk_size, remaining)
+            rgb = _sample_rgb(rng, size, table)
+            if fmt == 'rgb':
+                fh.write(rgb.tobytes())
+            elif fmt == 'hex':
+                fh.write(encode_hex(rgb))
+            else:
+                fh.write(encode_csv(rgb))
+            remaining -= size
+    logging.info(f"Successfully wrote {count} color(s) to {path}")
+    return count
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Output random red or blue colors.")
+    parser.add_argument('--count', type=int, default=1,
+                        help="number of colors to generate (default: 1)")
+    parser.add_argument('--out', help="write colors to this file instead of printing them")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="seed for reproducible output")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="generate in parallel across this many processes")
+    parser.add_argument('--fast-logging', action='store_true',
+                        help="write logs from a background thread")
+    parser.add_argument('--format', choices=('labels',) + COLOR_FORMATS, default='labels',
+                        help="output format for --out (default: labels, one name per line)")
+    parser.add_argument('--palette', default=DEFAULT_PALETTE,
+                        help=f"palette for rgb/hex/csv output: one of {sorted(PALETTES)} "
+                             f"or 'full' for the whole RGB space")
+    parser.add_argument('--distinct', type=int, default=None,
+                        help="use a perceptually distinct palette of this many colors")
+    args = parser.parse_args(argv)
+    if args.distinct is not None and (not args.out or args.format == 'labels'):
+        # Distinct palettes have no color names to write as labels
+        parser.error("--distinct requires --out with --format rgb, hex or csv")
+    return args
+
+
+def main(argv=None):
     """Main function to output random red or blue color."""
-    setup_logging()
+    args = parse_args(argv)
+    setup_logging(high_throughput=args.fast_logging)
     logging.info("Starting random colors script")
 
     try:
+        if args.out and args.format != 'labels':
+            if args.distinct:
+                palette = distinct_palette(args.distinct, seed=args.seed)
+            else:
+                palette = None if args.palette == 'full' else args.palette
+            write_colors(args.out, args.count, fmt=args.format, palette=palette, seed=args.seed)
+            logging.info("Script completed successfully")
+            return
+
+        if args.out:
+            write_random_colors_parallel(args.out, args.count, seed=args.seed,
+                                         workers=args.workers or 1)
+            logging.info("Script completed successfully")
+            return
+
+        if args.count != 1 or args.workers or args.seed is not None:
+            random_colors = generate_random_colors_parallel(
+                args.count, seed=args.seed, workers=args.workers or 1)
+            logging.info("Displaying random colors to user")
+            for i, color in enumerate(random_colors, 1):
+                print(f"{i:3d}. {color}")
+            logging.info("Script completed successfully")
+            return
+
         random_colors = generate_random_colors(1)
         color = random_colors[0]
 
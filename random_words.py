@@ -1,15 +1,55 @@
 #!/usr/bin/env python3
 """
 Script to output 100 random words.
+
+Large batches can be streamed straight to disk:
+
+    python random_words.py --count 10000000 --out words.txt --seed 42
+
+Any vocabulary packed with word_vocabulary.py can replace the built-in list:
+
+    python random_words.py --vocab words.vocab --count 1000000 --out words.txt
+
+Very large counts can be sharded across a process pool; the output depends
+only on the seed and count, not on the number of workers:
+
+    python random_words.py --count 1000000000 --out words.txt --seed 42 --workers 8
 """
 
+import argparse
 import random
 import logging
 import sys
+from functools import partial
+
+import numpy as np
+
+from log_utils import setup_queue_logging
+from parallel_random import DEFAULT_SHARD_SIZE, iter_shards
+from word_vocabulary import MappedVocabulary
+
+# Number of words sampled per batch when streaming
+DEFAULT_CHUNK_SIZE = 65536
+
+_word_array = None
+_word_tuple = None
 
+# Vocabularies opened by worker processes, keyed by path
+_shard_vocabularies = {}
 
-def setup_logging():
-    """Configure logging for the script."""
+
+def setup_logging(high_throughput=False):
+    """Configure logging for the script.
+
+    Args:
+        high_throughput: Hand records to a background QueueListener instead
+            of writing to stdout and the log file on the calling thread
+
+    Returns:
+        The QueueListener when high_throughput is set, otherwise None
+    """
+    if high_throughput:
+        return setup_queue_logging('random_words.log')
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(levelname)s - %(message)s',
@@ -42,33 +82,283 @@ def get_word_list():
     return words
 
 
-def generate_random_words(count=100):
+def _cached_words():
+    """Return the word list as a tuple, loading it only once per process."""
+    global _word_tuple
+    if _word_tuple is None:
+        _word_tuple = tuple(get_word_list())
+    return _word_tuple
+
+
+def generate_random_words(count=100, vocabulary=None, summary=None):
     """Generate a specified number of random words.
 
     Args:
         count: Number of random words to generate (default: 100)
+        vocabulary: Optional vocabulary to draw from, such as a
+            MappedVocabulary (default: the built-in word list)
+        summary: Optional log_utils.BatchSummary. When given, the word list
+            is loaded once and per-call logging is replaced by the summary.
 
     Returns:
         List of randomly selected words
     """
+    if summary is not None:
+        if vocabulary is None:
+            selected_words = random.choices(_cached_words(), k=count)
+        else:
+            selected_words = list(generate_random_word_array(count, vocabulary=vocabulary))
+        summary.record(count)
+        return selected_words
+
     logging.info(f"Generating {count} random words")
-    words = get_word_list()
-    selected_words = random.choices(words, k=count)
+    if vocabulary is None:
+        words = get_word_list()
+        selected_words = random.choices(words, k=count)
+    else:
+        selected_words = list(generate_random_word_array(count, vocabulary=vocabulary))
     logging.info(f"Successfully generated {len(selected_words)} random words")
-    logging.debug(f"Generated words: {', '.join(selected_words)}")
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug("Generated words: %s", ', '.join(selected_words))
     return selected_words
 
 
-def main():
+def get_word_array():
+    """Return the word list as a cached NumPy array of interned strings.
+
+    The array is built once per process so bulk generation only has to
+    sample indices into it.
+    """
+    global _word_array
+    if _word_array is None:
+        _word_array = np.array([sys.intern(word) for word in get_word_list()], dtype=object)
+    return _word_array
+
+
+def iter_random_word_chunks(count, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, vocabulary=None):
+    """Yield random words as NumPy arrays of at most chunk_size words.
+
+    Args:
+        count: Total number of random words to generate
+        seed: Seed for the stream; the same seed and chunk_size always
+            reproduce the same words (default: None, unseeded)
+        chunk_size: Maximum number of words per chunk
+        vocabulary: Optional vocabulary supporting len() and take(indices),
+            such as a MappedVocabulary (default: the built-in word list)
+
+    Yields:
+        NumPy object arrays of randomly selected words
+    """
+    if count < 0:
+        raise ValueError("count must be non-negative")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+    words = get_word_array() if vocabulary is None else vocabulary
+    rng = np.random.default_rng(seed)
+    remaining = count
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        yield words.take(rng.integers(0, len(words), size=size))
+        remaining -= size
+
+
+def iter_random_words(count, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, vocabulary=None):
+    """Stream random words one at a time with bounded memory.
+
+    Args:
+        count: Total number of random words to generate
+        seed: Seed for the stream (default: None, unseeded)
+        chunk_size: Number of words sampled per batch
+        vocabulary: Optional vocabulary to draw from (default: built-in list)
+
+    Yields:
+        Randomly selected words
+    """
+    for chunk in iter_random_word_chunks(count, seed=seed, chunk_size=chunk_size,
+                                         vocabulary=vocabulary):
+        yield from chunk
+
+
+def generate_random_word_array(count, seed=None, vocabulary=None):
+    """Generate random words in a single vectorized batch.
+
+    Args:
+        count: Number of random words to generate
+        seed: Seed for the batch (default: None, unseeded)
+        vocabulary: Optional vocabulary to draw from (default: built-in list)
+
+    Returns:
+        NumPy object array of randomly selected words
+    """
+    if count < 0:
+        raise ValueError("count must be non-negative")
+    words = get_word_array() if vocabulary is None else vocabulary
+    rng = np.random.default_rng(seed)
+    return words.take(rng.integers(0, len(words), size=count))
+
+
+def write_random_words(path, count, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, vocabulary=None):
+    """Stream random words to a file, one word per line.
+
+    Only one chunk is held in memory at a time, so count can be far
+    larger than available RAM.
+
+    Args:
+        path: Output file path
+        count: Total number of random words to write
+        seed: Seed for the stream (default: None, unseeded)
+        chunk_size: Number of words sampled and written per batch
+        vocabulary: Optional vocabulary to draw from (default: built-in list)
+
+    Returns:
+        Number of words written
+    """
+    logging.info(f"Writing {count} random words to {path}")
+    written = 0
+    with open(path, 'w', encoding='utf-8') as fh:
+        for chunk in iter_random_word_chunks(count, seed=seed, chunk_size=chunk_size,
+                                             vocabulary=vocabulary):
+            fh.write('\n'.join(chunk))
+            fh.write('\n')
+            written += len(chunk)
+    logging.info(f"Successfully wrote {written} random words to {path}")
+    return written
+
+
+def _word_shard(size, seed, vocab_path=None, encode=False):
+    """Generate one shard of words inside a worker process.
+
+    Args:
+        size: Number of words in the shard
+        seed: np.random.SeedSequence for the shard
+        vocab_path: Optional packed vocabulary to open in the worker
+        encode: Return newline-terminated UTF-8 bytes instead of an array
+
+    Returns:
+        NumPy object array of words, or encoded bytes when encode is True
+    """
+    vocabulary = None
+    if vocab_path is not None:
+        vocabulary = _shard_vocabularies.get(vocab_path)
+        if vocabulary is None:
+            vocabulary = _shard_vocabularies[vocab_path] = MappedVocabulary(vocab_path)
+
+    words = generate_random_word_array(size, seed=seed, vocabulary=vocabulary)
+    if encode:
+        return ('\n'.join(words) + '\n').encode('utf-8') if size else b''
+    return words
+
+
+def generate_random_words_parallel(count, seed=None, workers=None,
+                                   shard_size=DEFAULT_SHARD_SIZE, vocabulary=None):
+    """Generate random words across a process pool.
+
+    Each shard draws from its own seed-derived stream, so a given seed and
+    count always produce the same words whatever the number of workers.
+
+    Args:
+        count: Number of random words to generate
+        seed: Root seed (default: None, unseeded)
+        workers: Number of worker processes (default: one per CPU)
+        shard_size: Number of words generated per worker task
+        vocabulary: Optional MappedVocabulary to draw from (default: built-in list)
+
+    Returns:
+        NumPy object array of randomly selected words
+    """
+    logging.info(f"Generating {count} random words with {workers or 'default'} workers")
+    shard_fn = partial(_word_shard, vocab_path=vocabulary.path if vocabulary is not None else None)
+    shards = list(iter_shards(shard_fn, count, seed=seed, workers=workers, shard_size=shard_size))
+    if not shards:
+        return np.empty(0, dtype=object)
+    return np.concatenate(shards)
+
+
+def write_random_words_parallel(path, count, seed=None, workers=None,
+                                shard_size=DEFAULT_SHARD_SIZE, vocabulary=None):
+    """Stream random words to a file, generating and encoding shards in parallel.
+
+    Workers return ready-to-write bytes and shards are written in order,
+    so the file is identical for a given seed and count.
+
+    Args:
+        path: Output file path
+        count: Total number of random words to write
+        seed: Root seed (default: None, unseeded)
+        workers: Number of worker processes (default: one per CPU)
+        shard_size: Number of words generated per worker task
+        vocabulary: Optional MappedVocabulary to draw from (default: built-in list)
+
+    Returns:
+        Number of words written
+    """
+    logging.info(f"Writing {count} random words to {path} with {workers or 'default'} workers")
+    shard_fn = partial(_word_shard, encode=True,
+                       vocab_path=vocabulary.path if vocabulary is not None else None)
+    written = 0
+    with open(path, 'wb') as fh:
+        for data in iter_shards(shard_fn, count, seed=seed, workers=workers, shard_size=shard_size):
+            fh.write(data)
+            # Every item in an encoded shard is newline-terminated
+            written += data.count(b'\n')
+    logging.info(f"Successfully wrote {written} random words to {path}")
+    return written
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Output random words.")
+    parser.add_argument('--count', type=int, default=100,
+                        help="number of words to generate (default: 100)")
+    parser.add_argument('--out', help="stream words to this file instead of printing them")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="seed for reproducible output")
+    parser.add_argument('--vocab',
+                        help="packed vocabulary file built with word_vocabulary.py")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"words per write batch (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="generate in parallel across this many processes")
+    parser.add_argument('--fast-logging', action='store_true',
+                        help="write logs from a background thread")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main function to output 100 random words."""
-    setup_logging()
+    args = parse_args(argv)
+    setup_logging(high_throughput=args.fast_logging)
     logging.info("Starting random words script")
 
+    vocabulary = None
     try:
-        random_words = generate_random_words(100)
+        if args.vocab:
+            vocabulary = MappedVocabulary(args.vocab)
+            logging.info(f"Using vocabulary {args.vocab} with {len(vocabulary)} words")
+
+        if args.out and args.workers:
+            write_random_words_parallel(args.out, args.count, seed=args.seed,
+                                        workers=args.workers, vocabulary=vocabulary)
+            logging.info("Script completed successfully")
+            return
+        if args.out:
+            write_random_words(args.out, args.count, seed=args.seed,
+                               chunk_size=args.chunk_size, vocabulary=vocabulary)
+            logging.info("Script completed successfully")
+            return
+
+        if args.workers:
+            random_words = list(generate_random_words_parallel(
+                args.count, seed=args.seed, workers=args.workers, vocabulary=vocabulary))
+        elif args.seed is not None:
+            random_words = list(generate_random_word_array(args.count, seed=args.seed,
+                                                           vocabulary=vocabulary))
+        else:
+            random_words = generate_random_words(args.count, vocabulary=vocabulary)
 
         logging.info("Displaying random words to user")
-        print("100 Random Words:")
+        print(f"{args.count} Random Words:")
         print("=" * 100)
         for i, word in enumerate(random_words, 1):
             print(f"{i:3d}. {word}")
@@ -79,6 +369,9 @@ def main():
     except Exception as e:
         logging.error(f"An error occurred: {e}", exc_info=True)
         raise
+    finally:
+        if vocabulary is not None:
+            vocabulary.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,5 @@
+"""
+F1 Analytics Workshop Analysis Package
+
+This package provides statistical analysis functions for F1 data.
+"""
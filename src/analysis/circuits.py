@@ -0,0 +1,277 @@
+"""
+Circuit analysis: historical per-circuit aggregates
+
+For every circuit this module keeps a handful of additive counters built
+from race results:
+
+- winner grid positions (histogram and average)
+- average positions gained by classified finishers
+- pole conversion rate (races won from pole / races with a pole sitter)
+- DNF rate (starters who did not finish / starters)
+
+Because every counter is a sum, the aggregates never need a pass over the
+full history again: each race's contribution is stored next to the counters,
+one row per (season, round), and update() only applies the rounds that are
+new. When a race is applied again with amended results (a penalty or a
+disqualification published after the race), its old contribution is
+subtracted and the new one added. The whole table is one small row per
+circuit, so serving stats is a primary-key lookup.
+"""
+
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+# Statuses of entrants who never took the start
+NON_STARTERS = {"Did not qualify", "Did not prequalify", "Withdrew", "Did not start"}
+
+# Additive counters kept per circuit
+COUNTERS = (
+    "races", "starters", "dnfs", "gained_sum", "gained_count",
+    "pole_races", "pole_wins", "winner_grid_sum", "winner_grid_count",
+)
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS circuit_stats ("
+    "circuitId TEXT PRIMARY KEY, first_season INTEGER, last_season INTEGER, "
+    + ", ".join(f"{name} INTEGER NOT NULL DEFAULT 0" for name in COUNTERS)
+    + ", winner_grid TEXT NOT NULL DEFAULT '{}') WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS circuit_stats_rounds ("
+    "season INTEGER NOT NULL, round INTEGER NOT NULL, circuitId TEXT NOT NULL, "
+    + ", ".join(f"{name} INTEGER NOT NULL" for name in COUNTERS)
+    + ", winner_grid INTEGER, PRIMARY KEY (season, round)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS circuit_stats_rounds_circuit "
+    "ON circuit_stats_rounds (circuitId, season)",
+)
+
+
+def is_finisher(status: Optional[str]) -> bool:
+    """Return whether a finishing status means the car was running at the end"""
+    if not status:
+        return False
+    return status == "Finished" or status == "Lapped" or status.startswith("+")
+
+
+def race_counters(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Compute the counters contributed by one race
+
+    Args:
+        rows: Results of the race with position, grid and status
+
+    Returns:
+        Dict of COUNTERS plus "winner_grid", the winner's grid slot or None
+    """
+    counters: Dict[str, Any] = dict.fromkeys(COUNTERS, 0)
+    counters["races"] = 1
+    counters["winner_grid"] = None
+    for row in rows:
+        status = row.get("status")
+        grid = row.get("grid")
+        if status in NON_STARTERS:
+            continue
+        counters["starters"] += 1
+        if is_finisher(status):
+            if grid:
+                counters["gained_sum"] += grid - row["position"]
+                counters["gained_count"] += 1
+        else:
+            counters["dnfs"] += 1
+        if grid == 1:
+            counters["pole_races"] = 1
+        if row.get("position") == 1 and grid is not None:
+            counters["winner_grid"] = grid
+    if counters["winner_grid"] is not None:
+        counters["winner_grid_sum"] = counters["winner_grid"]
+        counters["winner_grid_count"] = 1
+        counters["pole_wins"] = int(counters["winner_grid"] == 1 and counters["pole_races"] == 1)
+    return counters
+
+
+def _ratio(numerator: int, denominator: int) -> Optional[float]:
+    return round(numerator / denominator, 4) if denominator else None
+
+
+class CircuitStatsStore:
+    """
+    Persistent, incrementally updated per-circuit aggregates
+
+    The tables can live in their own SQLite file or next to the results in
+    the API's results store database.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        with self._connect() as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(circuit_stats_rounds)")}
+            if columns and "circuitId" not in columns:
+                # Written before contributions were stored; update() rebuilds it
+                conn.execute("DROP TABLE circuit_stats_rounds")
+                conn.execute("DROP TABLE IF EXISTS circuit_stats")
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def applied_rounds(self) -> set:
+        """Return the (season, round) pairs already folded into the aggregates"""
+        rows = self._connect().execute("SELECT season, round FROM circuit_stats_rounds")
+        return {(row[0], row[1]) for row in rows}
+
+    def apply_race(self, season: int, round_num: int, circuit_id: str,
+                   rows: List[Dict[str, Any]]) -> bool:
+        """
+        Fold one race into its circuit's aggregates
+
+        A race applied before is replaced: its stored contribution is
+        subtracted and the new one added, so amended results are picked up.
+
+        Returns:
+            True if the aggregates changed
+        """
+        if not rows or circuit_id is None:
+            return False
+        counters = race_counters(rows)
+        with self._write_lock, self._connect() as conn:
+            # Take the database write lock before reading the stored contribution,
+            # so another worker process cannot apply the same race in between
+            conn.execute("BEGIN IMMEDIATE")
+            previous = conn.execute(
+                "SELECT * FROM circuit_stats_rounds WHERE season = ? AND round = ?",
+                (season, round_num)
+            ).fetchone()
+            if previous is not None:
+                if previous["circuitId"] == circuit_id and all(
+                    previous[name] == counters[name] for name in COUNTERS + ("winner_grid",)
+                ):
+                    return False
+                self._add(conn, previous["circuitId"], previous, -1)
+
+            columns = ("season", "round", "circuitId") + COUNTERS + ("winner_grid",)
+            conn.execute(
+                f"INSERT OR REPLACE INTO circuit_stats_rounds ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})",
+                [season, round_num, circuit_id]
+                + [counters[name] for name in COUNTERS + ("winner_grid",)]
+            )
+            self._add(conn, circuit_id, counters, 1)
+            circuits = {circuit_id}
+            if previous is not None:
+                circuits.add(previous["circuitId"])
+            for circuit in circuits:
+                self._refresh_circuit(conn, circuit)
+        return True
+
+    def _add(self, conn: sqlite3.Connection, circuit_id: str, counters: Any, sign: int) -> None:
+        """Add (sign=1) or subtract (sign=-1) one race's counters from a circuit"""
+        row = conn.execute(
+            "SELECT winner_grid FROM circuit_stats WHERE circuitId = ?", (circuit_id,)
+        ).fetchone()
+        histogram = json.loads(row["winner_grid"]) if row else {}
+        if counters["winner_grid"] is not None:
+            slot = str(counters["winner_grid"])
+            histogram[slot] = histogram.get(slot, 0) + sign
+            if not histogram[slot]:
+                del histogram[slot]
+
+        conn.execute("INSERT OR IGNORE INTO circuit_stats (circuitId) VALUES (?)", (circuit_id,))
+        increments = ", ".join(f"{name} = {name} + ?" for name in COUNTERS)
+        conn.execute(
+            f"UPDATE circuit_stats SET {increments}, winner_grid = ? WHERE circuitId = ?",
+            [sign * counters[name] for name in COUNTERS]
+            + [json.dumps(histogram, separators=(",", ":")), circuit_id]
+        )
+
+    def _refresh_circuit(self, conn: sqlite3.Connection, circuit_id: str) -> None:
+        """Recompute a circuit's season span, dropping it once it has no races"""
+        conn.execute("DELETE FROM circuit_stats WHERE circuitId = ? AND races <= 0", (circuit_id,))
+        conn.execute(
+            "UPDATE circuit_stats SET "
+            "first_season = (SELECT MIN(season) FROM circuit_stats_rounds WHERE circuitId = ?1), "
+            "last_season = (SELECT MAX(season) FROM circuit_stats_rounds WHERE circuitId = ?1) "
+            "WHERE circuitId = ?1",
+            (circuit_id,)
+        )
+
+    def apply_round(self, results_store: Any, season: int, round_num: int) -> bool:
+        """Fold one stored round into the aggregates, replacing any earlier contribution"""
+        rows = results_store.race_rows(season, round_num)
+        if not rows:
+            return False
+        return self.apply_race(season, round_num, rows[0]["circuitId"], rows)
+
+    def update(self, results_store: Any, seasons: Iterable[int] = ()) -> int:
+        """
+        Apply every round in the results store that is not yet aggregated
+
+        Args:
+            results_store: Store providing rounds() and race_rows()
+            seasons: Seasons whose applied rounds are checked again for
+                amended results (e.g. the seasons just reloaded)
+
+        Returns:
+            Number of rounds applied or amended
+        """
+        applied = self.applied_rounds()
+        recheck = set(seasons)
+        count = 0
+        for season, round_num in results_store.rounds():
+            if (season, round_num) not in applied or season in recheck:
+                rows = results_store.race_rows(season, round_num)
+                count += self.apply_race(season, round_num, rows[0]["circuitId"], rows)
+        return count
+
+    def rebuild(self, results_store: Any) -> int:
+        """Discard the aggregates and recompute them from the full history"""
+        with self._write_lock, self._connect() as conn:
+            conn.execute("DELETE FROM circuit_stats")
+            conn.execute("DELETE FROM circuit_stats_rounds")
+        return self.update(results_store)
+
+    def circuits(self) -> List[str]:
+        rows = self._connect().execute("SELECT circuitId FROM circuit_stats ORDER BY circuitId")
+        return [row[0] for row in rows]
+
+    def get(self, circuit_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the historical stats of one circuit
+
+        Returns:
+            Dict of derived statistics, or None if the circuit has no races
+        """
+        row = self._connect().execute(
+            "SELECT * FROM circuit_stats WHERE circuitId = ?", (circuit_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        histogram = json.loads(row["winner_grid"])
+        return {
+            "circuitId": circuit_id,
+            "races": row["races"],
+            "first_season": row["first_season"],
+            "last_season": row["last_season"],
+            "winner_grid": {
+                "average": _ratio(row["winner_grid_sum"], row["winner_grid_count"]),
+                "distribution": dict(sorted(histogram.items(), key=lambda item: int(item[0]))),
+            },
+            "average_positions_gained": _ratio(row["gained_sum"], row["gained_count"]),
+            "pole_conversion_rate": _ratio(row["pole_wins"], row["pole_races"]),
+            "dnf_rate": _ratio(row["dnfs"], row["starters"]),
+        }
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,5 @@
+"""Run the API server with `python -m src.api`"""
+
+from .serve import main
+
+main()
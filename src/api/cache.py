@@ -0,0 +1,238 @@
+"""
+Shared response cache for the F1 Analytics Workshop API
+
+Every uvicorn/gunicorn worker on a node talks to the same cache backend, so
+cache memory does not multiply with the worker count and a response fetched
+by any worker is immediately available to all of them.
+
+Backends:
+- SQLiteCache: a single SQLite database in WAL mode (default)
+- RedisCache: any Redis-compatible client exposing get/set/delete
+- NullCache: caching disabled
+
+The backend is chosen with F1_API_CACHE_BACKEND (sqlite, redis or none).
+"""
+
+import json
+import logging
+import os
+import itertools
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default time-to-live for cached responses, in seconds
+DEFAULT_CACHE_TTL = 3600
+
+DEFAULT_SQLITE_PATH = os.path.join(tempfile.gettempdir(), "f1_api_cache.sqlite3")
+
+# Expired SQLite rows are deleted once every this many writes
+DEFAULT_PURGE_INTERVAL = 500
+
+
+class CacheBackend(ABC):
+    """Interface for cache backends shared between worker processes"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a JSON-serializable value under key for ttl seconds"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove key from the cache"""
+
+    def incr(self, key: str, ttl: float) -> Optional[int]:
+        """
+        Atomically add one to the counter under key and return its new value
+
+        A missing or expired counter starts again at 1 and lives for ttl
+        seconds. Returns None if the backend cannot share counters.
+        """
+        return None
+
+    def close(self) -> None:
+        """Release any resources held by the backend"""
+
+
+class NullCache(CacheBackend):
+    """Backend that never stores anything"""
+
+    def get(self, key: str) -> Optional[Any]:
+        return None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        pass
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Cache stored in a SQLite database shared by all local worker processes
+
+    WAL mode lets readers in every worker proceed while one worker writes.
+    Each thread gets its own connection. Every purge_interval writes the
+    writing thread also deletes expired rows, so the database stays bounded.
+    """
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH, busy_timeout: float = 5.0,
+                 purge_interval: int = DEFAULT_PURGE_INTERVAL):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.purge_interval = purge_interval
+        self._local = threading.local()
+        self._writes = itertools.count(1)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._connect().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, separators=(",", ":")), time.time() + ttl)
+            )
+        if self.purge_interval and next(self._writes) % self.purge_interval == 0:
+            purged = self.purge_expired()
+            if purged:
+                logger.debug("Purged %d expired cache entries", purged)
+
+    def delete(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def incr(self, key: str, ttl: float) -> Optional[int]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "INSERT INTO cache (key, value, expires_at) VALUES (?1, '1', ?2) "
+                "ON CONFLICT(key) DO UPDATE SET "
+                "value = CASE WHEN expires_at > ?3 THEN CAST(value AS INTEGER) + 1 ELSE 1 END, "
+                "expires_at = CASE WHEN expires_at > ?3 THEN expires_at ELSE ?2 END "
+                "RETURNING value",
+                (key, now + ttl, now)
+            ).fetchone()
+        return int(row[0])
+
+    def purge_expired(self) -> int:
+        """Delete expired rows and return how many were removed"""
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache stored in Redis or any server speaking the Redis protocol
+
+    The client only needs get(name), set(name, value, ex=seconds),
+    delete(name), and incr(name) with expire(name, seconds) for shared
+    counters, so redis.Redis and local stand-ins both work.
+    """
+
+    def __init__(self, client: Any, prefix: str = "f1api:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "f1api:") -> "RedisCache":
+        """Create a backend from a redis:// URL (requires the redis package)"""
+        import redis
+
+        return cls(redis.Redis.from_url(url), prefix=prefix)
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.client.set(self.prefix + key, json.dumps(value, separators=(",", ":")),
+                        ex=max(1, int(ttl)))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key: str, ttl: float) -> Optional[int]:
+        count = int(self.client.incr(self.prefix + key))
+        if count == 1:
+            self.client.expire(self.prefix + key, max(1, int(ttl)))
+        return count
+
+    def close(self) -> None:
+        close = getattr(self.client, "close", None)
+        if close is not None:
+            close()
+
+
+def create_cache_from_env() -> CacheBackend:
+    """
+    Build the cache backend configured by environment variables
+
+    F1_API_CACHE_BACKEND: sqlite (default), redis or none
+    F1_API_CACHE_PATH: SQLite database path
+    F1_API_REDIS_URL: Redis URL for the redis backend
+    """
+    backend = os.environ.get("F1_API_CACHE_BACKEND", "sqlite").lower()
+    if backend == "none":
+        return NullCache()
+    if backend == "redis":
+        return RedisCache.from_url(os.environ.get("F1_API_REDIS_URL", "redis://localhost:6379/0"))
+    if backend == "sqlite":
+        return SQLiteCache(os.environ.get("F1_API_CACHE_PATH", DEFAULT_SQLITE_PATH))
+    raise ValueError(f"Unknown F1_API_CACHE_BACKEND: {backend}")
+
+
+_cache: Optional[CacheBackend] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> CacheBackend:
+    """Return this process's handle on the shared cache, creating it on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = create_cache_from_env()
+    return _cache
+
+
+def set_cache(cache: Optional[CacheBackend]) -> None:
+    """Replace the process-wide cache backend (None recreates it from the environment)"""
+    global _cache
+    with _cache_lock:
+        if _cache is not None and _cache is not cache:
+            _cache.close()
+        _cache = cache
@@ -0,0 +1,306 @@
+"""
+Request diagnostics for the F1 Analytics Workshop API
+
+Two tools for finding out why a request was slow, without redeploying:
+
+- Slow-request log (always on): every request carries a RequestTrace that
+  F1APIService fills with one entry per make_request() call (endpoint,
+  cache status, time spent waiting for the rate limiter and upstream, and
+  payload size). Requests slower than the threshold are logged as one JSON
+  line and kept in a small in-memory buffer.
+
+- On-demand profiling (opt-in): when F1_API_PROFILE_TOKEN is set, a request
+  sent with a matching X-Profile-Token header is sampled by a background
+  thread. The samples are stored as collapsed stacks, the input format of
+  flamegraph.pl, speedscope and similar tools, under the id returned in the
+  X-Profile-Id response header.
+
+The sampler sees every thread in the worker, so requests running
+concurrently in the same worker can appear in a profile.
+"""
+
+import collections
+import contextvars
+import hmac
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile-token"
+
+# Leaf functions of threads that are idle rather than doing request work
+IDLE_FUNCTIONS = {"wait", "get", "select", "poll", "_worker", "accept", "sleep"}
+
+# Idle-looking threads are still sampled while running code from this tree
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_current_trace: contextvars.ContextVar[Optional["RequestTrace"]] = contextvars.ContextVar(
+    "f1_api_request_trace", default=None
+)
+
+
+class RequestTrace:
+    """Timings collected while serving one request"""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.status: Optional[int] = None
+        self.response_bytes = 0
+        self.duration_ms = 0.0
+        self.upstream: List[Dict[str, Any]] = []
+        self.profile_id: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 1),
+            "response_bytes": self.response_bytes,
+            "upstream": self.upstream,
+            "profile_id": self.profile_id,
+        }
+
+
+def current_trace() -> Optional[RequestTrace]:
+    """Return the trace of the request being served, if any"""
+    return _current_trace.get()
+
+
+def record_upstream_call(
+    endpoint: str,
+    duration: float,
+    cache_status: Optional[str],
+    wait: float = 0.0,
+    fetch: float = 0.0,
+    payload_bytes: Optional[int] = None,
+    error: Optional[str] = None
+) -> None:
+    """
+    Add one make_request() call to the current request's trace
+
+    Args:
+        endpoint: Ergast endpoint requested
+        duration: Total seconds spent in make_request()
+        cache_status: HIT, MISS, STALE, STALE-IF-ERROR or BYPASS
+        wait: Seconds spent waiting for the upstream rate limiter
+        fetch: Seconds spent on the upstream HTTP request
+        payload_bytes: Size of the upstream response body, if fetched
+        error: Error raised by the call, if any
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    call = {
+        "endpoint": endpoint,
+        "cache": cache_status,
+        "ms": round(duration * 1000, 1),
+        "wait_ms": round(wait * 1000, 1),
+        "fetch_ms": round(fetch * 1000, 1),
+        "bytes": payload_bytes,
+    }
+    if error is not None:
+        call["error"] = error
+    trace.upstream.append(call)
+
+
+class StackSampler:
+    """Background thread sampling the stacks of every other thread"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Dict[str, int] = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="f1-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Dict[str, int]:
+        """Stop sampling and return {collapsed stack: sample count}"""
+        self._stop.set()
+        self._thread.join()
+        return dict(self.samples)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.is_set():
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (frame.f_code.co_name in IDLE_FUNCTIONS
+                                    and not in_app_code(frame)):
+                    continue
+                if ident not in names:
+                    thread = threading._active.get(ident)
+                    names[ident] = thread.name if thread is not None else str(ident)
+                self.samples[collapse_stack(frame, names[ident])] += 1
+            self._stop.wait(self.interval)
+
+
+def in_app_code(frame) -> bool:
+    """Return whether any frame on the stack belongs to this source tree"""
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(APP_ROOT):
+            return True
+        frame = frame.f_back
+    return False
+
+
+def collapse_stack(frame, root: str) -> str:
+    """Render a frame and its callers as one collapsed-stack line, root first"""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    parts.append(root)
+    return ";".join(reversed(parts))
+
+
+class ProfileStore:
+    """Bounded in-memory store of recent profiles"""
+
+    def __init__(self, max_profiles: int = 20):
+        self._profiles: "collections.OrderedDict[str, Dict[str, Any]]" = collections.OrderedDict()
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    def add(self, trace: RequestTrace, samples: Dict[str, int]) -> str:
+        profile_id = trace.profile_id or uuid.uuid4().hex
+        with self._lock:
+            self._profiles[profile_id] = {"trace": trace.to_dict(), "samples": samples}
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Return a summary of every stored profile, newest first"""
+        with self._lock:
+            return [
+                {"id": profile_id, "samples": sum(profile["samples"].values()), **profile["trace"]}
+                for profile_id, profile in reversed(self._profiles.items())
+            ]
+
+
+def to_collapsed(samples: Dict[str, int]) -> str:
+    """Format samples in the collapsed-stack format used by flame graph tools"""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(samples.items()))
+
+
+class DiagnosticsMiddleware:
+    """
+    ASGI middleware tracing every request and profiling requests on demand
+
+    Slow requests are logged at WARNING on the src.api.diagnostics logger.
+    """
+
+    def __init__(
+        self,
+        app,
+        slow_request_ms: float = 1000,
+        profile_token: Optional[str] = None,
+        profile_interval: float = 0.005,
+        profiles: Optional[ProfileStore] = None,
+        slow_requests: Optional[Deque[Dict[str, Any]]] = None
+    ):
+        """
+        Args:
+            app: The wrapped ASGI application
+            slow_request_ms: Requests taking at least this long are logged
+            profile_token: Secret enabling profiling; None disables it
+            profile_interval: Seconds between stack samples
+            profiles: Where finished profiles are stored
+            slow_requests: Buffer receiving recent slow requests
+        """
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+        self.profile_token = profile_token
+        self.profile_interval = profile_interval
+        self.profiles = profiles if profiles is not None else profile_store
+        self.slow_requests = slow_requests if slow_requests is not None else slow_request_log
+
+    def _profile_requested(self, scope) -> bool:
+        if not self.profile_token:
+            return False
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_HEADER.encode():
+                return hmac.compare_digest(value, self.profile_token.encode())
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(scope.get("method", ""), scope.get("path", ""))
+        sampler = None
+        if self._profile_requested(scope):
+            trace.profile_id = uuid.uuid4().hex
+            sampler = StackSampler(self.profile_interval)
+            sampler.start()
+
+        streaming = False
+
+        async def send_wrapper(message):
+            nonlocal streaming
+            if message["type"] == "http.response.start":
+                trace.status = message["status"]
+                streaming = (b"content-type", b"text/event-stream") in [
+                    (name.lower(), value.split(b";")[0]) for name, value in message.get("headers", ())
+                ]
+                if trace.profile_id is not None:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-profile-id", trace.profile_id.encode())
+                    ]
+            elif message["type"] == "http.response.body":
+                trace.response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        token = _current_trace.set(trace)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            trace.duration_ms = (time.perf_counter() - start) * 1000
+            _current_trace.reset(token)
+            route = scope.get("route")
+            trace.route = getattr(route, "path", None)
+            if sampler is not None:
+                self.profiles.add(trace, sampler.stop())
+            # Event streams stay open by design, so their duration is not latency
+            if trace.duration_ms >= self.slow_request_ms and not streaming:
+                record = trace.to_dict()
+                self.slow_requests.append(record)
+                logger.warning("Slow request: %s", json.dumps(record, separators=(",", ":")))
+
+
+# Profiles and recent slow requests captured by this worker process
+profile_store = ProfileStore()
+slow_request_log: Deque[Dict[str, Any]] = collections.deque(maxlen=100)
+
+
+def profile_token_from_env() -> Optional[str]:
+    """Return F1_API_PROFILE_TOKEN, or None when profiling is disabled"""
+    return os.environ.get("F1_API_PROFILE_TOKEN") or None
+
+
+def check_profile_token(token: Optional[str]) -> bool:
+    """Return whether token matches the configured profiling token"""
+    expected = profile_token_from_env()
+    if not expected or token is None:
+        return False
+    return hmac.compare_digest(token.encode(), expected.encode())
@@ -0,0 +1,40 @@
+"""
+Lazy module imports for the API
+
+Heavy libraries used only by specific routes (pandas, scikit-learn,
+matplotlib and the analysis/model modules built on them) are imported with
+lazy_import() so that they load on first use rather than at worker startup.
+"""
+
+import importlib
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Return a module whose import is deferred until an attribute is accessed
+
+    Args:
+        name: Absolute module name, e.g. "pandas" or "src.analysis.circuits"
+
+    Returns:
+        The module, if already imported, otherwise a lazily loading module
+
+    Raises:
+        ModuleNotFoundError: If the module cannot be found
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
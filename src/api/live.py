@@ -0,0 +1,279 @@
+"""
+Live standings and results updates over server-sent events
+
+Dashboards used to poll the standings and results endpoints every few
+seconds, each poll costing a request to the app and often one upstream.
+LiveHub replaces that with push: clients subscribe to topics (Ergast
+endpoints such as 2024/driverStandings.json) and one poller per topic
+fetches the endpoint, detects changes with a content hash of its rows and
+fans the changed rows out to every subscriber.
+
+Events sent to a subscriber:
+
+- snapshot: every row of a topic, sent first and after falling behind
+- diff: rows that changed or were removed since the previous poll
+
+Each subscriber has a bounded queue, never smaller than its number of
+topics. A subscriber that falls behind has its queue cleared and receives
+one fresh snapshot per topic instead, so slow clients never hold memory or
+delay the others.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds between upstream polls of a topic. Each polled topic costs up to
+# 3600 / interval upstream requests an hour, against Ergast's 200 an hour.
+DEFAULT_POLL_INTERVAL = 60.0
+
+# Events buffered per subscriber before it is resynchronised with snapshots
+DEFAULT_QUEUE_SIZE = 16
+
+# Seconds between keep-alive comments on an idle stream
+DEFAULT_HEARTBEAT = 15.0
+
+
+def topic_rows(data: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """
+    Split an Ergast standings or results response into context and keyed rows
+
+    Returns:
+        (context, rows): context holds season and round, rows maps a
+        driverId or constructorId to its standings or result entry
+    """
+    mr_data = (data or {}).get("MRData", {})
+    context: Dict[str, Any] = {}
+    entries: List[Dict[str, Any]] = []
+
+    standings = mr_data.get("StandingsTable", {}).get("StandingsLists", [])
+    races = mr_data.get("RaceTable", {}).get("Races", [])
+    if standings:
+        latest = standings[-1]
+        context = {"season": latest.get("season"), "round": latest.get("round")}
+        entries = latest.get("DriverStandings") or latest.get("ConstructorStandings") or []
+    elif races:
+        race = races[0]
+        context = {"season": race.get("season"), "round": race.get("round"),
+                   "raceName": race.get("raceName")}
+        entries = race.get("Results") or race.get("QualifyingResults") or []
+
+    rows = {}
+    for entry in entries:
+        key = (entry.get("Driver") or {}).get("driverId") \
+            or (entry.get("Constructor") or {}).get("constructorId")
+        if key is not None:
+            rows[key] = entry
+    return context, rows
+
+
+def content_hash(value: Any) -> str:
+    """Return a stable hash of JSON-serialisable content"""
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def diff_rows(
+    old: Dict[str, Dict[str, Any]],
+    new: Dict[str, Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Return the rows of new that differ from old, and the keys that disappeared"""
+    changed = [row for key, row in new.items() if old.get(key) != row]
+    removed = [key for key in old if key not in new]
+    return changed, removed
+
+
+def format_event(event: str, data: Dict[str, Any], event_id: Optional[str] = None) -> str:
+    """Encode one server-sent event"""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append("data: " + json.dumps(data, separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
+
+
+class TopicState:
+    """Latest known rows of one topic"""
+
+    def __init__(self, topic: str):
+        self.topic = topic
+        self.context: Dict[str, Any] = {}
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self.hash: Optional[str] = None
+        self.updated_at: Optional[float] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"topic": self.topic, **self.context, "rows": list(self.rows.values())}
+
+
+class Subscriber:
+    """One client's bounded event queue over one or more topics"""
+
+    def __init__(self, topics: Iterable[str], queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.topics = list(topics)
+        # Room for one snapshot per topic, so a resync always fits
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(queue_size, len(self.topics)))
+
+    def deliver(self, event: str, hub: "LiveHub") -> None:
+        """Queue an event, replacing the backlog with snapshots if the client is behind"""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            hub.stats["resyncs"] += 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            for topic in self.topics:
+                state = hub.states.get(topic)
+                if state is not None and state.hash is not None:
+                    self.queue.put_nowait(format_event("snapshot", state.snapshot(), state.hash[:16]))
+
+
+class LiveHub:
+    """Shared pollers for live topics, fanning changes out to subscribers"""
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Dict[str, Any]],
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        queue_size: int = DEFAULT_QUEUE_SIZE
+    ):
+        """
+        Args:
+            fetch: Blocking function returning the current response for an
+                endpoint, or None to skip this poll (e.g. when over budget)
+            poll_interval: Seconds between polls of each topic
+            queue_size: Events buffered per subscriber
+        """
+        self.fetch = fetch
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.states: Dict[str, TopicState] = {}
+        self.subscribers: Dict[str, Set[Subscriber]] = {}
+        self._pollers: Dict[str, asyncio.Task] = {}
+        self.stats = {"polls": 0, "skipped": 0, "changes": 0, "errors": 0, "events": 0,
+                      "resyncs": 0}
+
+    def subscribe(self, topics: Iterable[str]) -> Subscriber:
+        """
+        Subscribe to topics, starting their pollers if needed
+
+        Topics that have already been polled are delivered as snapshots
+        straight away.
+        """
+        subscriber = Subscriber(topics, self.queue_size)
+        for topic in subscriber.topics:
+            self.subscribers.setdefault(topic, set()).add(subscriber)
+            state = self.states.get(topic)
+            if state is not None and state.hash is not None:
+                subscriber.deliver(format_event("snapshot", state.snapshot(), state.hash[:16]), self)
+            if topic not in self._pollers:
+                self._pollers[topic] = asyncio.get_running_loop().create_task(self._poll(topic))
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove a subscriber, stopping pollers nobody listens to any more"""
+        for topic in subscriber.topics:
+            listeners = self.subscribers.get(topic)
+            if listeners is None:
+                continue
+            listeners.discard(subscriber)
+            if not listeners:
+                del self.subscribers[topic]
+                self.states.pop(topic, None)
+                poller = self._pollers.pop(topic, None)
+                if poller is not None:
+                    poller.cancel()
+
+    def publish(self, topic: str, data: Dict[str, Any]) -> bool:
+        """
+        Compare a fresh response with the last one and fan out what changed
+
+        Returns:
+            True if the topic changed
+        """
+        context, rows = topic_rows(data)
+        digest = content_hash([context, rows])
+        state = self.states.setdefault(topic, TopicState(topic))
+        if digest == state.hash:
+            return False
+
+        if state.hash is None:
+            event = format_event("snapshot", {"topic": topic, **context,
+                                              "rows": list(rows.values())}, digest[:16])
+        else:
+            changed, removed = diff_rows(state.rows, rows)
+            event = format_event("diff", {"topic": topic, **context, "changed": changed,
+                                          "removed": removed}, digest[:16])
+        state.context, state.rows, state.hash = context, rows, digest
+        state.updated_at = time.time()
+        self.stats["changes"] += 1
+
+        for subscriber in list(self.subscribers.get(topic, ())):
+            subscriber.deliver(event, self)
+            self.stats["events"] += 1
+        return True
+
+    async def _poll(self, topic: str) -> None:
+        while True:
+            try:
+                data = await asyncio.to_thread(self.fetch, topic)
+                if data is None:
+                    self.stats["skipped"] += 1
+                else:
+                    self.stats["polls"] += 1
+                    if topic in self.subscribers:
+                        self.publish(topic, data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # A malformed response must not end the poller for every subscriber
+                self.stats["errors"] += 1
+                logger.warning("Live poll of %s failed: %s", topic, e)
+            await asyncio.sleep(self.poll_interval)
+
+    async def stream(self, topics: Iterable[str], heartbeat: float = DEFAULT_HEARTBEAT):
+        """
+        Subscribe to topics and yield their events as server-sent event text
+
+        The subscription is made when streaming starts, so a client that
+        disconnects before the response begins never subscribes. Sends a
+        comment line when idle so proxies keep the connection open, and
+        unsubscribes when the client goes away.
+        """
+        subscriber = self.subscribe(topics)
+        try:
+            yield f"retry: {int(self.poll_interval * 1000)}\n\n"
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+    def summary(self) -> Dict[str, Any]:
+        """Return per-topic subscriber counts and poller statistics"""
+        return {
+            "topics": {
+                topic: {
+                    "subscribers": len(listeners),
+                    "updated_at": getattr(self.states.get(topic), "updated_at", None),
+                }
+                for topic, listeners in self.subscribers.items()
+            },
+            "subscribers": len({s for listeners in self.subscribers.values() for s in listeners}),
+            **self.stats,
+        }
+
+    async def stop(self) -> None:
+        """Cancel every poller"""
+        pollers = list(self._pollers.values())
+        for poller in pollers:
+            poller.cancel()
+        await asyncio.gather(*pollers, return_exceptions=True)
+        self._pollers.clear()
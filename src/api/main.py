@@ -3,26 +3,123 @@ F1 Analytics Workshop API Server
 
 A FastAPI-based web server that provides health check endpoints and F1 data analysis APIs
 using the Ergast F1 API as the data source.
+
+Run it with `python -m src.api` (see src/api/serve.py).
 """
 
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Dict, Any, List, Optional
-import requests
-from fastapi import FastAPI, HTTPException, Depends
+from typing import Callable, Dict, Any, List, Optional, Set
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
-import os
-import sys
 
-# Add src directory to Python path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ..analysis.circuits import CircuitStatsStore
+from ..models.inference import MicroBatcher
+from .cache import CacheBackend, DEFAULT_CACHE_TTL, get_cache
+from .lazy import lazy_import
+from .live import LiveHub
+from .diagnostics import (
+    DiagnosticsMiddleware, check_profile_token, profile_store, profile_token_from_env,
+    record_upstream_call, slow_request_log, to_collapsed
+)
+from .prefetch import DEFAULT_WARM_KEYS, PrefetchScheduler, SharedRequestBudget
+from .results_store import MAX_QUERY_LIMIT, InvalidCursor, get_results_store
+from .ratelimit import (
+    INTERACTIVE, PREFETCH, ConcurrencyLimitMiddleware, RateLimitExceeded, get_upstream_limiter
+)
+
+# Heavy or route-specific dependencies (requests, pandas, scikit-learn,
+# matplotlib, uvicorn) are imported where they are used, or via
+# src.api.lazy.lazy_import, so that worker cold start stays fast.
+
+# NumPy-backed models load on the first prediction request
+lap_times = lazy_import("src.models.lap_times")
+race_winner = lazy_import("src.models.race_winner")
+
+# Background cache warmer, running while the app is being served
+prefetch_scheduler: Optional[PrefetchScheduler] = None
+
+
+def create_prefetch_scheduler() -> Optional[PrefetchScheduler]:
+    """
+    Build the prefetch scheduler configured by environment variables
+
+    F1_API_PREFETCH: set to 0 to disable warming and prefetching
+    F1_API_PREFETCH_BUDGET: upstream requests allowed per budget period across
+        all workers sharing the cache (default 60)
+    F1_API_PREFETCH_PERIOD: budget period in seconds (default 3600)
+    F1_API_WARM_KEYS: comma-separated endpoints to warm, {season} is substituted
+    F1_API_PREFETCH_POLL_INTERVAL: seconds between result polls (default 300)
+    """
+    if os.environ.get("F1_API_PREFETCH", "1") == "0":
+        return None
+
+    warm_keys = os.environ.get("F1_API_WARM_KEYS")
+    cache = get_cache()
+    budget = SharedRequestBudget(
+        cache,
+        max_requests=int(os.environ.get("F1_API_PREFETCH_BUDGET", "60")),
+        period=float(os.environ.get("F1_API_PREFETCH_PERIOD", "3600"))
+    )
+    return PrefetchScheduler(
+        service=F1APIService(cache=cache, priority=PREFETCH),
+        budget=budget,
+        warm_keys=warm_keys.split(",") if warm_keys else DEFAULT_WARM_KEYS,
+        poll_interval=float(os.environ.get("F1_API_PREFETCH_POLL_INTERVAL", "300"))
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background work around the serving lifetime"""
+    global prefetch_scheduler
+    prefetch_scheduler = create_prefetch_scheduler()
+    if prefetch_scheduler is not None:
+        await prefetch_scheduler.start()
+    try:
+        yield
+    finally:
+        if prefetch_scheduler is not None:
+            await prefetch_scheduler.stop()
+            prefetch_scheduler = None
+        for predictor in list(_predictors.values()):
+            await predictor.stop()
+        _predictors.clear()
+        hub = set_live_hub(None)
+        if hub is not None:
+            await hub.stop()
+
 
 app = FastAPI(
     title="F1 Analytics Workshop API",
     description="A comprehensive API for Formula 1 statistical analysis using the Ergast F1 API",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
+)
+
+# Live streams hold their slot for the whole connection, so they get their own limit
+LIVE_ROUTES = ("/live/seasons/{year}", "/live/seasons/{year}/{round_num}")
+LIVE_MAX_SUBSCRIBERS = int(os.environ.get("F1_API_LIVE_MAX_SUBSCRIBERS", "1000"))
+
+# Shed load per route instead of queueing unboundedly
+app.add_middleware(
+    ConcurrencyLimitMiddleware,
+    max_concurrent=int(os.environ.get("F1_API_MAX_CONCURRENCY", "32")),
+    max_queue=int(os.environ.get("F1_API_MAX_QUEUE", "64")),
+    queue_timeout=float(os.environ.get("F1_API_QUEUE_TIMEOUT", "5")),
+    route_limits={route: (LIVE_MAX_SUBSCRIBERS, 0) for route in LIVE_ROUTES}
 )
 
 # Add CORS middleware
@@ -34,6 +131,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Slow-request log and on-demand profiling (outermost, so shedding is timed too)
+app.add_middleware(
+    DiagnosticsMiddleware,
+    slow_request_ms=float(os.environ.get("F1_API_SLOW_REQUEST_MS", "1000")),
+    profile_token=profile_token_from_env(),
+    profile_interval=float(os.environ.get("F1_API_PROFILE_INTERVAL", "0.005"))
+)
+
 # Ergast F1 API base URL
 ERGAST_BASE_URL = "https://api.jolpi.ca/ergast/f1"
 
@@ -41,39 +146,423 @@ ERGAST_BASE_URL = "https://api.jolpi.ca/ergast/f1"
 REQUEST_TIMEOUT = 30
 MAX_RETRIES = 3
 
+# Time-to-live for cached Ergast responses, in seconds
+CACHE_TTL = float(os.environ.get("F1_API_CACHE_TTL", DEFAULT_CACHE_TTL))
+
+# How long past its TTL an entry may be served while one background refresh
+# runs (stale-while-revalidate), and while upstream is failing (stale-if-error)
+STALE_WHILE_REVALIDATE = float(os.environ.get("F1_API_STALE_WHILE_REVALIDATE", "600"))
+STALE_IF_ERROR = float(os.environ.get("F1_API_STALE_IF_ERROR", "86400"))
+
+# Threads available for background revalidation in each worker
+REVALIDATION_WORKERS = 4
+
+logger = logging.getLogger(__name__)
+
+_revalidation_executor: Optional[ThreadPoolExecutor] = None
+_revalidating: Set[str] = set()
+_revalidating_lock = threading.Lock()
+
+
+def _get_revalidation_executor() -> ThreadPoolExecutor:
+    global _revalidation_executor
+    with _revalidating_lock:
+        if _revalidation_executor is None:
+            _revalidation_executor = ThreadPoolExecutor(
+                max_workers=REVALIDATION_WORKERS, thread_name_prefix="f1-revalidate"
+            )
+    return _revalidation_executor
+
 
 class F1APIService:
     """Service class for interacting with the Ergast F1 API"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        cache: Optional[CacheBackend] = None,
+        cache_ttl: float = CACHE_TTL,
+        stale_while_revalidate: float = STALE_WHILE_REVALIDATE,
+        stale_if_error: float = STALE_IF_ERROR,
+        response: Optional[Response] = None,
+        priority: int = INTERACTIVE
+    ):
+        import requests
+
         self.base_url = ERGAST_BASE_URL
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = stale_if_error
+        self.response = response
+        self.priority = priority
+        self.cache_status: Optional[str] = None
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'F1-Analytics-Workshop/1.0.0'
         })
 
-    def make_request(self, endpoint: str) -> Dict[str, Any]:
-        """Make a request to the Ergast API with error handling"""
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+    def make_request(
+        self,
+        endpoint: str,
+        use_cache: bool = True,
+        rate_limited: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Make a request to the Ergast API with error handling
+
+        Responses are read from and written to the shared cache when one is
+        configured, unless use_cache is False. Entries past their TTL are
+        still served immediately while a background refresh runs
+        (stale-while-revalidate), and served in place of an upstream error
+        (stale-if-error); both are flagged with staleness headers.
+
+        rate_limited=False skips the upstream limiter; it is reserved for
+        the /health probe so that monitoring cannot spend user tokens.
+
+        Each call is recorded in the current request's diagnostics trace.
+        """
+        key = endpoint.lstrip('/')
+        self.cache_status = None
+        timing: Dict[str, Any] = {}
+        start = time.perf_counter()
+        error = None
+        try:
+            return self._serve(key, use_cache, timing, rate_limited)
+        except HTTPException as e:
+            error = f"{e.status_code}: {e.detail}"
+            raise
+        finally:
+            status = self.cache_status
+            if status is None:
+                status = "BYPASS" if self.cache is None or not use_cache else "MISS"
+            record_upstream_call(key, time.perf_counter() - start, status,
+                                 wait=timing.get("wait", 0.0), fetch=timing.get("fetch", 0.0),
+                                 payload_bytes=timing.get("bytes"), error=error)
+
+    def _serve(
+        self,
+        key: str,
+        use_cache: bool,
+        timing: Dict[str, Any],
+        rate_limited: bool = True
+    ) -> Dict[str, Any]:
+        if self.cache is None or not use_cache:
+            return self._fetch(key, timing=timing, rate_limited=rate_limited)
+
+        entry = self._cache_get(key)
+        age = time.time() - entry["fetched_at"] if entry is not None else None
+        if entry is not None:
+            if age < self.cache_ttl:
+                self._record_cache_status("HIT", age)
+                return entry["data"]
+            if age < self.cache_ttl + self.stale_while_revalidate:
+                self._revalidate_in_background(key)
+                self._record_cache_status("STALE", age)
+                return entry["data"]
+
+        try:
+            data = self._fetch(key, timing=timing, rate_limited=rate_limited)
+        except HTTPException:
+            if entry is not None and age < self.cache_ttl + self.stale_if_error:
+                logger.warning("Serving stale %s after upstream failure", key)
+                self._record_cache_status("STALE-IF-ERROR", age)
+                return entry["data"]
+            raise
+
+        self._cache_set(key, data)
+        self._record_cache_status("MISS", 0.0)
+        return data
+
+    def get_cached(
+        self,
+        endpoint: str,
+        allow_stale: bool = False,
+        max_age: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached response for endpoint without contacting upstream
+
+        Entries older than max_age seconds (default: the cache TTL) are
+        ignored unless allow_stale is set.
+        """
+        if self.cache is None:
+            return None
+        entry = self._cache_get(endpoint.lstrip('/'))
+        if entry is None:
+            return None
+        max_age = self.cache_ttl if max_age is None else max_age
+        if not allow_stale and time.time() - entry["fetched_at"] >= max_age:
+            return None
+        return entry["data"]
+
+    def refresh(self, endpoint: str, priority: Optional[int] = None) -> Dict[str, Any]:
+        """Fetch endpoint from upstream and overwrite any cached response"""
+        key = endpoint.lstrip('/')
+        data = self._fetch(key, priority)
+        if self.cache is not None:
+            self._cache_set(key, data)
+        return data
+
+    def _fetch(
+        self,
+        key: str,
+        priority: Optional[int] = None,
+        timing: Optional[Dict[str, Any]] = None,
+        rate_limited: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Fetch a response from the Ergast API within the upstream rate limit
+
+        When timing is given it receives the seconds spent waiting for the
+        rate limiter ("wait") and on the HTTP request ("fetch"), and the
+        response size in bytes ("bytes").
+        """
+        import requests
+
+        url = f"{self.base_url}/{key}"
+        timing = timing if timing is not None else {}
+
+        start = time.perf_counter()
+        try:
+            if rate_limited:
+                get_upstream_limiter().acquire(self.priority if priority is None else priority)
+        except RateLimitExceeded as e:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests to the Ergast F1 API, please retry shortly",
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+            )
+        finally:
+            timing["wait"] = time.perf_counter() - start
 
+        start = time.perf_counter()
         try:
             response = self.session.get(url, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
+            if isinstance(response.content, bytes):
+                timing["bytes"] = len(response.content)
             return response.json()
         except requests.RequestException as e:
             raise HTTPException(
                 status_code=503,
                 detail=f"Error accessing Ergast F1 API: {str(e)}"
             )
+        finally:
+            timing["fetch"] = time.perf_counter() - start
+
+    def _revalidate_in_background(self, key: str) -> None:
+        """Refresh key on a background thread, at most once at a time per worker"""
+        with _revalidating_lock:
+            if key in _revalidating:
+                return
+            _revalidating.add(key)
+        try:
+            _get_revalidation_executor().submit(self._revalidate, key)
+        except RuntimeError:
+            with _revalidating_lock:
+                _revalidating.discard(key)
+
+    def _revalidate(self, key: str) -> None:
+        try:
+            # Another worker may have refreshed the shared entry already
+            entry = self._cache_get(key)
+            if entry is not None and time.time() - entry["fetched_at"] < self.cache_ttl:
+                return
+            self.refresh(key, priority=PREFETCH)
+        except Exception as e:
+            logger.warning("Background refresh of %s failed: %s", key, e)
+        finally:
+            with _revalidating_lock:
+                _revalidating.discard(key)
+
+    def _record_cache_status(self, status: str, age: float) -> None:
+        """Remember how the last response was served and expose it as headers"""
+        self.cache_status = status
+        if self.response is None:
+            return
+        self.response.headers["X-Cache"] = status
+        self.response.headers["Age"] = str(int(age))
+        if status == "STALE":
+            self.response.headers["Warning"] = '110 - "Response is Stale"'
+        elif status == "STALE-IF-ERROR":
+            self.response.headers["Warning"] = '111 - "Revalidation Failed"'
+        if status != "HIT" and status != "MISS":
+            self.response.headers["X-Cache-Staleness"] = str(int(age - self.cache_ttl))
+
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a cache entry of the form {"data": ..., "fetched_at": ...}
+
+        Cache failures and unrecognised entries are logged and treated as misses.
+        """
+        try:
+            entry = self.cache.get(key)
+        except Exception as e:
+            logger.warning("Cache read failed for %s: %s", key, e)
+            return None
+        if not isinstance(entry, dict) or "data" not in entry or "fetched_at" not in entry:
+            return None
+        return entry
+
+    def _cache_set(self, key: str, data: Dict[str, Any]) -> None:
+        """Write to the cache; cache failures are logged and ignored"""
+        # Keep entries past their TTL so they can still be served stale
+        ttl = self.cache_ttl + max(self.stale_while_revalidate, self.stale_if_error)
+        try:
+            self.cache.set(key, {"data": data, "fetched_at": time.time()}, ttl)
+        except Exception as e:
+            logger.warning("Cache write failed for %s: %s", key, e)
+
+
+_circuit_stats: Optional[CircuitStatsStore] = None
+_circuit_stats_lock = threading.Lock()
+
+
+def get_circuit_stats() -> CircuitStatsStore:
+    """Return the per-circuit aggregates kept next to the local results store"""
+    global _circuit_stats
+    path = get_results_store().path
+    with _circuit_stats_lock:
+        if _circuit_stats is None or _circuit_stats.path != path:
+            _circuit_stats = CircuitStatsStore(path)
+    return _circuit_stats
+
+
+_live_hub: Optional[LiveHub] = None
+_live_hub_lock = threading.Lock()
+
+
+def live_fetcher(
+    service: F1APIService,
+    budget: SharedRequestBudget,
+    interval: float
+) -> Callable[[str], Optional[Dict[str, Any]]]:
+    """
+    Build the LiveHub fetch function for a topic endpoint
+
+    A response cached within the poll interval, by any worker, is reused.
+    Otherwise one request is charged to the shared live budget; when the
+    budget is spent the poll is skipped (None) rather than competing with
+    interactive requests for the upstream rate limit.
+    """
+    def fetch(endpoint: str) -> Optional[Dict[str, Any]]:
+        data = service.get_cached(endpoint, max_age=interval)
+        if data is not None:
+            return data
+        if not budget.try_acquire():
+            logger.debug("Live budget exhausted, skipping poll of %s", endpoint)
+            return None
+        return service.refresh(endpoint)
+
+    return fetch
+
+
+def get_live_hub() -> LiveHub:
+    """
+    Return this worker's live update hub, configured by environment variables
+
+    F1_API_LIVE_POLL_INTERVAL: seconds between upstream polls of a topic (default 60)
+    F1_API_LIVE_BUDGET: upstream requests allowed per hour for all live polls,
+        across all workers sharing the cache (default 60)
+    F1_API_LIVE_QUEUE: events buffered per subscriber (default 16)
+
+    Polls read the shared cache first, so when another worker polled the same
+    topic within the interval no upstream request is made.
+    """
+    global _live_hub
+    with _live_hub_lock:
+        if _live_hub is None:
+            interval = float(os.environ.get("F1_API_LIVE_POLL_INTERVAL", "60"))
+            cache = get_cache()
+            budget = SharedRequestBudget(
+                cache, max_requests=int(os.environ.get("F1_API_LIVE_BUDGET", "60")),
+                period=3600, key="live-budget"
+            )
+            service = F1APIService(cache=cache, priority=PREFETCH)
+            _live_hub = LiveHub(live_fetcher(service, budget, interval), poll_interval=interval,
+                                queue_size=int(os.environ.get("F1_API_LIVE_QUEUE", "16")))
+    return _live_hub
+
+
+def set_live_hub(hub: Optional[LiveHub]) -> Optional[LiveHub]:
+    """Replace the live update hub, returning the previous one"""
+    global _live_hub
+    with _live_hub_lock:
+        previous, _live_hub = _live_hub, hub
+    return previous
+
+
+# Model file settings for each prediction endpoint
+MODEL_PATH_SETTINGS = {
+    "lap_times": "F1_API_LAP_TIME_MODEL",
+    "race_winner": "F1_API_RACE_WINNER_MODEL",
+}
+
+_predictors: Dict[str, MicroBatcher] = {}
+_predictors_lock = threading.Lock()
+
+
+def _load_predict_batch(name: str, path: str):
+    if name == "lap_times":
+        return partial(lap_times.predict_lap_time_batch, lap_times.LapTimeModel.load(path))
+    return partial(race_winner.predict_race_winners, race_winner.RaceWinnerModel.load(path))
+
+
+async def get_predictor(name: str) -> MicroBatcher:
+    """
+    Return the micro-batcher serving a model, loading the model on first use
+
+    The model file is read in a worker thread so a first request does not
+    block the event loop; a missing or unreadable file answers 503.
+
+    F1_API_LAP_TIME_MODEL / F1_API_RACE_WINNER_MODEL: saved model paths (.npz)
+    F1_API_BATCH_SIZE: largest prediction batch (default 64)
+    F1_API_BATCH_WAIT_MS: how long a request waits for others to batch with (default 2)
+    F1_API_INFERENCE_WORKERS: batches run at once per model (default 1)
+    """
+    predictor = _predictors.get(name)
+    if predictor is not None:
+        return predictor
+
+    setting = MODEL_PATH_SETTINGS[name]
+    path = os.environ.get(setting)
+    if not path:
+        raise HTTPException(status_code=503, detail=f"No {name} model configured (set {setting})")
+    try:
+        predict_batch = await asyncio.to_thread(_load_predict_batch, name, path)
+    except (OSError, ValueError) as e:
+        logger.error("Could not load %s model from %s: %s", name, path, e)
+        raise HTTPException(status_code=503, detail=f"The {name} model is unavailable")
+
+    with _predictors_lock:
+        # Concurrent first requests may both load the model; the first one wins
+        if name not in _predictors:
+            _predictors[name] = MicroBatcher(
+                predict_batch,
+                max_batch_size=int(os.environ.get("F1_API_BATCH_SIZE", "64")),
+                max_wait=float(os.environ.get("F1_API_BATCH_WAIT_MS", "2")) / 1000,
+                workers=int(os.environ.get("F1_API_INFERENCE_WORKERS", "1")),
+                name=name
+            )
+        return _predictors[name]
+
+
+def set_predictor(name: str, predictor: Optional[MicroBatcher]) -> None:
+    """Replace the micro-batcher serving a model (None reloads it on next use)"""
+    with _predictors_lock:
+        if predictor is None:
+            _predictors.pop(name, None)
+        else:
+            _predictors[name] = predictor
 
 
 # Dependency to get F1 API service instance
-def get_f1_service() -> F1APIService:
-    return F1APIService()
+def get_f1_service(response: Response = None) -> F1APIService:
+    return F1APIService(cache=get_cache(), response=response)
 
 
 @app.get("/health")
-async def health_check() -> Dict[str, Any]:
+def health_check() -> Dict[str, Any]:
     """
     Health check endpoint that verifies the API server is running
     and can access the external Ergast F1 API.
@@ -91,8 +580,10 @@ async def health_check() -> Dict[str, Any]:
     # Check connectivity to external Ergast API
     try:
         f1_service = get_f1_service()
-        # Make a lightweight request to check API availability
-        f1_service.make_request("seasons.json?limit=1")
+        # Make a lightweight request to check API availability. Probes skip
+        # the upstream limiter so frequent health checks cannot use up the
+        # hourly allowance that user requests depend on.
+        f1_service.make_request("seasons.json?limit=1", use_cache=False, rate_limited=False)
         health_status["external_api"] = {
             "ergast_f1_api": "healthy",
             "url": ERGAST_BASE_URL
@@ -119,8 +610,56 @@ async def root() -> Dict[str, str]:
     }
 
 
+def require_profile_token(x_profile_token: Optional[str] = Header(None)) -> None:
+    """Allow access to diagnostics only with the configured profiling token"""
+    if profile_token_from_env() is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not check_profile_token(x_profile_token):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+
+@app.get("/debug/profiles", dependencies=[Depends(require_profile_token)])
+def list_profiles() -> List[Dict[str, Any]]:
+    """
+    List the request profiles captured by this worker
+
+    Returns:
+        List of profile summaries, newest first
+    """
+    return profile_store.list()
+
+
+@app.get("/debug/profiles/{profile_id}", dependencies=[Depends(require_profile_token)],
+         response_class=PlainTextResponse)
+def get_profile(profile_id: str) -> str:
+    """
+    Get one request profile as collapsed stacks (flamegraph.pl/speedscope input)
+
+    Args:
+        profile_id: Id from the X-Profile-Id response header
+
+    Returns:
+        One "frame;frame;frame count" line per sampled stack
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return to_collapsed(profile["samples"])
+
+
+@app.get("/debug/slow-requests", dependencies=[Depends(require_profile_token)])
+def get_slow_requests() -> List[Dict[str, Any]]:
+    """
+    Get the most recent slow requests served by this worker
+
+    Returns:
+        List of request traces, oldest first
+    """
+    return list(slow_request_log)
+
+
 @app.get("/seasons")
-async def get_seasons(
+def get_seasons(
     limit: Optional[int] = None,
     offset: Optional[int] = None,
     f1_service: F1APIService = Depends(get_f1_service)
@@ -151,7 +690,7 @@ async def get_seasons(
 
 
 @app.get("/seasons/{year}/races")
-async def get_races(
+def get_races(
     year: int,
     f1_service: F1APIService = Depends(get_f1_service)
 ) -> Dict[str, Any]:
@@ -169,7 +708,7 @@ async def get_races(
 
 
 @app.get("/seasons/{year}/drivers")
-async def get_season_drivers(
+def get_season_drivers(
     year: int,
     f1_service: F1APIService = Depends(get_f1_service)
 ) -> Dict[str, Any]:
@@ -187,7 +726,7 @@ async def get_season_drivers(
 
 
 @app.get("/seasons/{year}/constructors")
-async def get_season_constructors(
+def get_season_constructors(
     year: int,
     f1_service: F1APIService = Depends(get_f1_service)
 ) -> Dict[str, Any]:
@@ -205,7 +744,7 @@ async def get_season_constructors(
 
 
 @app.get("/seasons/{year}/standings/drivers")
-async def get_driver_standings(
+def get_driver_standings(
     year: int,
     round_num: Optional[int] = None,
     f1_service: F1APIService = Depends(get_f1_service)
@@ -229,7 +768,7 @@ async def get_driver_standings(
 
 
 @app.get("/seasons/{year}/standings/constructors")
-async def get_constructor_standings(
+def get_constructor_standings(
     year: int,
     round_num: Optional[int] = None,
     f1_service: F1APIService = Depends(get_f1_service)
@@ -253,7 +792,7 @@ async def get_constructor_standings(
 
 
 @app.get("/seasons/{year}/{round_num}/results")
-async def get_race_results(
+def get_race_results(
     year: int,
     round_num: int,
     f1_service: F1APIService = Depends(get_f1_service)
@@ -269,11 +808,21 @@ async def get_race_results(
         Dict containing race results data
     """
     endpoint = f"{year}/{round_num}/results.json"
-    return f1_service.make_request(endpoint)
+    data = f1_service.make_request(endpoint)
+    try:
+        # Only races whose results changed are written, so cache hits stay read-only
+        results_store = get_results_store()
+        for season, race_round in results_store.ingest_changed(data):
+            get_circuit_stats().apply_round(results_store, season, race_round)
+    except Exception as e:
+        logger.warning("Could not store results for %s: %s", endpoint, e)
+    if prefetch_scheduler is not None:
+        prefetch_scheduler.notify_results(year, round_num)
+    return data
 
 
 @app.get("/seasons/{year}/{round_num}/qualifying")
-async def get_qualifying_results(
+def get_qualifying_results(
     year: int,
     round_num: int,
     f1_service: F1APIService = Depends(get_f1_service)
@@ -292,12 +841,209 @@ async def get_qualifying_results(
     return f1_service.make_request(endpoint)
 
 
-if __name__ == "__main__":
-    # Run the server when executed directly
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
\ No newline at end of file
+@app.get("/query/results")
+def query_results(
+    driver: Optional[str] = None,
+    constructor: Optional[str] = None,
+    circuit: Optional[str] = None,
+    season_from: Optional[int] = None,
+    season_to: Optional[int] = None,
+    position_from: Optional[int] = None,
+    position_to: Optional[int] = None,
+    status: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_QUERY_LIMIT),
+    cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Filter race results in the local results store
+
+    Answered from secondary indexes over locally stored results, without
+    contacting the Ergast API. Load the store with
+    `python -m src.api.results_store`.
+
+    Args:
+        driver: Ergast driverId, e.g. hamilton
+        constructor: Ergast constructorId, e.g. ferrari
+        circuit: Ergast circuitId, e.g. monza
+        season_from: First season (inclusive)
+        season_to: Last season (inclusive)
+        position_from: Best finishing position (inclusive)
+        position_to: Worst finishing position (inclusive)
+        status: Exact finishing status, e.g. Finished
+        limit: Maximum number of results to return
+        cursor: next_cursor from the previous page
+
+    Returns:
+        Dict containing the matching results and the cursor of the next page
+    """
+    try:
+        return get_results_store().query(
+            driver=driver, constructor=constructor, circuit=circuit,
+            season_from=season_from, season_to=season_to,
+            position_from=position_from, position_to=position_to,
+            status=status, limit=limit, cursor=cursor
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/circuits/{circuit_id}/stats")
+def get_circuit_statistics(circuit_id: str) -> Dict[str, Any]:
+    """
+    Get historical statistics for a circuit
+
+    Served from precomputed aggregates over the local results store,
+    without contacting the Ergast API.
+
+    Args:
+        circuit_id: Ergast circuitId, e.g. monza
+
+    Returns:
+        Dict containing winner grid positions, average positions gained,
+        pole conversion rate and DNF rate
+    """
+    stats = get_circuit_stats().get(circuit_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"No results stored for circuit {circuit_id}")
+    return stats
+
+
+def _live_response(topics: List[str]) -> StreamingResponse:
+    return StreamingResponse(
+        get_live_hub().stream(topics),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/live/seasons/{year}")
+async def live_season_standings(year: int) -> StreamingResponse:
+    """
+    Stream driver and constructor standings updates for a season
+
+    Server-sent events: a `snapshot` of each standings table, then a `diff`
+    with the changed rows whenever the standings change. All subscribers
+    share one upstream poll per table.
+
+    Args:
+        year: The F1 season year
+
+    Returns:
+        text/event-stream of snapshot and diff events
+    """
+    return _live_response([f"{year}/driverStandings.json", f"{year}/constructorStandings.json"])
+
+
+@app.get("/live/seasons/{year}/{round_num}")
+async def live_race_results(year: int, round_num: int) -> StreamingResponse:
+    """
+    Stream results updates for a race
+
+    Server-sent events: a `snapshot` of the results, then a `diff` with the
+    changed rows whenever they change (e.g. when results are published or
+    amended after penalties).
+
+    Args:
+        year: The F1 season year
+        round_num: The race round number in the season
+
+    Returns:
+        text/event-stream of snapshot and diff events
+    """
+    return _live_response([f"{year}/{round_num}/results.json"])
+
+
+@app.get("/live/stats")
+async def get_live_stats() -> Dict[str, Any]:
+    """
+    Get live update subscribers and poller statistics for this worker
+
+    Returns:
+        Dict containing subscribers per topic and poll, change and event counts
+    """
+    return get_live_hub().summary()
+
+
+class LapFeatures(BaseModel):
+    circuit: str
+    lap: int
+    total_laps: int
+    tyre_age: int = 0
+    compound: str = "MEDIUM"
+
+
+class LapTimeRequest(BaseModel):
+    laps: List[LapFeatures]
+
+
+class Entrant(BaseModel):
+    driverId: str
+    grid: int
+    qualifying_gap: float = 0.0
+    recent_form: float = 0.0
+
+
+class RaceWinnerRequest(BaseModel):
+    entrants: List[Entrant]
+
+
+@app.post("/predict/lap-times")
+async def predict_lap_times(request: LapTimeRequest) -> Dict[str, Any]:
+    """
+    Predict lap times
+
+    Concurrent requests are micro-batched into one model call.
+
+    Args:
+        request: Laps with circuit, lap number, race length, tyre age and compound
+
+    Returns:
+        Dict containing one predicted lap time in seconds per lap
+    """
+    predictor = await get_predictor("lap_times")
+    try:
+        predictions = await predictor.predict([lap.model_dump() for lap in request.laps])
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"lap_times": predictions}
+
+
+@app.post("/predict/race-winner")
+async def predict_race_winner(request: RaceWinnerRequest) -> Dict[str, Any]:
+    """
+    Predict each entrant's probability of winning a race
+
+    Concurrent requests are micro-batched into one model call.
+
+    Args:
+        request: Entrants with grid slot, qualifying gap to pole and recent form
+
+    Returns:
+        Dict containing entrants ordered by win probability
+    """
+    if not request.entrants:
+        raise HTTPException(status_code=422, detail="At least one entrant is required")
+    predictor = await get_predictor("race_winner")
+    entrants = [entrant.model_dump() for entrant in request.entrants]
+    try:
+        probabilities = await predictor.predict(entrants)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    predictions = [
+        {"driverId": entrant["driverId"], "probability": probability}
+        for entrant, probability in zip(entrants, probabilities)
+    ]
+    predictions.sort(key=lambda prediction: prediction["probability"], reverse=True)
+    return {"predictions": predictions}
+
+
+@app.get("/predict/metrics")
+async def get_prediction_metrics() -> Dict[str, Any]:
+    """
+    Get batching and latency metrics of the loaded models
+
+    Returns:
+        Dict mapping model name to its request, batch-size and latency metrics
+    """
+    return {name: predictor.metrics() for name, predictor in list(_predictors.items())}
+
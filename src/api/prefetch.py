@@ -0,0 +1,348 @@
+"""
+Cache warming and predictive prefetch for the F1 Analytics Workshop API
+
+PrefetchScheduler runs in the background of each API worker and fills the
+shared cache before users ask for data:
+
+- On startup it warms a configurable set of hot keys for the current
+  season (by default its races, driver and constructor standings) and the
+  results of the latest completed round.
+- When round N results are requested it prefetches rounds N-1 and N+1,
+  skipping rounds that have not been raced yet.
+- Shortly after each scheduled race end time it polls for the newly
+  published results and refreshes the season standings once they appear.
+
+Every upstream request goes through a budget; when the budget is spent,
+prefetch work is dropped rather than delayed. Keys that are already cached
+never cost budget. The API uses a SharedRequestBudget kept in the shared
+cache backend, so the budget covers all workers rather than each one.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Hot keys warmed on startup; {season} is replaced with the current season
+DEFAULT_WARM_KEYS = (
+    "{season}/races.json",
+    "{season}/driverStandings.json",
+    "{season}/constructorStandings.json",
+)
+
+# Assumed race length when computing when results may be published
+RACE_DURATION = timedelta(hours=2)
+
+
+class RequestBudget:
+    """
+    Strict sliding-window limit on upstream requests
+
+    At most max_requests may be acquired in any period of `period` seconds.
+    """
+
+    def __init__(self, max_requests: int, period: float, clock: Callable[[], float] = time.monotonic):
+        self.max_requests = max_requests
+        self.period = period
+        self._clock = clock
+        self._times: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        while self._times and self._times[0] <= now - self.period:
+            self._times.popleft()
+
+    def try_acquire(self) -> bool:
+        """Spend one request from the budget, returning False if none is left"""
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            if len(self._times) >= self.max_requests:
+                return False
+            self._times.append(now)
+            return True
+
+    def remaining(self) -> int:
+        """Return how many requests can be made right now"""
+        with self._lock:
+            self._expire(self._clock())
+            return self.max_requests - len(self._times)
+
+
+class SharedRequestBudget:
+    """
+    Limit on upstream requests shared by every worker using a cache backend
+
+    At most max_requests may be acquired in each fixed window of `period`
+    seconds, counted in the cache so all workers draw from one budget.
+    Backends that cannot share counters fall back to a per-worker
+    RequestBudget.
+    """
+
+    def __init__(self, cache: Any, max_requests: int, period: float,
+                 key: str = "prefetch-budget", clock: Callable[[], float] = time.time):
+        self.cache = cache
+        self.max_requests = max_requests
+        self.period = period
+        self.key = key
+        self._clock = clock
+        self._local = RequestBudget(max_requests, period)
+        self._shared = True
+
+    def _window_key(self) -> str:
+        return f"{self.key}:{int(self._clock() // self.period)}"
+
+    def try_acquire(self) -> bool:
+        """Spend one request from the budget, returning False if none is left"""
+        try:
+            count = self.cache.incr(self._window_key(), self.period)
+        except Exception as e:
+            logger.warning("Shared prefetch budget unavailable, using local budget: %s", e)
+            count = None
+        self._shared = count is not None
+        if not self._shared:
+            return self._local.try_acquire()
+        return count <= self.max_requests
+
+    def remaining(self) -> int:
+        """Return how many requests can be made right now"""
+        if not self._shared:
+            return self._local.remaining()
+        try:
+            count = self.cache.get(self._window_key())
+        except Exception:
+            return self._local.remaining()
+        return max(0, self.max_requests - int(count or 0))
+
+
+def race_start(race: Dict[str, Any]) -> Optional[datetime]:
+    """Return the scheduled start of an Ergast race entry as an aware UTC datetime"""
+    date = race.get("date")
+    if not date:
+        return None
+    race_time = race.get("time", "00:00:00Z").rstrip("Z")
+    try:
+        return datetime.fromisoformat(f"{date}T{race_time}").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def has_results(data: Optional[Dict[str, Any]]) -> bool:
+    """Return whether an Ergast results response contains any results"""
+    if not data:
+        return False
+    races = data.get("MRData", {}).get("RaceTable", {}).get("Races", [])
+    return any(race.get("Results") for race in races)
+
+
+class PrefetchScheduler:
+    """Background cache warmer with predictive prefetch and result polling"""
+
+    def __init__(
+        self,
+        service: Any,
+        budget: Any,
+        warm_keys: Iterable[str] = DEFAULT_WARM_KEYS,
+        season: Optional[int] = None,
+        poll_interval: float = 300,
+        poll_window: timedelta = timedelta(hours=6),
+        now: Callable[[], datetime] = lambda: datetime.now(timezone.utc)
+    ):
+        """
+        Args:
+            service: F1APIService backed by the shared cache
+            budget: Upstream request budget for all prefetch work
+            warm_keys: Endpoints warmed on startup ({season} is substituted)
+            season: Season to warm (default: the current calendar year,
+                re-read on every poll)
+            poll_interval: Seconds between checks for newly published results
+            poll_window: How long after a race ends to keep polling for results
+            now: Clock returning the current UTC time
+        """
+        self.service = service
+        self.budget = budget
+        self.warm_keys = list(warm_keys)
+        self.poll_interval = poll_interval
+        self.poll_window = poll_window
+        self._now = now
+        self._season = season
+
+        self.stats = {"fetched": 0, "skipped_cached": 0, "skipped_budget": 0, "errors": 0}
+        self._schedules: Dict[int, List[Dict[str, Any]]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued: Set[Tuple[str, bool]] = set()
+        self._queued_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def season(self) -> int:
+        """The season being warmed and polled"""
+        return self._season if self._season is not None else self._now().year
+
+    # Scheduling
+
+    def enqueue(self, endpoint: str, refresh: bool = False) -> None:
+        """
+        Queue an endpoint for background fetching
+
+        Safe to call from any thread. Duplicate requests already waiting
+        in the queue are ignored.
+        """
+        if self._queue is None or self._loop is None:
+            return
+        item = (endpoint, refresh)
+        with self._queued_lock:
+            if item in self._queued:
+                return
+            self._queued.add(item)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._queue.put_nowait(item)
+        else:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+
+    def notify_results(self, year: int, round_num: int) -> None:
+        """Prefetch the neighbouring rounds of a results request that has been raced"""
+        for neighbour in (round_num + 1, round_num - 1):
+            if neighbour >= 1 and self._is_raced(year, neighbour):
+                self.enqueue(f"{year}/{neighbour}/results.json")
+
+    def warm(self) -> None:
+        """Queue the hot keys and the latest completed round's results"""
+        season = self.season
+        for template in self.warm_keys:
+            self.enqueue(template.format(season=season))
+        latest = self._latest_raced_round(season)
+        if latest is not None:
+            self.enqueue(f"{season}/{latest}/results.json")
+
+    def poll_results(self) -> None:
+        """Queue refreshes for races that ended recently but have no cached results"""
+        now = self._now()
+        season = self.season
+        for race in self._schedule(season):
+            start = race_start(race)
+            if start is None:
+                continue
+            end = start + RACE_DURATION
+            if not end <= now <= end + self.poll_window:
+                continue
+            endpoint = f"{season}/{race['round']}/results.json"
+            if not has_results(self.service.get_cached(endpoint, allow_stale=True)):
+                self.enqueue(endpoint, refresh=True)
+
+    # Schedule helpers
+
+    def _schedule(self, year: int) -> List[Dict[str, Any]]:
+        """Return the race schedule for a season from memory or the cache"""
+        if year not in self._schedules:
+            data = self.service.get_cached(f"{year}/races.json", allow_stale=True)
+            if data is None:
+                return []
+            self._remember_schedule(year, data)
+        return self._schedules[year]
+
+    def _remember_schedule(self, year: int, data: Dict[str, Any]) -> None:
+        self._schedules[year] = data.get("MRData", {}).get("RaceTable", {}).get("Races", [])
+
+    def _is_raced(self, year: int, round_num: int) -> bool:
+        for race in self._schedule(year):
+            if str(race.get("round")) == str(round_num):
+                start = race_start(race)
+                return start is not None and start + RACE_DURATION <= self._now()
+        return False
+
+    def _latest_raced_round(self, year: int) -> Optional[int]:
+        latest = None
+        for race in self._schedule(year):
+            start = race_start(race)
+            if start is not None and start + RACE_DURATION <= self._now():
+                latest = max(latest or 0, int(race["round"]))
+        return latest
+
+    # Fetching
+
+    async def process(self, endpoint: str, refresh: bool = False) -> None:
+        """Fetch one endpoint into the cache, respecting the request budget"""
+        get_cached = self.service.get_cached
+        if not refresh and await asyncio.to_thread(get_cached, endpoint) is not None:
+            self.stats["skipped_cached"] += 1
+        elif not self.budget.try_acquire():
+            self.stats["skipped_budget"] += 1
+            logger.debug("Prefetch budget exhausted, dropping %s", endpoint)
+            return
+        else:
+            fetch = self.service.refresh if refresh else self.service.make_request
+            try:
+                await asyncio.to_thread(fetch, endpoint)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning("Prefetch of %s failed: %s", endpoint, e)
+                return
+            self.stats["fetched"] += 1
+
+        year = endpoint.split("/", 1)[0]
+        if endpoint.endswith("/races.json") and year.isdigit():
+            year = int(year)
+            first_load = year not in self._schedules
+            data = await asyncio.to_thread(get_cached, endpoint)
+            if data is not None:
+                self._remember_schedule(year, data)
+                if first_load and year == self.season:
+                    latest = self._latest_raced_round(year)
+                    if latest is not None:
+                        self.enqueue(f"{year}/{latest}/results.json")
+        elif (refresh and year.isdigit()
+              and has_results(await asyncio.to_thread(get_cached, endpoint))):
+            # New results change the standings
+            self.enqueue(f"{year}/driverStandings.json", refresh=True)
+            self.enqueue(f"{year}/constructorStandings.json", refresh=True)
+
+    async def _worker(self) -> None:
+        while True:
+            endpoint, refresh = await self._queue.get()
+            with self._queued_lock:
+                self._queued.discard((endpoint, refresh))
+            try:
+                await self.process(endpoint, refresh)
+            finally:
+                self._queue.task_done()
+
+    async def _poller(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            # Reading schedules and cached results blocks on the cache backend
+            await asyncio.to_thread(self.poll_results)
+
+    # Lifecycle
+
+    async def start(self) -> None:
+        """Start the background worker and poller, then warm the hot keys"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()), asyncio.create_task(self._poller())]
+        await asyncio.to_thread(self.warm)
+
+    async def stop(self) -> None:
+        """Cancel background tasks"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        with self._queued_lock:
+            self._queued.clear()
+
+    async def join(self) -> None:
+        """Wait until every queued endpoint has been processed"""
+        if self._queue is not None:
+            await self._queue.join()
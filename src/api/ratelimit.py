@@ -0,0 +1,352 @@
+"""
+Rate limiting and admission control for the F1 Analytics Workshop API
+
+Outbound: every request F1APIService sends to the Ergast API first takes a
+token from an UpstreamLimiter. Callers that find no token wait in a bounded
+priority queue (interactive requests ahead of prefetch ahead of export
+traffic) and give up with RateLimitExceeded when the queue is full or their
+wait times out, instead of piling up unboundedly.
+
+Inbound: ConcurrencyLimitMiddleware caps how many requests each route runs
+at once. A few more may wait briefly for a slot; everything beyond that is
+shed immediately with 503 and a Retry-After header.
+
+Both limits are enforced per worker process; the upstream limits are split
+evenly between the F1_API_WORKERS workers so that together they stay within
+the Ergast allowance.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Outbound request priorities; lower values are served first
+INTERACTIVE = 0
+PREFETCH = 1
+EXPORT = 2
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request cannot be admitted in time"""
+
+    def __init__(self, retry_after: float, message: str = "Upstream rate limit exceeded"):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `rate` tokens per second
+
+    Not thread-safe on its own; UpstreamLimiter serialises access.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def tokens(self) -> float:
+        """Return the number of tokens currently available"""
+        self._refill()
+        return self._tokens
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """Return seconds until `tokens` tokens will be available"""
+        self._refill()
+        return max(0.0, (tokens - self._tokens) / self.rate)
+
+    def take(self) -> None:
+        """Spend one token (the caller checks wait_time() first)"""
+        self._refill()
+        self._tokens -= 1
+
+
+class UpstreamLimiter:
+    """
+    Thread-safe outbound limiter combining token buckets with a priority queue
+
+    A request is admitted when every bucket has a token. Waiting requests are
+    admitted strictly in (priority, arrival) order.
+    """
+
+    def __init__(
+        self,
+        buckets: Sequence[TokenBucket],
+        max_queue: int = 32,
+        timeout: float = 10.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            buckets: Token buckets that must all allow a request
+            max_queue: Maximum number of requests waiting for a token
+            timeout: Default seconds a request may wait before giving up
+            clock: Monotonic clock shared with the buckets
+        """
+        self.buckets = list(buckets)
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._waiters: List[Tuple[int, int]] = []
+        self._counter = itertools.count()
+        self.stats = {"admitted": 0, "rejected_queue_full": 0, "rejected_timeout": 0}
+
+    def _wait_time(self) -> float:
+        return max(bucket.wait_time() for bucket in self.buckets)
+
+    def _take(self) -> None:
+        for bucket in self.buckets:
+            bucket.take()
+        self.stats["admitted"] += 1
+
+    def _retry_after(self) -> float:
+        """Estimate how long until a newly queued request would be admitted"""
+        rate = min(bucket.rate for bucket in self.buckets)
+        return self._wait_time() + len(self._waiters) / rate
+
+    def queued(self) -> int:
+        """Return the number of requests waiting for a token"""
+        with self._cond:
+            return len(self._waiters)
+
+    def acquire(self, priority: int = INTERACTIVE, timeout: Optional[float] = None) -> None:
+        """
+        Wait for permission to send one upstream request
+
+        Args:
+            priority: INTERACTIVE, PREFETCH or EXPORT
+            timeout: Seconds to wait (default: the limiter's timeout)
+
+        Raises:
+            RateLimitExceeded: If the queue is full or the wait timed out
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = self._clock() + timeout
+        with self._cond:
+            if not self._waiters and self._wait_time() <= 0:
+                self._take()
+                return
+            if len(self._waiters) >= self.max_queue:
+                self.stats["rejected_queue_full"] += 1
+                raise RateLimitExceeded(self._retry_after())
+
+            ticket = (priority, next(self._counter))
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    remaining = deadline - self._clock()
+                    if self._waiters[0] == ticket:
+                        wait = self._wait_time()
+                        if wait <= 0:
+                            heapq.heappop(self._waiters)
+                            self._take()
+                            return
+                    else:
+                        wait = remaining
+                    if remaining <= 0:
+                        self.stats["rejected_timeout"] += 1
+                        raise RateLimitExceeded(self._retry_after())
+                    self._cond.wait(min(wait, remaining))
+            except BaseException:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                raise
+            finally:
+                # The next waiter may now be at the head of the queue
+                self._cond.notify_all()
+
+
+def create_upstream_limiter_from_env() -> UpstreamLimiter:
+    """
+    Build the outbound limiter configured by environment variables
+
+    The defaults follow the Ergast API limits of 4 requests/second and
+    200 requests/hour. The rate limits are totals for all worker processes:
+    each worker enforces its share, the limit divided by F1_API_WORKERS.
+
+    F1_API_UPSTREAM_RATE: sustained requests per second (default 4)
+    F1_API_UPSTREAM_BURST: bucket size for the per-second limit (default 4)
+    F1_API_UPSTREAM_HOURLY: requests per hour, 0 to disable (default 200)
+    F1_API_UPSTREAM_QUEUE: maximum waiting requests per worker (default 32)
+    F1_API_UPSTREAM_TIMEOUT: seconds a request may wait (default 10)
+    F1_API_WORKERS: worker processes sharing the limits (default 1)
+    """
+    workers = max(1, int(os.environ.get("F1_API_WORKERS", "1")))
+    rate = float(os.environ.get("F1_API_UPSTREAM_RATE", "4")) / workers
+    burst = max(1.0, float(os.environ.get("F1_API_UPSTREAM_BURST", "4")) / workers)
+    buckets = [TokenBucket(rate, burst)]
+    hourly = float(os.environ.get("F1_API_UPSTREAM_HOURLY", "200")) / workers
+    if hourly > 0:
+        buckets.append(TokenBucket(hourly / 3600, max(1.0, hourly)))
+    return UpstreamLimiter(
+        buckets,
+        max_queue=int(os.environ.get("F1_API_UPSTREAM_QUEUE", "32")),
+        timeout=float(os.environ.get("F1_API_UPSTREAM_TIMEOUT", "10"))
+    )
+
+
+_upstream_limiter: Optional[UpstreamLimiter] = None
+_upstream_limiter_lock = threading.Lock()
+
+
+def get_upstream_limiter() -> UpstreamLimiter:
+    """Return this process's outbound limiter, creating it on first use"""
+    global _upstream_limiter
+    if _upstream_limiter is None:
+        with _upstream_limiter_lock:
+            if _upstream_limiter is None:
+                _upstream_limiter = create_upstream_limiter_from_env()
+    return _upstream_limiter
+
+
+def set_upstream_limiter(limiter: Optional[UpstreamLimiter]) -> None:
+    """Replace the process-wide outbound limiter (None recreates it from the environment)"""
+    global _upstream_limiter
+    with _upstream_limiter_lock:
+        _upstream_limiter = limiter
+
+
+class ConcurrencyLimit:
+    """Bounded number of in-flight requests with a short, bounded wait queue"""
+
+    def __init__(self, max_concurrent: int, max_queue: int = 0, queue_timeout: float = 1.0):
+        """
+        Args:
+            max_concurrent: Requests allowed to run at once
+            max_queue: Requests allowed to wait for a slot
+            queue_timeout: Seconds a request may wait before being shed
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def acquire(self) -> bool:
+        """Take a slot, returning False if the request should be shed"""
+        if self.waiting or self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                return False
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                return False
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        self.active += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    ASGI middleware applying a ConcurrencyLimit to each route
+
+    Requests are matched to the app's route templates (e.g.
+    /seasons/{year}/races), so every year shares one limit. Requests that
+    match no route and exempt paths pass straight through.
+    """
+
+    def __init__(
+        self,
+        app,
+        max_concurrent: int = 32,
+        max_queue: int = 64,
+        queue_timeout: float = 5.0,
+        route_limits: Optional[Dict[str, Tuple[int, int]]] = None,
+        exempt: Iterable[str] = ("/", "/docs", "/redoc", "/openapi.json")
+    ):
+        """
+        Args:
+            app: The wrapped ASGI application
+            max_concurrent: Default in-flight requests per route
+            max_queue: Default waiting requests per route
+            queue_timeout: Seconds a request may wait for a slot
+            route_limits: Per-route (max_concurrent, max_queue) overrides
+            exempt: Route templates that are never limited
+        """
+        self.app = app
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.route_limits = dict(route_limits or {})
+        self.exempt = set(exempt)
+        self.limits: Dict[str, ConcurrencyLimit] = {}
+        self.shed = 0
+
+    def _route_template(self, scope) -> Optional[str]:
+        from starlette.routing import Match
+
+        router = getattr(scope.get("app"), "router", None)
+        for route in getattr(router, "routes", ()):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return None
+
+    def _limit_for(self, template: str) -> ConcurrencyLimit:
+        limit = self.limits.get(template)
+        if limit is None:
+            max_concurrent, max_queue = self.route_limits.get(
+                template, (self.max_concurrent, self.max_queue)
+            )
+            limit = ConcurrencyLimit(max_concurrent, max_queue, self.queue_timeout)
+            self.limits[template] = limit
+        return limit
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        template = self._route_template(scope)
+        if template is None or template in self.exempt:
+            await self.app(scope, receive, send)
+            return
+
+        limit = self._limit_for(template)
+        if not await limit.acquire():
+            self.shed += 1
+            await self._reject(send, limit)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limit.release()
+
+    async def _reject(self, send, limit: ConcurrencyLimit) -> None:
+        body = b'{"detail":"Server is overloaded, please retry shortly"}'
+        retry_after = str(max(1, math.ceil(limit.queue_timeout)))
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", retry_after.encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,385 @@
+"""
+Local, indexed store of race results for the F1 Analytics Workshop API
+
+Race results are kept in one SQLite table, one row per classified entry,
+clustered on (season, round, position) with secondary indexes on driverId,
+constructorId and circuitId. Filter queries such as "all podiums for
+constructor X at circuit Y since 2010" become an index range scan instead of
+a fetch of every race, and results are paged with keyset cursors over the
+clustering key, so a page costs the same wherever it starts.
+
+The store fills itself from every results response the API serves, and the
+full history can be loaded up front:
+
+    python -m src.api.results_store --from 1950 --to 2024
+"""
+
+import argparse
+import base64
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULTS_PATH = os.path.join(tempfile.gettempdir(), "f1_results.sqlite3")
+
+# Page size used when paging through Ergast results (its maximum)
+ERGAST_PAGE_SIZE = 100
+
+MAX_QUERY_LIMIT = 1000
+
+COLUMNS = (
+    "season", "round", "position", "raceName", "circuitId", "date", "driverId",
+    "constructorId", "grid", "positionText", "points", "status", "laps"
+)
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS results ("
+    "season INTEGER NOT NULL, round INTEGER NOT NULL, position INTEGER NOT NULL, "
+    "raceName TEXT, circuitId TEXT, date TEXT, driverId TEXT NOT NULL, "
+    "constructorId TEXT, grid INTEGER, positionText TEXT, points REAL, status TEXT, "
+    "laps INTEGER, PRIMARY KEY (season, round, position)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS results_driver ON results (driverId, season, round, position)",
+    "CREATE INDEX IF NOT EXISTS results_constructor "
+    "ON results (constructorId, season, round, position)",
+    "CREATE INDEX IF NOT EXISTS results_circuit ON results (circuitId, season, round, position)",
+)
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(key: Tuple[int, int, int]) -> str:
+    """Encode a (season, round, position) key as an opaque cursor"""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int, int]:
+    """Decode a cursor produced by encode_cursor()"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        season, round_num, position = json.loads(raw)
+        return int(season), int(round_num), int(position)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def _int_or_none(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _float_or_none(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def result_rows(data: Dict[str, Any]) -> List[Tuple]:
+    """Flatten an Ergast results response into rows in COLUMNS order"""
+    rows = []
+    for race in data.get("MRData", {}).get("RaceTable", {}).get("Races", []):
+        season = _int_or_none(race.get("season"))
+        round_num = _int_or_none(race.get("round"))
+        if season is None or round_num is None:
+            continue
+        circuit_id = race.get("Circuit", {}).get("circuitId")
+        for result in race.get("Results", []):
+            position = _int_or_none(result.get("position"))
+            driver_id = result.get("Driver", {}).get("driverId")
+            if position is None or driver_id is None:
+                continue
+            rows.append((
+                season, round_num, position, race.get("raceName"), circuit_id, race.get("date"),
+                driver_id, result.get("Constructor", {}).get("constructorId"),
+                _int_or_none(result.get("grid")), result.get("positionText"),
+                _float_or_none(result.get("points")), result.get("status"),
+                _int_or_none(result.get("laps")),
+            ))
+    return rows
+
+
+class ResultsStore:
+    """
+    SQLite-backed race results with secondary indexes
+
+    Safe to share between threads and worker processes; each thread gets
+    its own connection and the database runs in WAL mode.
+    """
+
+    def __init__(self, path: str = DEFAULT_RESULTS_PATH, busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        with self._connect() as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def ingest(self, data: Dict[str, Any]) -> int:
+        """
+        Store every result in an Ergast results response
+
+        Rows are upserted on (season, round, position), so re-ingesting a
+        race picks up corrections made upstream.
+
+        Returns:
+            Number of rows written
+        """
+        return self.insert_rows(result_rows(data))
+
+    def ingest_changed(self, data: Dict[str, Any]) -> List[Tuple[int, int]]:
+        """
+        Store the races of a results response whose rows differ from the stored ones
+
+        An unchanged race costs one indexed read and no write, so this is
+        cheap to call on every response served, cache hits included. A
+        changed race has all of its rows replaced, so entries that were
+        dropped upstream are removed too.
+
+        Returns:
+            (season, round) of every race written
+        """
+        races: Dict[Tuple[int, int], List[Tuple]] = {}
+        for row in result_rows(data):
+            races.setdefault((row[0], row[1]), []).append(row)
+        changed = []
+        for (season, round_num), rows in races.items():
+            rows.sort(key=lambda row: row[2])
+            stored = [tuple(row[name] for name in COLUMNS)
+                      for row in self.race_rows(season, round_num)]
+            if stored == rows:
+                continue
+            placeholders = ", ".join("?" for _ in COLUMNS)
+            with self._connect() as conn:
+                conn.execute("DELETE FROM results WHERE season = ? AND round = ?",
+                             (season, round_num))
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO results ({', '.join(COLUMNS)}) "
+                    f"VALUES ({placeholders})",
+                    rows
+                )
+            changed.append((season, round_num))
+        return changed
+
+    def insert_rows(self, rows: Iterable[Tuple]) -> int:
+        """Insert or replace rows given in COLUMNS order"""
+        rows = list(rows)
+        if not rows:
+            return 0
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with self._connect() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO results ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+                rows
+            )
+        return len(rows)
+
+    def seasons(self) -> List[int]:
+        """Return the seasons with at least one stored result"""
+        rows = self._connect().execute("SELECT DISTINCT season FROM results ORDER BY season")
+        return [row[0] for row in rows]
+
+    def rounds(self) -> List[Tuple[int, int]]:
+        """Return every stored (season, round)"""
+        rows = self._connect().execute(
+            "SELECT DISTINCT season, round FROM results ORDER BY season, round"
+        )
+        return [(row[0], row[1]) for row in rows]
+
+    def race_rows(self, season: int, round_num: int) -> List[Dict[str, Any]]:
+        """Return the stored results of one race in finishing order"""
+        rows = self._connect().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM results WHERE season = ? AND round = ? "
+            "ORDER BY position",
+            (season, round_num)
+        )
+        return [dict(row) for row in rows]
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def query(
+        self,
+        driver: Optional[str] = None,
+        constructor: Optional[str] = None,
+        circuit: Optional[str] = None,
+        season_from: Optional[int] = None,
+        season_to: Optional[int] = None,
+        position_from: Optional[int] = None,
+        position_to: Optional[int] = None,
+        status: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Filter stored results, ordered by season, round and position
+
+        Args:
+            driver: Ergast driverId
+            constructor: Ergast constructorId
+            circuit: Ergast circuitId
+            season_from: First season (inclusive)
+            season_to: Last season (inclusive)
+            position_from: Best finishing position (inclusive)
+            position_to: Worst finishing position (inclusive)
+            status: Exact finishing status, e.g. "Finished"
+            limit: Page size (at most MAX_QUERY_LIMIT)
+            cursor: next_cursor from the previous page
+
+        Returns:
+            Dict with the page of "results" and "next_cursor" (None on the last page)
+        """
+        conditions = []
+        params: List[Any] = []
+        for column, value in (("driverId", driver), ("constructorId", constructor),
+                              ("circuitId", circuit), ("status", status)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        for column, op, value in (("season", ">=", season_from), ("season", "<=", season_to),
+                                  ("position", ">=", position_from),
+                                  ("position", "<=", position_to)):
+            if value is not None:
+                conditions.append(f"{column} {op} ?")
+                params.append(value)
+        if cursor is not None:
+            conditions.append("(season, round, position) > (?, ?, ?)")
+            params.extend(decode_cursor(cursor))
+
+        limit = max(1, min(limit, MAX_QUERY_LIMIT))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._connect().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM results {where} "
+            "ORDER BY season, round, position LIMIT ?",
+            params + [limit + 1]
+        ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor((last["season"], last["round"], last["position"]))
+        return {"results": [dict(row) for row in rows], "next_cursor": next_cursor}
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_results_store: Optional[ResultsStore] = None
+_results_store_lock = threading.Lock()
+
+
+def get_results_store() -> ResultsStore:
+    """Return this process's handle on the results store, opening it on first use"""
+    global _results_store
+    if _results_store is None:
+        with _results_store_lock:
+            if _results_store is None:
+                _results_store = ResultsStore(
+                    os.environ.get("F1_API_RESULTS_PATH", DEFAULT_RESULTS_PATH)
+                )
+    return _results_store
+
+
+def set_results_store(store: Optional[ResultsStore]) -> None:
+    """Replace the process-wide results store (None reopens it from the environment)"""
+    global _results_store
+    with _results_store_lock:
+        if _results_store is not None and _results_store is not store:
+            _results_store.close()
+        _results_store = store
+
+
+def sync_season(service: Any, store: ResultsStore, season: int) -> int:
+    """
+    Load every result of one season from the Ergast API into the store
+
+    Args:
+        service: F1APIService used for the paged requests
+        store: Destination store
+        season: Season to load
+
+    Returns:
+        Number of rows written
+    """
+    written = 0
+    offset = 0
+    while True:
+        data = service.make_request(
+            f"{season}/results.json?limit={ERGAST_PAGE_SIZE}&offset={offset}"
+        )
+        written += store.ingest(data)
+        total = _int_or_none(data.get("MRData", {}).get("total")) or 0
+        offset += ERGAST_PAGE_SIZE
+        if offset >= total:
+            return written
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Load seasons of results into the local store from the command line"""
+    from datetime import datetime
+
+    parser = argparse.ArgumentParser(description="Load F1 race results into the local store")
+    parser.add_argument("--from", dest="season_from", type=int, default=1950)
+    parser.add_argument("--to", dest="season_to", type=int, default=datetime.now().year)
+    parser.add_argument("--refresh", action="store_true",
+                        help="reload seasons that are already stored")
+    parser.add_argument("--wait", type=float, default=3600,
+                        help="seconds a request may wait for the upstream rate limit")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    from .main import F1APIService
+    from .cache import get_cache
+    from .ratelimit import EXPORT, create_upstream_limiter_from_env, set_upstream_limiter
+
+    # A bulk load should wait for the rate limit rather than fail
+    limiter = create_upstream_limiter_from_env()
+    limiter.timeout = args.wait
+    set_upstream_limiter(limiter)
+
+    store = get_results_store()
+    stored = set(store.seasons())
+    current = datetime.now().year
+    service = F1APIService(cache=get_cache(), priority=EXPORT)
+    synced = []
+    for season in range(args.season_from, args.season_to + 1):
+        if season in stored and season != current and not args.refresh:
+            continue
+        rows = sync_season(service, store, season)
+        synced.append(season)
+        logger.info("Stored %d results for %d", rows, season)
+    print(f"{store.count()} results stored in {store.path}")
+
+    from ..analysis.circuits import CircuitStatsStore
+
+    # Reloaded seasons may carry amended results
+    applied = CircuitStatsStore(store.path).update(store, seasons=synced)
+    print(f"{applied} new or amended rounds applied to the circuit statistics")
+
+
+if __name__ == "__main__":
+    main()
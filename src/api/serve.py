@@ -0,0 +1,55 @@
+"""
+Production entry point for the F1 Analytics Workshop API
+
+Runs uvicorn with auto-reload disabled, so no file-watcher process is
+spawned and workers are ready as soon as the app module is imported.
+Settings come from the command line or F1_API_* environment variables:
+
+    python -m src.api --workers 4
+    F1_API_PORT=9000 python -m src.api
+"""
+
+import argparse
+import os
+from typing import List, Optional
+
+APP = "src.api.main:app"
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments, falling back to environment variables"""
+    parser = argparse.ArgumentParser(description="Run the F1 Analytics Workshop API")
+    parser.add_argument("--host", default=os.environ.get("F1_API_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("F1_API_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("F1_API_WORKERS", "1")))
+    parser.add_argument("--log-level", default=os.environ.get("F1_API_LOG_LEVEL", "info"))
+    parser.add_argument(
+        "--reload",
+        action="store_true",
+        help="Restart on code changes (development only; spawns a file watcher)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Start uvicorn serving the API"""
+    args = parse_args(argv)
+
+    # Workers read this to take their share of the upstream rate limits
+    os.environ["F1_API_WORKERS"] = str(1 if args.reload else args.workers)
+
+    # Imported here so that importing the app never pulls in the server
+    import uvicorn
+
+    uvicorn.run(
+        APP,
+        host=args.host,
+        port=args.port,
+        workers=None if args.reload else args.workers,
+        reload=args.reload,
+        log_level=args.log_level
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,450 @@
+"""
+Cached DataFrame access to F1 data for notebooks and analysis scripts
+
+    from src.data_access import load_results, load_qualifying, load_standings
+
+    results = load_results(range(1950, 2025))
+    qualifying = load_qualifying(2024)
+    standings = load_standings(2024, kind="constructors")
+
+Every loader returns a typed pandas DataFrame: ids and statuses are
+categoricals, positions and counts are nullable integers, points are floats
+and times are float seconds.
+
+Each season is cached on disk as one Parquet file per data set
+(F1_DATA_CACHE_DIR, default ~/.cache/f1_analytics), so repeat loads read
+local columnar files and never touch the network. Seasons missing from the
+cache are fetched from the Ergast API through F1APIService, several seasons
+in parallel, at export priority so interactive API traffic sharing the rate
+limiter goes first. A season's cache file is kept for good once it was
+written after the season ended; until then it is refetched once it is older
+than an hour, because the season's results keep changing.
+"""
+
+import importlib.util
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "f1_analytics")
+
+# Seconds before the current season's cache files are refetched
+CURRENT_SEASON_MAX_AGE = 3600
+
+# Seasons fetched at once on a cache miss
+DEFAULT_WORKERS = 4
+
+# Seconds a season fetch may spend waiting out upstream rate limiting
+DEFAULT_WAIT = 3600
+
+# Page size used when paging through Ergast responses (its maximum)
+PAGE_SIZE = 100
+
+RACE_COLUMNS = {
+    "season": "Int16",
+    "round": "Int8",
+    "raceName": "category",
+    "circuitId": "category",
+    "date": "datetime64[ns]",
+}
+
+RESULT_COLUMNS = {
+    **RACE_COLUMNS,
+    "driverId": "category",
+    "constructorId": "category",
+    "number": "Int16",
+    "grid": "Int16",
+    "position": "Int16",
+    "positionText": "category",
+    "points": "float64",
+    "laps": "Int16",
+    "status": "category",
+    "time": "float64",
+    "fastestLapRank": "Int16",
+    "fastestLapTime": "float64",
+}
+
+QUALIFYING_COLUMNS = {
+    **RACE_COLUMNS,
+    "driverId": "category",
+    "constructorId": "category",
+    "number": "Int16",
+    "position": "Int16",
+    "q1": "float64",
+    "q2": "float64",
+    "q3": "float64",
+}
+
+DRIVER_STANDINGS_COLUMNS = {
+    "season": "Int16",
+    "round": "Int8",
+    "position": "Int16",
+    "points": "float64",
+    "wins": "Int16",
+    "driverId": "category",
+    "constructorId": "category",
+}
+
+CONSTRUCTOR_STANDINGS_COLUMNS = {
+    "season": "Int16",
+    "round": "Int8",
+    "position": "Int16",
+    "points": "float64",
+    "wins": "Int16",
+    "constructorId": "category",
+}
+
+
+def parse_lap_time(value: Optional[str]) -> Optional[float]:
+    """Convert an Ergast lap time such as "1:23.456" to seconds"""
+    if not value:
+        return None
+    try:
+        minutes, _, seconds = value.rpartition(":")
+        return int(minutes or 0) * 60 + float(seconds)
+    except ValueError:
+        return None
+
+
+def _millis(value: Optional[Dict[str, Any]]) -> Optional[float]:
+    try:
+        return int(value["millis"]) / 1000
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _race_fields(race: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "season": race.get("season"),
+        "round": race.get("round"),
+        "raceName": race.get("raceName"),
+        "circuitId": race.get("Circuit", {}).get("circuitId"),
+        "date": race.get("date"),
+    }
+
+
+def result_records(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten an Ergast results response into one record per entry"""
+    records = []
+    for race in data.get("MRData", {}).get("RaceTable", {}).get("Races", []):
+        race_fields = _race_fields(race)
+        for result in race.get("Results", []):
+            fastest = result.get("FastestLap") or {}
+            records.append({
+                **race_fields,
+                "driverId": result.get("Driver", {}).get("driverId"),
+                "constructorId": result.get("Constructor", {}).get("constructorId"),
+                "number": result.get("number"),
+                "grid": result.get("grid"),
+                "position": result.get("position"),
+                "positionText": result.get("positionText"),
+                "points": result.get("points"),
+                "laps": result.get("laps"),
+                "status": result.get("status"),
+                "time": _millis(result.get("Time")),
+                "fastestLapRank": fastest.get("rank"),
+                "fastestLapTime": parse_lap_time((fastest.get("Time") or {}).get("time")),
+            })
+    return records
+
+
+def qualifying_records(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten an Ergast qualifying response into one record per entry"""
+    records = []
+    for race in data.get("MRData", {}).get("RaceTable", {}).get("Races", []):
+        race_fields = _race_fields(race)
+        for result in race.get("QualifyingResults", []):
+            records.append({
+                **race_fields,
+                "driverId": result.get("Driver", {}).get("driverId"),
+                "constructorId": result.get("Constructor", {}).get("constructorId"),
+                "number": result.get("number"),
+                "position": result.get("position"),
+                "q1": parse_lap_time(result.get("Q1")),
+                "q2": parse_lap_time(result.get("Q2")),
+                "q3": parse_lap_time(result.get("Q3")),
+            })
+    return records
+
+
+def standings_records(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten an Ergast driver or constructor standings response"""
+    records = []
+    for table in data.get("MRData", {}).get("StandingsTable", {}).get("StandingsLists", []):
+        fields = {"season": table.get("season"), "round": table.get("round")}
+        for entry in table.get("DriverStandings", []):
+            constructors = entry.get("Constructors") or [{}]
+            records.append({
+                **fields,
+                "position": entry.get("position"),
+                "points": entry.get("points"),
+                "wins": entry.get("wins"),
+                "driverId": entry.get("Driver", {}).get("driverId"),
+                "constructorId": constructors[-1].get("constructorId"),
+            })
+        for entry in table.get("ConstructorStandings", []):
+            records.append({
+                **fields,
+                "position": entry.get("position"),
+                "points": entry.get("points"),
+                "wins": entry.get("wins"),
+                "constructorId": entry.get("Constructor", {}).get("constructorId"),
+            })
+    return records
+
+
+def typed_frame(
+    records: Union[List[Dict[str, Any]], pd.DataFrame],
+    columns: Dict[str, str]
+) -> pd.DataFrame:
+    """
+    Build a DataFrame with the given column dtypes
+
+    Numeric columns are parsed from Ergast's strings; values that are not
+    numbers (e.g. a position of "R") become missing.
+    """
+    frame = pd.DataFrame(records, columns=list(columns))
+    for column, dtype in columns.items():
+        values = frame[column]
+        if dtype == "category":
+            frame[column] = values.astype("string").astype("category")
+        elif dtype.startswith("datetime"):
+            frame[column] = pd.to_datetime(values, errors="coerce").astype(dtype)
+        elif dtype == "float64":
+            frame[column] = pd.to_numeric(values, errors="coerce").astype("float64")
+        else:
+            frame[column] = pd.to_numeric(values, errors="coerce").round().astype(dtype)
+    return frame
+
+
+class DataSet:
+    """How one kind of data is requested, flattened and typed"""
+
+    def __init__(
+        self,
+        name: str,
+        endpoint: str,
+        records: Callable[[Dict[str, Any]], List[Dict[str, Any]]],
+        columns: Dict[str, str]
+    ):
+        """
+        Args:
+            name: Cache subdirectory
+            endpoint: Ergast endpoint with a {season} placeholder
+            records: Flattens one response page into records
+            columns: Column dtypes of the resulting frame
+        """
+        self.name = name
+        self.endpoint = endpoint
+        self.records = records
+        self.columns = columns
+
+
+RESULTS = DataSet("results", "{season}/results.json", result_records, RESULT_COLUMNS)
+QUALIFYING = DataSet("qualifying", "{season}/qualifying.json", qualifying_records,
+                     QUALIFYING_COLUMNS)
+DRIVER_STANDINGS = DataSet("driver_standings", "{season}/driverStandings.json",
+                           standings_records, DRIVER_STANDINGS_COLUMNS)
+CONSTRUCTOR_STANDINGS = DataSet("constructor_standings", "{season}/constructorStandings.json",
+                                standings_records, CONSTRUCTOR_STANDINGS_COLUMNS)
+
+
+def cache_dir_from_env() -> str:
+    """Return F1_DATA_CACHE_DIR, or the default cache directory"""
+    return os.environ.get("F1_DATA_CACHE_DIR") or DEFAULT_CACHE_DIR
+
+
+def _cache_path(cache_dir: str, dataset: DataSet, season: int) -> str:
+    return os.path.join(cache_dir, dataset.name, f"{season}.parquet")
+
+
+def _is_fresh(path: str, season: int) -> bool:
+    if not os.path.exists(path):
+        return False
+    modified = os.path.getmtime(path)
+    # Only files written after the season ended hold its final results
+    if datetime.fromtimestamp(modified).year > season:
+        return True
+    return time.time() - modified < CURRENT_SEASON_MAX_AGE
+
+
+def _write_parquet(frame: pd.DataFrame, path: str) -> None:
+    """Write atomically, so concurrent readers never see a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _new_service() -> Any:
+    from .api.cache import get_cache
+    from .api.main import F1APIService
+    from .api.ratelimit import EXPORT
+
+    return F1APIService(cache=get_cache(), priority=EXPORT)
+
+
+def _request(service: Any, endpoint: str, wait: float) -> Dict[str, Any]:
+    """Make one request, sleeping through rate-limit rejections for up to `wait` seconds"""
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            return service.make_request(endpoint)
+        except Exception as e:
+            if getattr(e, "status_code", None) != 429:
+                raise
+            retry_after = float((getattr(e, "headers", None) or {}).get("Retry-After", 1))
+            if time.monotonic() + retry_after > deadline:
+                raise
+            time.sleep(retry_after)
+
+
+def fetch_season(
+    dataset: DataSet,
+    season: int,
+    service: Any = None,
+    wait: float = DEFAULT_WAIT
+) -> pd.DataFrame:
+    """
+    Fetch one season of a data set from the Ergast API, page by page
+
+    Args:
+        dataset: What to fetch
+        season: Season to fetch
+        service: F1APIService to use (default: a new export-priority service)
+        wait: Seconds the fetch may spend waiting for the upstream rate limit
+
+    Returns:
+        Typed DataFrame of the whole season
+    """
+    service = service if service is not None else _new_service()
+    endpoint = dataset.endpoint.format(season=season)
+    records = []
+    offset = 0
+    while True:
+        data = _request(service, f"{endpoint}?limit={PAGE_SIZE}&offset={offset}", wait)
+        records.extend(dataset.records(data))
+        try:
+            total = int(data.get("MRData", {}).get("total", 0))
+        except (TypeError, ValueError):
+            total = 0
+        offset += PAGE_SIZE
+        if offset >= total:
+            return typed_frame(records, dataset.columns)
+
+
+def load_seasons(
+    dataset: DataSet,
+    years: Union[int, Iterable[int]],
+    refresh: bool = False,
+    use_cache: bool = True,
+    cache_dir: Optional[str] = None,
+    service: Any = None,
+    max_workers: int = DEFAULT_WORKERS
+) -> pd.DataFrame:
+    """
+    Load seasons of a data set from the Parquet cache, fetching any that are missing
+
+    Args:
+        dataset: What to load
+        years: Season or seasons to load
+        refresh: Refetch every season instead of reading the cache
+        use_cache: Read and write the Parquet cache (requires pyarrow)
+        cache_dir: Cache directory (default: F1_DATA_CACHE_DIR or ~/.cache/f1_analytics)
+        service: F1APIService shared by every fetch (default: one per season)
+        max_workers: Seasons fetched at once
+
+    Returns:
+        Typed DataFrame of every requested season, in season order
+    """
+    seasons = [years] if isinstance(years, int) else sorted(set(years))
+    if use_cache and importlib.util.find_spec("pyarrow") is None:
+        raise ImportError("The Parquet cache needs pyarrow (pip install pyarrow); "
+                          "pass use_cache=False to load without caching")
+    cache_dir = cache_dir or cache_dir_from_env()
+    paths = {season: _cache_path(cache_dir, dataset, season) for season in seasons}
+    missing = [season for season in seasons
+               if refresh or not use_cache or not _is_fresh(paths[season], season)]
+
+    fetched: Dict[int, pd.DataFrame] = {}
+    if missing:
+        logger.info("Fetching %s for %d season(s) from the Ergast API", dataset.name, len(missing))
+
+        def fetch(season: int) -> pd.DataFrame:
+            frame = fetch_season(dataset, season, service)
+            if use_cache:
+                _write_parquet(frame, paths[season])
+            return frame
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing))),
+                                thread_name_prefix=f"f1-load-{dataset.name}") as executor:
+            fetched = dict(zip(missing, executor.map(fetch, missing)))
+
+    frames = [fetched[season] if season in fetched else pd.read_parquet(paths[season])
+              for season in seasons]
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return typed_frame([], dataset.columns)
+    # Categories differ between seasons, so they are rebuilt once after concatenating
+    return typed_frame(pd.concat(frames, ignore_index=True), dataset.columns)
+
+
+def load_results(years: Union[int, Iterable[int]], **options: Any) -> pd.DataFrame:
+    """
+    Load race results, one row per entry
+
+    Args:
+        years: Season or seasons to load
+        **options: See load_seasons (refresh, use_cache, cache_dir, service, max_workers)
+
+    Returns:
+        DataFrame with RESULT_COLUMNS; time is the race time in seconds
+        (classified finishers on the lead lap only) and fastestLapTime the
+        driver's fastest lap in seconds
+    """
+    return load_seasons(RESULTS, years, **options)
+
+
+def load_qualifying(years: Union[int, Iterable[int]], **options: Any) -> pd.DataFrame:
+    """
+    Load qualifying results, one row per entry
+
+    Args:
+        years: Season or seasons to load
+        **options: See load_seasons (refresh, use_cache, cache_dir, service, max_workers)
+
+    Returns:
+        DataFrame with QUALIFYING_COLUMNS; q1, q2 and q3 are lap times in seconds
+    """
+    return load_seasons(QUALIFYING, years, **options)
+
+
+def load_standings(year: int, kind: str = "drivers", **options: Any) -> pd.DataFrame:
+    """
+    Load the championship standings after the latest round of a season
+
+    Args:
+        year: Season to load
+        kind: "drivers" or "constructors"
+        **options: See load_seasons (refresh, use_cache, cache_dir, service)
+
+    Returns:
+        DataFrame with DRIVER_STANDINGS_COLUMNS or CONSTRUCTOR_STANDINGS_COLUMNS
+    """
+    datasets = {"drivers": DRIVER_STANDINGS, "constructors": CONSTRUCTOR_STANDINGS}
+    if kind not in datasets:
+        raise ValueError(f"kind must be one of {sorted(datasets)}, not {kind!r}")
+    return load_seasons(datasets[kind], year, **options)
@@ -0,0 +1,6 @@
+"""
+F1 Analytics Workshop Models Package
+
+This package provides predictive models for F1 data and the micro-batched
+inference layer used to serve them.
+"""
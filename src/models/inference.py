@@ -0,0 +1,226 @@
+"""
+Micro-batched model inference
+
+Vectorised models cost almost the same to run on 64 inputs as on one, but
+web requests arrive one at a time. MicroBatcher sits between the two: each
+predict() call queues its input, a collector groups whatever arrives within
+a short window (or until the batch is full) and hands the whole batch to a
+worker pool off the event loop, then resolves every caller with its own
+result.
+
+    batcher = MicroBatcher(lambda laps: predict_lap_times(model, laps),
+                           max_batch_size=64, max_wait=0.002)
+    lap_time = await batcher.predict({"circuit": "monza", ...})
+"""
+
+import asyncio
+import collections
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+# Number of recent request latencies kept for percentile metrics
+LATENCY_WINDOW = 10000
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """Return the q-th percentile (0-100) of values by nearest rank"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class MicroBatcher:
+    """Collect concurrent prediction requests into batches"""
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[Any]], Sequence[Any]],
+        max_batch_size: int = 64,
+        max_wait: float = 0.002,
+        workers: int = 1,
+        executor: Optional[Executor] = None,
+        name: str = "model"
+    ):
+        """
+        Args:
+            predict_batch: Maps a list of inputs to a list of results in the same order
+            max_batch_size: Largest batch handed to predict_batch
+            max_wait: Seconds the first request of a batch waits for company
+            workers: Batches allowed to run at once
+            executor: Pool running predict_batch (default: a thread pool of `workers`)
+            name: Label used in metrics and thread names
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.workers = workers
+        self.name = name
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=f"f1-{name}-inference"
+        )
+        self._owns_executor = executor is None
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._running: set = set()
+
+        self._metrics_lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.batch_sizes: Dict[int, int] = collections.Counter()
+        self._latencies: Deque[float] = collections.deque(maxlen=LATENCY_WINDOW)
+        self._batch_times: Deque[float] = collections.deque(maxlen=LATENCY_WINDOW)
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._collector is not None and not self._collector.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._collector = loop.create_task(self._collect())
+
+    async def predict(self, item: Any) -> Any:
+        """
+        Queue one input and wait for its result
+
+        Raises:
+            Whatever predict_batch raised for the batch containing item
+        """
+        self._ensure_started()
+        future = self._loop.create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> None:
+        while True:
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = self._loop.time() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    remaining = deadline - self._loop.time()
+                    if remaining <= 0:
+                        while len(batch) < self.max_batch_size and not self._queue.empty():
+                            batch.append(self._queue.get_nowait())
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                await self._slots.acquire()
+            except asyncio.CancelledError:
+                self._fail(batch)
+                raise
+            task = self._loop.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[tuple]) -> None:
+        items = [item for item, _, _ in batch]
+        start = time.perf_counter()
+        try:
+            try:
+                results = await self._loop.run_in_executor(
+                    self._executor, self.predict_batch, items
+                )
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"{self.name} returned {len(results)} results for {len(items)} inputs"
+                    )
+                outcomes = [(True, result) for result in results]
+            except Exception as e:
+                outcomes = [(False, e)] * len(batch)
+                if len(batch) > 1:
+                    # Rerun the items one by one so one bad input fails only its own request
+                    try:
+                        outcomes = await self._loop.run_in_executor(
+                            self._executor, self._isolate, items
+                        )
+                    except Exception as isolate_error:
+                        # E.g. the pool was shut down by stop(); fail the whole batch
+                        outcomes = [(False, isolate_error)] * len(batch)
+        finally:
+            self._slots.release()
+
+        end = time.perf_counter()
+        with self._metrics_lock:
+            self.requests += len(batch)
+            self.batches += 1
+            self.errors += sum(1 for ok, _ in outcomes if not ok)
+            self.batch_sizes[len(batch)] += 1
+            self._batch_times.append(end - start)
+            self._latencies.extend(end - queued for _, _, queued in batch)
+        for (_, future, _), (ok, outcome) in zip(batch, outcomes):
+            if not future.done():
+                if ok:
+                    future.set_result(outcome)
+                else:
+                    future.set_exception(outcome)
+
+    def _fail(self, entries: List[tuple]) -> None:
+        for _, future, _ in entries:
+            if not future.done():
+                future.set_exception(RuntimeError(f"{self.name} predictor stopped"))
+
+    def _isolate(self, items: List[Any]) -> List[tuple]:
+        outcomes = []
+        for item in items:
+            try:
+                outcomes.append((True, self.predict_batch([item])[0]))
+            except Exception as e:
+                outcomes.append((False, e))
+        return outcomes
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return batch-size and latency metrics (latencies in milliseconds)"""
+        with self._metrics_lock:
+            latencies = list(self._latencies)
+            batch_times = list(self._batch_times)
+            sizes = dict(sorted(self.batch_sizes.items()))
+            requests, batches, errors = self.requests, self.batches, self.errors
+
+        def ms(value):
+            return round(value * 1000, 3) if value is not None else None
+
+        return {
+            "model": self.name,
+            "requests": requests,
+            "batches": batches,
+            "errors": errors,
+            "mean_batch_size": round(requests / batches, 2) if batches else None,
+            "batch_sizes": sizes,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "latency_ms": {
+                "p50": ms(percentile(latencies, 50)),
+                "p95": ms(percentile(latencies, 95)),
+                "p99": ms(percentile(latencies, 99)),
+            },
+            "batch_time_ms": {
+                "p50": ms(percentile(batch_times, 50)),
+                "p99": ms(percentile(batch_times, 99)),
+            },
+        }
+
+    async def stop(self) -> None:
+        """Stop collecting, wait for running batches and release the worker pool"""
+        if self._collector is not None:
+            self._collector.cancel()
+            await asyncio.gather(self._collector, return_exceptions=True)
+            self._collector = None
+        # Requests that never made it into a batch would otherwise wait forever
+        while self._queue is not None and not self._queue.empty():
+            self._fail([self._queue.get_nowait()])
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
@@ -0,0 +1,150 @@
+"""
+Lap-time prediction model
+
+A ridge regression over per-lap features: a base lap time per circuit, fuel
+load (the share of the race still to run), tyre age and its square, and a
+per-compound offset. Training is closed-form and prediction is a single
+matrix product, so predicting many laps at once costs little more than
+predicting one.
+
+    model = train_lap_time_model(laps, lap_times)
+    predict_lap_times(model, [{"circuit": "monza", "lap": 10, "total_laps": 53,
+                               "tyre_age": 9, "compound": "MEDIUM"}])
+"""
+
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+COMPOUNDS = ("SOFT", "MEDIUM", "HARD", "INTERMEDIATE", "WET")
+
+
+class LapTimeModel:
+    """Fitted lap-time regression"""
+
+    def __init__(self, coef: np.ndarray, circuits: Sequence[str]):
+        """
+        Args:
+            coef: Coefficients in feature order (see features())
+            circuits: Circuit ids known to the model, in one-hot order
+        """
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.circuits = list(circuits)
+        self._circuit_index = {circuit: i for i, circuit in enumerate(self.circuits)}
+
+    @property
+    def n_features(self) -> int:
+        return len(self.circuits) + 3 + len(COMPOUNDS)
+
+    def features(self, laps: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """
+        Build the feature matrix for a list of laps
+
+        Columns: one-hot circuit, fuel fraction, tyre age, tyre age squared,
+        one-hot compound (relative to the circuit base).
+
+        Raises:
+            ValueError: If a lap names an unknown circuit or compound
+        """
+        n = len(laps)
+        n_circuits = len(self.circuits)
+        X = np.zeros((n, self.n_features))
+        circuit_idx = np.empty(n, dtype=np.int64)
+        compound_idx = np.empty(n, dtype=np.int64)
+        lap = np.empty(n)
+        total = np.empty(n)
+        tyre_age = np.empty(n)
+        for i, row in enumerate(laps):
+            try:
+                circuit_idx[i] = self._circuit_index[row["circuit"]]
+                compound_idx[i] = COMPOUNDS.index(row.get("compound", "MEDIUM").upper())
+            except (KeyError, ValueError):
+                raise ValueError(f"Unknown circuit or compound in lap {row}")
+            lap[i] = row["lap"]
+            total[i] = row["total_laps"]
+            tyre_age[i] = row.get("tyre_age", 0)
+
+        rows = np.arange(n)
+        X[rows, circuit_idx] = 1.0
+        X[:, n_circuits] = 1.0 - lap / np.maximum(total, 1)
+        X[:, n_circuits + 1] = tyre_age
+        X[:, n_circuits + 2] = tyre_age ** 2
+        X[rows, n_circuits + 3 + compound_idx] = 1.0
+        return X
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predict lap times in seconds for a feature matrix"""
+        return X @ self.coef
+
+    def save(self, path: str) -> None:
+        np.savez(path, coef=self.coef, circuits=np.array(self.circuits))
+
+    @classmethod
+    def load(cls, path: str) -> "LapTimeModel":
+        with np.load(path) as data:
+            return cls(data["coef"], data["circuits"].tolist())
+
+
+def train_lap_time_model(
+    laps: Sequence[Dict[str, Any]],
+    lap_times: Sequence[float],
+    alpha: float = 1e-3
+) -> LapTimeModel:
+    """
+    Fit a lap-time model with closed-form ridge regression
+
+    Args:
+        laps: Lap descriptions with circuit, lap, total_laps, tyre_age and compound
+        lap_times: Observed lap times in seconds
+        alpha: L2 regularisation strength
+
+    Returns:
+        Fitted LapTimeModel
+    """
+    circuits = sorted({row["circuit"] for row in laps})
+    model = LapTimeModel(np.zeros(len(circuits) + 3 + len(COMPOUNDS)), circuits)
+    X = model.features(laps)
+    y = np.asarray(lap_times, dtype=np.float64)
+    gram = X.T @ X + alpha * np.eye(X.shape[1])
+    model.coef = np.linalg.solve(gram, X.T @ y)
+    return model
+
+
+def predict_lap_times(model: LapTimeModel, laps: Sequence[Dict[str, Any]]) -> List[float]:
+    """
+    Predict lap times for a list of laps
+
+    Args:
+        model: Fitted LapTimeModel
+        laps: Lap descriptions (see LapTimeModel.features)
+
+    Returns:
+        Predicted lap times in seconds, one per lap
+    """
+    if not laps:
+        return []
+    return model.predict(model.features(laps)).tolist()
+
+
+def predict_lap_time_batch(
+    model: LapTimeModel,
+    requests: Sequence[Sequence[Dict[str, Any]]]
+) -> List[List[float]]:
+    """
+    Predict lap times for several requests with one matrix product
+
+    Args:
+        model: Fitted LapTimeModel
+        requests: One list of laps per request
+
+    Returns:
+        One list of predicted lap times per request
+    """
+    laps = [lap for request in requests for lap in request]
+    predictions = predict_lap_times(model, laps)
+    results = []
+    start = 0
+    for request in requests:
+        results.append(predictions[start:start + len(request)])
+        start += len(request)
+    return results
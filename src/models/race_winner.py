@@ -0,0 +1,145 @@
+"""
+Race-winner prediction model
+
+A conditional logit: every entrant gets a linear score from their features
+and the win probabilities of a race are the softmax of its entrants'
+scores. Many races are scored together by stacking their entrants into one
+matrix and taking a segmented softmax, so a batch of races costs one matrix
+product.
+
+Features per entrant:
+- grid: starting grid slot (0 for a pit-lane start is treated as last)
+- qualifying_gap: seconds behind pole in qualifying
+- recent_form: average points per race over recent rounds
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+FEATURES = ("grid", "qualifying_gap", "recent_form")
+
+# Grid slot assumed for pit-lane starters
+PIT_LANE_GRID = 25
+
+
+def entrant_features(entrants: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """Build the raw feature matrix for the entrants of one or more races"""
+    X = np.array([[float(entrant.get(name) or 0.0) for name in FEATURES]
+                  for entrant in entrants], dtype=np.float64).reshape(len(entrants), len(FEATURES))
+    X[X[:, 0] <= 0, 0] = PIT_LANE_GRID
+    return X
+
+
+def segment_softmax(scores: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    Softmax over consecutive segments of scores
+
+    Args:
+        scores: Scores of every entrant, races concatenated
+        offsets: Start index of each race in scores
+
+    Returns:
+        Probabilities that sum to one within each race
+    """
+    sizes = np.diff(np.append(offsets, len(scores)))
+    race_of = np.repeat(np.arange(len(offsets)), sizes)
+    shifted = np.exp(scores - np.maximum.reduceat(scores, offsets)[race_of])
+    return shifted / np.add.reduceat(shifted, offsets)[race_of]
+
+
+class RaceWinnerModel:
+    """Fitted race-winner model"""
+
+    def __init__(self, weights: np.ndarray, mean: np.ndarray, scale: np.ndarray):
+        """
+        Args:
+            weights: One weight per standardised feature
+            mean: Feature means used for standardisation
+            scale: Feature standard deviations used for standardisation
+        """
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+
+    def scores(self, X: np.ndarray) -> np.ndarray:
+        return ((X - self.mean) / self.scale) @ self.weights
+
+    def predict_proba(self, X: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+        """Return each entrant's win probability for races stacked in X"""
+        return segment_softmax(self.scores(X), offsets)
+
+    def save(self, path: str) -> None:
+        np.savez(path, weights=self.weights, mean=self.mean, scale=self.scale)
+
+    @classmethod
+    def load(cls, path: str) -> "RaceWinnerModel":
+        with np.load(path) as data:
+            return cls(data["weights"], data["mean"], data["scale"])
+
+
+def stack_races(races: Sequence[Sequence[Dict[str, Any]]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Stack the entrants of several races into one feature matrix plus offsets"""
+    sizes = [len(race) for race in races]
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.int64)
+    return entrant_features([entrant for race in races for entrant in race]), offsets
+
+
+def train_race_winner_model(
+    races: Sequence[Sequence[Dict[str, Any]]],
+    winners: Sequence[int],
+    learning_rate: float = 0.5,
+    epochs: int = 300,
+    l2: float = 1e-3
+) -> RaceWinnerModel:
+    """
+    Fit a race-winner model by gradient descent on the conditional log-likelihood
+
+    Args:
+        races: Entrants of each training race
+        winners: Index of the winner within each race
+        learning_rate: Gradient descent step size
+        epochs: Number of full-batch gradient steps
+        l2: L2 regularisation strength
+
+    Returns:
+        Fitted RaceWinnerModel
+    """
+    X, offsets = stack_races(races)
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    Z = (X - mean) / scale
+    target = np.zeros(len(X))
+    target[offsets + np.asarray(winners, dtype=np.int64)] = 1.0
+
+    weights = np.zeros(len(FEATURES))
+    for _ in range(epochs):
+        probabilities = segment_softmax(Z @ weights, offsets)
+        gradient = Z.T @ (probabilities - target) / len(races) + l2 * weights
+        weights -= learning_rate * gradient
+    return RaceWinnerModel(weights, mean, scale)
+
+
+def predict_race_winners(
+    model: RaceWinnerModel,
+    races: Sequence[Sequence[Dict[str, Any]]]
+) -> List[List[float]]:
+    """
+    Predict win probabilities for several races at once
+
+    Args:
+        model: Fitted RaceWinnerModel
+        races: Entrants of each race
+
+    Returns:
+        Per race, each entrant's win probability in input order
+    """
+    races = list(races)
+    if not races:
+        return []
+    if any(len(race) == 0 for race in races):
+        raise ValueError("Every race needs at least one entrant")
+    X, offsets = stack_races(races)
+    probabilities = model.predict_proba(X, offsets)
+    return [chunk.tolist() for chunk in np.split(probabilities, offsets[1:])]
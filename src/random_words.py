@@ -3,9 +3,23 @@
 Random Words Generator
 
 A simple utility script that outputs 100 random words.
+
+Large batches can be streamed straight to disk:
+
+    python src/random_words.py --count 10000000 --out words.txt --seed 42
 """
 
+import argparse
 import random
+import sys
+
+import numpy as np
+
+# Number of words sampled per batch when streaming
+DEFAULT_CHUNK_SIZE = 65536
+
+_word_array = None
+_vocabulary = None
 
 
 def get_word_list():
@@ -55,6 +69,19 @@ def get_word_list():
     return words
 
 
+def get_vocabulary():
+    """
+    Return the word list with duplicates removed, in first-seen order.
+
+    get_word_list() repeats a handful of words, which would make them more
+    likely to be drawn. The deduplicated tuple is built once per process.
+    """
+    global _vocabulary
+    if _vocabulary is None:
+        _vocabulary = tuple(dict.fromkeys(get_word_list()))
+    return _vocabulary
+
+
 def generate_random_words(count=100):
     """
     Generate and return a list of random words.
@@ -65,17 +92,288 @@ def generate_random_words(count=100):
     Returns:
         list: A list of randomly selected words
     """
-    words = get_word_list()
-    return random.choices(words, k=count)
+    return random.choices(get_vocabulary(), k=count)
 
 
-def main():
+class WordSampler:
+    """
+    Weighted random word sampler with O(1) draws.
+
+    The vocabulary is deduplicated once on construction and an alias table
+    (Vose's method) is built over the per-word weights, so each draw costs
+    one uniform index and one uniform float regardless of vocabulary size.
+    """
+
+    def __init__(self, words=None, weights=None, seed=None):
+        """
+        Args:
+            words (iterable): Words to sample from (default: get_word_list())
+            weights: Optional per-word weights, either a mapping of word to
+                weight or a sequence aligned with words. Weights of repeated
+                words are summed; unweighted words are sampled uniformly.
+            seed (int): Seed for the sampler's random stream
+        """
+        if words is None:
+            words = get_word_list()
+        words = list(words)
+
+        if weights is None:
+            unique = list(dict.fromkeys(words))
+            weight_values = np.ones(len(unique))
+        else:
+            if hasattr(weights, 'get'):
+                pairs = [(word, weights.get(word, 0.0)) for word in dict.fromkeys(words)]
+            else:
+                weights = list(weights)
+                if len(weights) != len(words):
+                    raise ValueError("weights must be the same length as words")
+                pairs = zip(words, weights)
+            totals = {}
+            for word, weight in pairs:
+                totals[word] = totals.get(word, 0.0) + float(weight)
+            unique = list(totals)
+            weight_values = np.array(list(totals.values()), dtype=np.float64)
+
+        if not unique:
+            raise ValueError("cannot sample from an empty vocabulary")
+        if np.any(weight_values < 0) or not np.all(np.isfinite(weight_values)):
+            raise ValueError("weights must be finite and non-negative")
+        total = weight_values.sum()
+        if total <= 0:
+            raise ValueError("at least one weight must be positive")
+
+        self.vocabulary = np.array([sys.intern(word) for word in unique], dtype=object)
+        self.probabilities = weight_values / total
+        self._prob, self._alias = self._build_alias_table(self.probabilities)
+        self._rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def _build_alias_table(probabilities):
+        """
+        Build Vose alias table arrays for the given probabilities.
+
+        Returns:
+            tuple: (prob, alias) arrays where a draw of column i keeps i with
+                probability prob[i] and otherwise yields alias[i]
+        """
+        n = len(probabilities)
+        scaled = probabilities * n
+        prob = np.ones(n, dtype=np.float64)
+        alias = np.arange(n, dtype=np.int64)
+
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] = (scaled[more] + scaled[less]) - 1.0
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+        # Whatever is left is 1.0 up to rounding error
+        return prob, alias
+
+    def __len__(self):
+        return len(self.vocabulary)
+
+    def sample_indices(self, k):
+        """
+        Draw k vocabulary indices with replacement.
+
+        Args:
+            k (int): Number of draws
+
+        Returns:
+            numpy.ndarray: Array of k indices into self.vocabulary
+        """
+        if k < 0:
+            raise ValueError("k must be non-negative")
+        columns = self._rng.integers(0, len(self._prob), size=k)
+        keep = self._rng.random(k) < self._prob[columns]
+        return np.where(keep, columns, self._alias[columns])
+
+    def sample(self, k):
+        """
+        Draw k words with replacement.
+
+        Args:
+            k (int): Number of words to draw
+
+        Returns:
+            numpy.ndarray: Object array of k words
+        """
+        return self.vocabulary.take(self.sample_indices(k))
+
+    def draw(self):
+        """
+        Draw a single word.
+
+        Returns:
+            str: A randomly selected word
+        """
+        column = int(self._rng.integers(0, len(self._prob)))
+        if self._rng.random() < self._prob[column]:
+            return self.vocabulary[column]
+        return self.vocabulary[self._alias[column]]
+
+    def sample_without_replacement(self, k):
+        """
+        Draw k distinct words, respecting the sampler's weights.
+
+        Uses Efraimidis-Spirakis keys (log(u) / w) with a partial sort, so
+        the cost is linear in the vocabulary size even when k is large.
+
+        Args:
+            k (int): Number of distinct words to draw
+
+        Returns:
+            numpy.ndarray: Object array of k distinct words
+        """
+        positive = np.count_nonzero(self.probabilities)
+        if k < 0 or k > positive:
+            raise ValueError(f"k must be between 0 and {positive}")
+        if k == 0:
+            return self.vocabulary[:0]
+
+        with np.errstate(divide='ignore'):
+            keys = np.log(self._rng.random(len(self.probabilities))) / self.probabilities
+        chosen = np.argpartition(keys, len(keys) - k)[len(keys) - k:]
+        # Order by key so the result is a weighted random permutation
+        chosen = chosen[np.argsort(keys[chosen])[::-1]]
+        return self.vocabulary.take(chosen)
+
+
+def get_word_array():
+    """
+    Return the word list as a cached NumPy array of interned strings.
+
+    The array is built once per process so bulk generation only has to
+    sample indices into it.
+    """
+    global _word_array
+    if _word_array is None:
+        _word_array = np.array([sys.intern(word) for word in get_vocabulary()], dtype=object)
+    return _word_array
+
+
+def iter_random_word_chunks(count, seed=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield random words as NumPy arrays of at most chunk_size words.
+
+    Args:
+        count (int): Total number of random words to generate
+        seed (int): Seed for the stream; the same seed and chunk_size always
+            reproduce the same words (default: None, unseeded)
+        chunk_size (int): Maximum number of words per chunk
+
+    Yields:
+        numpy.ndarray: Object arrays of randomly selected words
+    """
+    if count < 0:
+        raise ValueError("count must be non-negative")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+    words = get_word_array()
+    rng = np.random.default_rng(seed)
+    remaining = count
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        yield words.take(rng.integers(0, len(words), size=size))
+        remaining -= size
+
+
+def iter_random_words(count, seed=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream random words one at a time with bounded memory.
+
+    Args:
+        count (int): Total number of random words to generate
+        seed (int): Seed for the stream (default: None, unseeded)
+        chunk_size (int): Number of words sampled per batch
+
+    Yields:
+        str: Randomly selected words
+    """
+    for chunk in iter_random_word_chunks(count, seed=seed, chunk_size=chunk_size):
+        yield from chunk
+
+
+def generate_random_word_array(count, seed=None):
+    """
+    Generate random words in a single vectorized batch.
+
+    Args:
+        count (int): Number of random words to generate
+        seed (int): Seed for the batch (default: None, unseeded)
+
+    Returns:
+        numpy.ndarray: Object array of randomly selected words
+    """
+    if count < 0:
+        raise ValueError("count must be non-negative")
+    words = get_word_array()
+    rng = np.random.default_rng(seed)
+    return words.take(rng.integers(0, len(words), size=count))
+
+
+def write_random_words(path, count, seed=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream random words to a file, one word per line.
+
+    Args:
+        path (str): Output file path
+        count (int): Total number of random words to write
+        seed (int): Seed for the stream (default: None, unseeded)
+        chunk_size (int): Number of words sampled and written per batch
+
+    Returns:
+        int: Number of words written
+    """
+    written = 0
+    with open(path, 'w', encoding='utf-8') as fh:
+        for chunk in iter_random_word_chunks(count, seed=seed, chunk_size=chunk_size):
+            fh.write('\n'.join(chunk))
+            fh.write('\n')
+            written += len(chunk)
+    return written
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Output random words.")
+    parser.add_argument('--count', type=int, default=100,
+                        help="number of words to generate (default: 100)")
+    parser.add_argument('--out', help="stream words to this file instead of printing them")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="seed for reproducible output")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"words per write batch (default: {DEFAULT_CHUNK_SIZE})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """
     Main function to generate and print 100 random words.
     """
-    random_words = generate_random_words(100)
+    args = parse_args(argv)
+    if args.out:
+        written = write_random_words(args.out, args.count, seed=args.seed,
+                                     chunk_size=args.chunk_size)
+        print(f"Wrote {written} words to {args.out}")
+        return
+
+    if args.seed is not None:
+        random_words = list(generate_random_word_array(args.count, seed=args.seed))
+    else:
+        random_words = generate_random_words(args.count)
 
-    print("100 Random Words:")
+    print(f"{args.count} Random Words:")
     print("-" * 40)
     for i, word in enumerate(random_words, 1):
         print(f"{i:2d}. {word}")
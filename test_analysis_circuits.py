@@ -0,0 +1,240 @@
+"""
+Test suite for per-circuit historical aggregates and /circuits/{circuitId}/stats
+"""
+
+import sqlite3
+import threading
+from unittest.mock import Mock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.analysis.circuits import CircuitStatsStore, is_finisher, race_counters
+from src.api.main import app, get_f1_service
+from src.api.results_store import ResultsStore, set_results_store
+
+
+def race(season, round_num, circuit, entries):
+    """Build an Ergast race from (driverId, grid, status) in finishing order"""
+    return {"MRData": {"RaceTable": {"Races": [{
+        "season": str(season), "round": str(round_num), "raceName": f"{circuit} GP",
+        "date": f"{season}-06-01", "Circuit": {"circuitId": circuit},
+        "Results": [{
+            "position": str(position), "positionText": str(position), "points": "0",
+            "grid": str(grid), "laps": "50", "status": status,
+            "Driver": {"driverId": driver}, "Constructor": {"constructorId": "team"},
+        } for position, (driver, grid, status) in enumerate(entries, start=1)]
+    }]}}}
+
+
+# Monza 2010: won from 3rd, pole sitter 2nd, one car lapped, one retirement
+MONZA_2010 = race(2010, 8, "monza", [
+    ("alonso", 3, "Finished"), ("button", 1, "Finished"),
+    ("massa", 2, "+1 Lap"), ("hamilton", 4, "Engine"),
+])
+# Monza 2011: pole converted, pit-lane starter, two retirements
+MONZA_2011 = race(2011, 13, "monza", [
+    ("vettel", 1, "Finished"), ("button", 0, "Finished"),
+    ("alonso", 2, "Collision"), ("hamilton", 3, "Gearbox"),
+])
+SPA_2011 = race(2011, 12, "spa", [
+    ("vettel", 1, "Finished"), ("webber", 3, "Finished"),
+])
+
+
+@pytest.fixture
+def results(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.sqlite3"))
+    store.ingest(MONZA_2010)
+    store.ingest(SPA_2011)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def stats(results):
+    stats = CircuitStatsStore(results.path)
+    yield stats
+    stats.close()
+
+
+class TestRaceCounters:
+    """Test cases for the per-race counters"""
+
+    def test_finisher_statuses(self):
+        """Test which statuses count as finishing"""
+        assert is_finisher("Finished")
+        assert is_finisher("+2 Laps")
+        assert not is_finisher("Engine")
+        assert not is_finisher(None)
+
+    def test_race_counters(self):
+        """Test the counters contributed by one race"""
+        rows = [
+            {"position": 1, "grid": 3, "status": "Finished"},
+            {"position": 2, "grid": 1, "status": "Finished"},
+            {"position": 3, "grid": 2, "status": "+1 Lap"},
+            {"position": 4, "grid": 4, "status": "Engine"},
+            {"position": 5, "grid": None, "status": "Did not qualify"},
+        ]
+        counters = race_counters(rows)
+        assert counters["starters"] == 4
+        assert counters["dnfs"] == 1
+        assert counters["gained_sum"] == (3 - 1) + (1 - 2) + (2 - 3)
+        assert counters["gained_count"] == 3
+        assert counters["winner_grid"] == 3
+        assert (counters["pole_races"], counters["pole_wins"]) == (1, 0)
+
+
+class TestCircuitStatsStore:
+    """Test cases for CircuitStatsStore"""
+
+    def test_update_applies_each_round_once(self, results, stats):
+        """Test that update() folds in only rounds it has not seen"""
+        assert stats.update(results) == 2
+        assert stats.update(results) == 0
+        results.ingest(MONZA_2011)
+        assert stats.update(results) == 1
+        assert stats.applied_rounds() == {(2010, 8), (2011, 12), (2011, 13)}
+        assert stats.circuits() == ["monza", "spa"]
+
+    def test_stats_values(self, results, stats):
+        """Test the derived statistics over two races at one circuit"""
+        results.ingest(MONZA_2011)
+        stats.update(results)
+        monza = stats.get("monza")
+        assert monza["races"] == 2
+        assert (monza["first_season"], monza["last_season"]) == (2010, 2011)
+        assert monza["winner_grid"] == {"average": 2.0, "distribution": {"1": 1, "3": 1}}
+        # Finishers with a grid slot: +2, -1, -1 (2010) and 0 (2011); pit-lane start excluded
+        assert monza["average_positions_gained"] == 0.0
+        assert monza["pole_conversion_rate"] == 0.5
+        assert monza["dnf_rate"] == 3 / 8
+
+    def test_apply_round_is_idempotent(self, results, stats):
+        """Test that applying the same round twice changes nothing"""
+        assert stats.apply_round(results, 2010, 8)
+        before = stats.get("monza")
+        assert not stats.apply_round(results, 2010, 8)
+        assert not stats.apply_round(results, 1999, 1)
+        assert stats.get("monza") == before
+
+    def test_amended_results_replace_contribution(self, results, stats):
+        """Test that re-applying an amended race swaps its counters"""
+        stats.update(results)
+        # Post-race penalty: the winner is disqualified and the pole sitter inherits the win
+        amended = race(2010, 8, "monza", [
+            ("button", 1, "Finished"), ("massa", 2, "+1 Lap"),
+            ("hamilton", 4, "Engine"), ("alonso", 3, "Disqualified"),
+        ])
+        results.ingest(amended)
+        assert stats.apply_round(results, 2010, 8)
+        monza = stats.get("monza")
+        assert monza["races"] == 1
+        assert monza["winner_grid"] == {"average": 1.0, "distribution": {"1": 1}}
+        assert monza["pole_conversion_rate"] == 1.0
+        assert monza["dnf_rate"] == 0.5
+        assert not stats.apply_round(results, 2010, 8)
+        assert stats.update(results, seasons=[2010]) == 0
+
+        incremental = monza
+        stats.rebuild(results)
+        assert stats.get("monza") == incremental
+
+    def test_race_moved_to_another_circuit(self, results, stats):
+        """Test that correcting a race's circuit moves its contribution"""
+        stats.update(results)
+        rows = results.race_rows(2011, 12)
+        assert stats.apply_race(2011, 12, "monza", rows)
+        assert stats.circuits() == ["monza"]
+        assert stats.get("spa") is None
+        monza = stats.get("monza")
+        assert monza["races"] == 2
+        assert (monza["first_season"], monza["last_season"]) == (2010, 2011)
+
+    def test_rebuild_matches_incremental(self, results, stats):
+        """Test that incremental updates equal a full recomputation"""
+        stats.update(results)
+        results.ingest(MONZA_2011)
+        stats.update(results)
+        incremental = stats.get("monza")
+        assert stats.rebuild(results) == 3
+        assert stats.get("monza") == incremental
+
+    def test_concurrent_workers_apply_a_race_once(self, results):
+        """Test that two store handles applying one race count it once"""
+        first, second = CircuitStatsStore(results.path), CircuitStatsStore(results.path)
+        rows = results.race_rows(2010, 8)
+        second_read = threading.Event()
+
+        def apply_second():
+            def trace(statement):
+                if statement.startswith("INSERT OR REPLACE INTO circuit_stats_rounds"):
+                    second_read.set()
+            second._connect().set_trace_callback(trace)
+            second.apply_race(2010, 8, "monza", rows)
+
+        worker = threading.Thread(target=apply_second)
+
+        def trace(statement):
+            # Let the other worker run while this one is between its read and its write
+            if statement.startswith("INSERT OR REPLACE INTO circuit_stats_rounds"):
+                worker.start()
+                second_read.wait(0.5)
+
+        first._connect().set_trace_callback(trace)
+        first.apply_race(2010, 8, "monza", rows)
+        worker.join(10)
+
+        monza = first.get("monza")
+        assert monza["races"] == 1
+        assert monza["winner_grid"]["distribution"] == {"3": 1}
+        first.close()
+        second.close()
+
+    def test_old_schema_is_rebuilt(self, results):
+        """Test that tables without stored contributions are recreated"""
+        with sqlite3.connect(results.path) as conn:
+            conn.execute("CREATE TABLE circuit_stats_rounds (season INTEGER, round INTEGER, "
+                         "PRIMARY KEY (season, round)) WITHOUT ROWID")
+            conn.execute("INSERT INTO circuit_stats_rounds VALUES (2010, 8)")
+        stats = CircuitStatsStore(results.path)
+        assert stats.update(results) == 2
+        assert stats.get("monza")["races"] == 1
+        stats.close()
+
+    def test_unknown_circuit(self, stats):
+        """Test that circuits without races have no stats"""
+        assert stats.get("nowhere") is None
+
+
+class TestCircuitStatsEndpoint:
+    """Test cases for /circuits/{circuitId}/stats"""
+
+    @pytest.fixture
+    def client(self, results, stats):
+        stats.update(results)
+        set_results_store(results)
+        yield TestClient(app)
+        set_results_store(None)
+        app.dependency_overrides.clear()
+
+    def test_circuit_stats(self, client):
+        """Test that stats are served from the local aggregates"""
+        response = client.get("/circuits/spa/stats")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["races"] == 1
+        assert body["pole_conversion_rate"] == 1.0
+        assert client.get("/circuits/nowhere/stats").status_code == 404
+
+    def test_served_results_update_stats(self, client):
+        """Test that newly served race results are folded into the aggregates"""
+        service = Mock()
+        service.make_request.return_value = MONZA_2011
+        app.dependency_overrides[get_f1_service] = lambda: service
+        assert client.get("/circuits/monza/stats").json()["races"] == 1
+        assert client.get("/seasons/2011/13/results").status_code == 200
+        assert client.get("/circuits/monza/stats").json()["races"] == 2
+        assert client.get("/seasons/2011/13/results").status_code == 200
+        assert client.get("/circuits/monza/stats").json()["races"] == 2
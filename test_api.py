@@ -7,13 +7,35 @@ Tests for health check endpoint and other API functionality.
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, Mock
+import json
+import subprocess
 import sys
 import os
 
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+from src.api.cache import SQLiteCache, set_cache
 from src.api.main import app, F1APIService
+from src.api.results_store import ResultsStore, set_results_store
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path):
+    """Keep responses cached by route tests out of the shared cache"""
+    backend = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    set_cache(backend)
+    yield backend
+    set_cache(None)
+
+
+@pytest.fixture(autouse=True)
+def results_store(tmp_path):
+    """Keep results ingested by route tests out of the real store"""
+    store = ResultsStore(str(tmp_path / "results.sqlite3"))
+    set_results_store(store)
+    yield store
+    set_results_store(None)
 
 
 @pytest.fixture
@@ -313,6 +335,110 @@ class TestErrorHandling:
             assert "External API error" in data["detail"]
 
 
+# Cold-start budgets for a fresh worker process, in seconds
+IMPORT_TIME_BUDGET = 3.0
+FIRST_REQUEST_BUDGET = 5.0
+
+# Modules that must not be loaded just by importing the app
+DEFERRED_MODULES = ["requests", "uvicorn", "pandas", "sklearn", "matplotlib", "numpy"]
+
+STARTUP_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import src.api.main
+import_time = time.perf_counter() - start
+loaded = [name for name in {deferred!r} if name in sys.modules]
+from fastapi.testclient import TestClient
+status = TestClient(src.api.main.app).get("/").status_code
+first_request_time = time.perf_counter() - start
+print(json.dumps({{"import_time": import_time, "first_request_time": first_request_time,
+                  "loaded": loaded, "status": status}}))
+"""
+
+
+@pytest.fixture(scope="module")
+def startup():
+    """Import the app and serve one request in a new process"""
+    snippet = STARTUP_SNIPPET.format(deferred=DEFERRED_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        check=True, capture_output=True, text=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    print(f"\nimport: {result['import_time'] * 1000:.0f}ms, "
+          f"first request: {result['first_request_time'] * 1000:.0f}ms")
+    return result
+
+
+class TestStartupPerformance:
+    """Track API cold-start cost in a fresh interpreter"""
+
+    def test_heavy_modules_not_imported(self, startup):
+        """Test that importing the app defers heavy and server-only modules"""
+        assert startup["loaded"] == []
+
+    def test_import_time_within_budget(self, startup):
+        """Test that importing the app stays within the cold-start budget"""
+        assert startup["import_time"] < IMPORT_TIME_BUDGET
+
+    def test_first_request_within_budget(self, startup):
+        """Test that the first request succeeds within the cold-start budget"""
+        assert startup["status"] == 200
+        assert startup["first_request_time"] < FIRST_REQUEST_BUDGET
+
+
+class TestServeEntryPoint:
+    """Test cases for the production entry point and lazy imports"""
+
+    def test_reload_disabled_by_default(self):
+        """Test that the production entry point does not enable reload"""
+        from src.api.serve import parse_args
+
+        args = parse_args([])
+        assert args.reload is False
+        assert args.workers == 1
+
+    def test_main_runs_uvicorn_without_reload(self, monkeypatch):
+        """Test that serve.main starts uvicorn with reload off"""
+        from src.api.serve import main
+
+        # Restored on teardown; main() publishes the worker count to the workers
+        monkeypatch.delenv("F1_API_WORKERS", raising=False)
+        with patch("uvicorn.run") as mock_run:
+            main(["--workers", "4", "--port", "9000"])
+
+        _, kwargs = mock_run.call_args
+        assert mock_run.call_args[0][0] == "src.api.main:app"
+        assert kwargs["reload"] is False
+        assert kwargs["workers"] == 4
+        assert kwargs["port"] == 9000
+        assert os.environ["F1_API_WORKERS"] == "4"
+
+    def test_lazy_import_defers_loading(self, monkeypatch):
+        """Test that lazy_import only executes the module on attribute access"""
+        from src.api.lazy import lazy_import
+
+        from types import ModuleType
+
+        # Unload colorsys for this test only; the original entry (or its
+        # absence) is restored afterwards
+        monkeypatch.setitem(sys.modules, "colorsys", sys.modules.get("colorsys"))
+        monkeypatch.delitem(sys.modules, "colorsys")
+        module = lazy_import("colorsys")
+        # The module keeps its lazy class until first attribute access
+        assert object.__getattribute__(module, "__class__") is not ModuleType
+        assert module.hls_to_rgb(0, 0, 0) == (0, 0, 0)
+        assert object.__getattribute__(module, "__class__") is ModuleType
+
+    def test_lazy_import_missing_module(self):
+        """Test that lazy_import fails fast for unknown modules"""
+        from src.api.lazy import lazy_import
+
+        with pytest.raises(ModuleNotFoundError):
+            lazy_import("no_such_module_for_f1")
+
+
 if __name__ == "__main__":
     # Run tests when executed directly
     pytest.main([__file__, "-v"])
\ No newline at end of file
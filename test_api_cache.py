@@ -0,0 +1,378 @@
+"""
+Test suite for the shared API cache
+
+Tests for the SQLite and Redis-compatible cache backends and their use
+by F1APIService.
+"""
+
+import multiprocessing
+import os
+import time
+import pytest
+from unittest.mock import patch, Mock
+
+from fastapi import HTTPException, Response
+from fastapi.testclient import TestClient
+
+import src.api.main as api_main
+from src.api.cache import NullCache, RedisCache, SQLiteCache, create_cache_from_env
+from src.api.main import F1APIService, app, get_f1_service
+from src.api.ratelimit import TokenBucket, UpstreamLimiter, set_upstream_limiter
+
+
+class FakeRedis:
+    """Local stand-in for a Redis client"""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, name):
+        value, expires_at = self.store.get(name, (None, None))
+        if value is None or expires_at <= time.time():
+            return None
+        return value.encode()
+
+    def set(self, name, value, ex=None):
+        self.store[name] = (value, time.time() + (ex if ex is not None else 1e9))
+
+    def delete(self, name):
+        self.store.pop(name, None)
+
+    def incr(self, name):
+        count = int(self.get(name) or 0) + 1
+        expires_at = self.store[name][1] if count > 1 else time.time() + 1e9
+        self.store[name] = (str(count), expires_at)
+        return count
+
+    def expire(self, name, seconds):
+        self.store[name] = (self.store[name][0], time.time() + seconds)
+
+
+def _warm_cache(path, key, value):
+    """Write to the cache from a separate worker process"""
+    SQLiteCache(path).set(key, value, ttl=60)
+
+
+@pytest.fixture(autouse=True)
+def unthrottled_upstream():
+    """Keep the outbound rate limiter out of cache tests"""
+    set_upstream_limiter(UpstreamLimiter([TokenBucket(1e6, 1e6)]))
+    yield
+    set_upstream_limiter(None)
+
+
+@pytest.fixture
+def sqlite_cache(tmp_path):
+    """Create a SQLite cache in a temporary directory"""
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    yield cache
+    cache.close()
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def cache(request, tmp_path):
+    """Run a test against every shared backend"""
+    if request.param == "sqlite":
+        backend = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    else:
+        backend = RedisCache(FakeRedis())
+    yield backend
+    backend.close()
+
+
+class TestCacheBackends:
+    """Test cases shared by all cache backends"""
+
+    def test_round_trip(self, cache):
+        """Test that stored values are returned unchanged"""
+        value = {"MRData": {"RaceTable": {"season": "2023", "Races": [{"round": "1"}]}}}
+        cache.set("2023/races.json", value, ttl=60)
+        assert cache.get("2023/races.json") == value
+
+    def test_missing_key(self, cache):
+        """Test that unknown keys are misses"""
+        assert cache.get("unknown.json") is None
+
+    def test_expired_entry_is_miss(self, cache):
+        """Test that entries past their TTL are not returned"""
+        cache.set("seasons.json", {"a": 1}, ttl=60)
+        with patch("time.time", return_value=time.time() + 120):
+            assert cache.get("seasons.json") is None
+
+    def test_delete(self, cache):
+        """Test that deleted keys are misses"""
+        cache.set("seasons.json", {"a": 1}, ttl=60)
+        cache.delete("seasons.json")
+        assert cache.get("seasons.json") is None
+
+    def test_incr(self, cache):
+        """Test that counters count up and restart once expired"""
+        assert [cache.incr("budget", ttl=60) for _ in range(3)] == [1, 2, 3]
+        assert cache.get("budget") == 3
+        assert NullCache().incr("budget", ttl=60) is None
+
+
+class TestSQLiteCache:
+    """Test cases for the SQLite backend"""
+
+    def test_uses_wal_mode(self, sqlite_cache):
+        """Test that the database is switched to WAL mode"""
+        mode = sqlite_cache._connect().execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_shared_between_instances(self, tmp_path):
+        """Test that a write through one handle is visible through another"""
+        path = str(tmp_path / "cache.sqlite3")
+        first, second = SQLiteCache(path), SQLiteCache(path)
+        first.set("2023/driverStandings.json", {"x": 1}, ttl=60)
+        assert second.get("2023/driverStandings.json") == {"x": 1}
+
+    def test_warmed_by_other_process(self, sqlite_cache):
+        """Test that a fetch cached by one worker process warms the others"""
+        process = multiprocessing.Process(
+            target=_warm_cache, args=(sqlite_cache.path, "2023/races.json", {"y": 2})
+        )
+        process.start()
+        process.join(timeout=10)
+        assert process.exitcode == 0
+        assert sqlite_cache.get("2023/races.json") == {"y": 2}
+
+    def test_purge_expired(self, sqlite_cache):
+        """Test that purge_expired removes only expired rows"""
+        sqlite_cache.set("old", {}, ttl=-1)
+        sqlite_cache.set("new", {}, ttl=60)
+        assert sqlite_cache.purge_expired() == 1
+        assert sqlite_cache.get("new") == {}
+
+    def test_expired_counter_restarts(self, sqlite_cache):
+        """Test that an expired counter starts again at one"""
+        sqlite_cache.incr("budget", ttl=-1)
+        assert sqlite_cache.incr("budget", ttl=60) == 1
+        assert sqlite_cache.incr("budget", ttl=60) == 2
+
+    def test_writes_purge_expired_rows(self, tmp_path):
+        """Test that expired rows are purged every purge_interval writes"""
+        cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), purge_interval=3)
+        count = "SELECT COUNT(*) FROM cache"
+        cache.set("old", {}, ttl=-1)
+        cache.set("new", {}, ttl=60)
+        assert cache._connect().execute(count).fetchone()[0] == 2
+        cache.set("newer", {}, ttl=60)
+        assert cache._connect().execute(count).fetchone()[0] == 2
+        assert cache.get("new") == {} and cache.get("newer") == {}
+
+
+class TestCacheConfiguration:
+    """Test cases for environment-based backend selection"""
+
+    def test_default_is_sqlite(self, tmp_path):
+        """Test that SQLite is the default backend"""
+        path = str(tmp_path / "env.sqlite3")
+        with patch.dict(os.environ, {"F1_API_CACHE_PATH": path}, clear=False):
+            os.environ.pop("F1_API_CACHE_BACKEND", None)
+            cache = create_cache_from_env()
+        assert isinstance(cache, SQLiteCache)
+        assert cache.path == path
+
+    def test_none_disables_cache(self):
+        """Test that caching can be turned off"""
+        with patch.dict(os.environ, {"F1_API_CACHE_BACKEND": "none"}):
+            assert isinstance(create_cache_from_env(), NullCache)
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend name is rejected"""
+        with patch.dict(os.environ, {"F1_API_CACHE_BACKEND": "memcached"}):
+            with pytest.raises(ValueError):
+                create_cache_from_env()
+
+
+class TestServiceCaching:
+    """Test cases for F1APIService with a shared cache"""
+
+    @pytest.fixture
+    def mock_session(self):
+        """Patch requests.Session with a mock returning a fixed payload"""
+        with patch('requests.Session') as mock_session_class:
+            session = Mock()
+            response = Mock()
+            response.raise_for_status.return_value = None
+            response.json.return_value = {"MRData": {"total": "1"}}
+            session.get.return_value = response
+            mock_session_class.return_value = session
+            yield session
+
+    def test_second_request_served_from_cache(self, mock_session, cache):
+        """Test that repeated requests only hit upstream once"""
+        service = F1APIService(cache=cache)
+        assert service.make_request("2023/races.json") == {"MRData": {"total": "1"}}
+        assert service.make_request("2023/races.json") == {"MRData": {"total": "1"}}
+        assert mock_session.get.call_count == 1
+
+    def test_cache_shared_between_service_instances(self, mock_session, cache):
+        """Test that a fetch by one service instance warms the others"""
+        F1APIService(cache=cache).make_request("2023/races.json")
+        F1APIService(cache=cache).make_request("/2023/races.json")
+        assert mock_session.get.call_count == 1
+
+    def test_use_cache_false_bypasses_cache(self, mock_session, cache):
+        """Test that use_cache=False always goes upstream"""
+        service = F1APIService(cache=cache)
+        service.make_request("seasons.json?limit=1", use_cache=False)
+        service.make_request("seasons.json?limit=1", use_cache=False)
+        assert mock_session.get.call_count == 2
+        assert cache.get("seasons.json?limit=1") is None
+
+    def test_cache_failure_falls_back_to_upstream(self, mock_session):
+        """Test that a broken cache does not fail the request"""
+        broken = Mock()
+        broken.get.side_effect = RuntimeError("disk full")
+        broken.set.side_effect = RuntimeError("disk full")
+        service = F1APIService(cache=broken)
+        assert service.make_request("2023/races.json") == {"MRData": {"total": "1"}}
+
+
+class DeferredExecutor:
+    """Executor stand-in that records submissions instead of running them"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append((fn, args))
+
+    def run_all(self):
+        for fn, args in self.submitted:
+            fn(*args)
+        self.submitted = []
+
+
+class TestStaleServing:
+    """Test cases for stale-while-revalidate and stale-if-error"""
+
+    TTL = 60
+    SWR = 600
+    SIE = 3600
+
+    @pytest.fixture
+    def session(self):
+        """Patch requests.Session; upstream returns a new payload"""
+        with patch('requests.Session') as mock_session_class:
+            session = Mock()
+            response = Mock()
+            response.raise_for_status.return_value = None
+            response.json.return_value = {"version": "new"}
+            session.get.return_value = response
+            mock_session_class.return_value = session
+            yield session
+
+    @pytest.fixture
+    def executor(self, monkeypatch):
+        """Capture background revalidations"""
+        executor = DeferredExecutor()
+        monkeypatch.setattr(api_main, "_get_revalidation_executor", lambda: executor)
+        return executor
+
+    def make_service(self, cache, response=None):
+        return F1APIService(cache=cache, cache_ttl=self.TTL, stale_while_revalidate=self.SWR,
+                            stale_if_error=self.SIE, response=response)
+
+    def seed(self, cache, age):
+        """Store an 'old' payload fetched age seconds ago"""
+        cache.set("2024/driverStandings.json",
+                  {"data": {"version": "old"}, "fetched_at": time.time() - age}, ttl=1e6)
+
+    def test_fresh_entry_is_hit(self, session, sqlite_cache):
+        """Test that fresh entries are served with X-Cache: HIT"""
+        self.seed(sqlite_cache, age=10)
+        response = Response()
+        data = self.make_service(sqlite_cache, response).make_request("2024/driverStandings.json")
+        assert data == {"version": "old"}
+        assert response.headers["X-Cache"] == "HIT"
+        assert "Warning" not in response.headers
+        session.get.assert_not_called()
+
+    def test_stale_entry_served_while_revalidating(self, session, sqlite_cache, executor):
+        """Test that expired entries are returned at once and refreshed in the background"""
+        self.seed(sqlite_cache, age=self.TTL + 30)
+        response = Response()
+        service = self.make_service(sqlite_cache, response)
+
+        assert service.make_request("2024/driverStandings.json") == {"version": "old"}
+        assert response.headers["X-Cache"] == "STALE"
+        assert response.headers["X-Cache-Staleness"] == "30"
+        assert response.headers["Warning"].startswith("110")
+        session.get.assert_not_called()
+
+        executor.run_all()
+        session.get.assert_called_once()
+        assert service.make_request("2024/driverStandings.json") == {"version": "new"}
+
+    def test_single_background_refresh_per_key(self, session, sqlite_cache, executor):
+        """Test that concurrent stale reads trigger only one refresh"""
+        self.seed(sqlite_cache, age=self.TTL + 30)
+        for _ in range(5):
+            self.make_service(sqlite_cache).make_request("2024/driverStandings.json")
+        assert len(executor.submitted) == 1
+        executor.run_all()
+        assert api_main._revalidating == set()
+
+    def test_revalidation_skipped_if_refreshed_elsewhere(self, session, sqlite_cache, executor):
+        """Test that a refresh already made by another worker is not repeated"""
+        self.seed(sqlite_cache, age=self.TTL + 30)
+        self.make_service(sqlite_cache).make_request("2024/driverStandings.json")
+        self.seed(sqlite_cache, age=0)
+        executor.run_all()
+        session.get.assert_not_called()
+
+    def test_stale_if_error(self, session, sqlite_cache):
+        """Test that the last good value is served when upstream fails"""
+        import requests
+
+        session.get.side_effect = requests.RequestException("upstream down")
+        self.seed(sqlite_cache, age=self.TTL + self.SWR + 100)
+        response = Response()
+        data = self.make_service(sqlite_cache, response).make_request("2024/driverStandings.json")
+        assert data == {"version": "old"}
+        assert response.headers["X-Cache"] == "STALE-IF-ERROR"
+        assert response.headers["Warning"].startswith("111")
+        assert int(response.headers["X-Cache-Staleness"]) == self.SWR + 100
+
+    def test_too_stale_raises(self, session, sqlite_cache):
+        """Test that entries past the stale-if-error window are not served"""
+        import requests
+
+        session.get.side_effect = requests.RequestException("upstream down")
+        self.seed(sqlite_cache, age=self.TTL + self.SIE + 1)
+        with pytest.raises(HTTPException):
+            self.make_service(sqlite_cache).make_request("2024/driverStandings.json")
+
+    def test_get_cached_ignores_stale_by_default(self, session, sqlite_cache):
+        """Test that get_cached only returns stale entries when allowed"""
+        self.seed(sqlite_cache, age=self.TTL + 1)
+        service = self.make_service(sqlite_cache)
+        assert service.get_cached("2024/driverStandings.json") is None
+        assert service.get_cached("2024/driverStandings.json", allow_stale=True) == {"version": "old"}
+
+    def test_get_cached_max_age(self, session, sqlite_cache):
+        """Test that get_cached can demand entries fresher than the TTL"""
+        self.seed(sqlite_cache, age=20)
+        service = self.make_service(sqlite_cache)
+        assert service.get_cached("2024/driverStandings.json", max_age=10) is None
+        assert service.get_cached("2024/driverStandings.json", max_age=30) == {"version": "old"}
+
+    def test_staleness_headers_on_route(self, session, sqlite_cache, executor):
+        """Test that the standings endpoint exposes staleness headers"""
+        self.seed(sqlite_cache, age=self.TTL + 5)
+
+        def override(response: Response):
+            return self.make_service(sqlite_cache, response)
+
+        app.dependency_overrides[get_f1_service] = override
+        try:
+            response = TestClient(app).get("/seasons/2024/standings/drivers")
+        finally:
+            app.dependency_overrides.clear()
+        assert response.status_code == 200
+        assert response.json() == {"version": "old"}
+        assert response.headers["x-cache"] == "STALE"
+        assert response.headers["age"] == str(self.TTL + 5)
@@ -0,0 +1,197 @@
+"""
+Test suite for request diagnostics: slow-request log and on-demand profiling
+"""
+
+import logging
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import src.api.diagnostics as diagnostics
+from src.api.diagnostics import (
+    DiagnosticsMiddleware, ProfileStore, RequestTrace, record_upstream_call, to_collapsed
+)
+from src.api.main import F1APIService, app as api_app
+from src.api.ratelimit import TokenBucket, UpstreamLimiter, set_upstream_limiter
+
+
+def busy_handler_work(seconds):
+    """Spin the CPU so the profiler has something to sample"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def build_app(**options):
+    """Build a small app with one traced, synchronous route"""
+    app = FastAPI()
+
+    @app.get("/items/{item}")
+    def get_item(item: int, spin: float = 0):
+        record_upstream_call(f"items/{item}.json", 0.25, "MISS", wait=0.05, fetch=0.2,
+                             payload_bytes=512)
+        busy_handler_work(spin)
+        return {"item": item}
+
+    app.add_middleware(DiagnosticsMiddleware, **options)
+    return app
+
+
+class TestSlowRequestLog:
+    """Test cases for the always-on slow-request log"""
+
+    def test_slow_request_logged_with_trace(self, caplog):
+        """Test that slow requests log route, timings, cache status and sizes"""
+        slow = []
+        client = TestClient(build_app(slow_request_ms=0, slow_requests=slow))
+        with caplog.at_level(logging.WARNING, logger="src.api.diagnostics"):
+            response = client.get("/items/7")
+
+        assert response.status_code == 200
+        assert len(slow) == 1
+        record = slow[0]
+        assert record["route"] == "/items/{item}"
+        assert record["path"] == "/items/7"
+        assert record["status"] == 200
+        assert record["response_bytes"] == len(response.content)
+        assert record["upstream"] == [{
+            "endpoint": "items/7.json", "cache": "MISS", "ms": 250.0,
+            "wait_ms": 50.0, "fetch_ms": 200.0, "bytes": 512,
+        }]
+        assert "Slow request" in caplog.text
+        assert '"route":"/items/{item}"' in caplog.text
+
+    def test_fast_request_not_logged(self):
+        """Test that requests under the threshold are not recorded"""
+        slow = []
+        client = TestClient(build_app(slow_request_ms=60000, slow_requests=slow))
+        assert client.get("/items/1").status_code == 200
+        assert slow == []
+
+    def test_event_streams_not_logged(self):
+        """Test that long-lived event streams are not reported as slow"""
+        from fastapi.responses import StreamingResponse
+
+        slow = []
+        app = build_app(slow_request_ms=0, slow_requests=slow)
+
+        @app.get("/events")
+        def events():
+            return StreamingResponse(iter(["event: ping\ndata: {}\n\n"]),
+                                     media_type="text/event-stream")
+
+        client = TestClient(app)
+        assert client.get("/events").status_code == 200
+        assert slow == []
+        assert client.get("/items/1").status_code == 200
+        assert len(slow) == 1
+
+    def test_record_outside_request_is_ignored(self):
+        """Test that recording without an active trace is a no-op"""
+        assert diagnostics.current_trace() is None
+        record_upstream_call("seasons.json", 0.1, "HIT")
+
+    @patch('requests.Session')
+    def test_service_records_upstream_calls(self, mock_session_class):
+        """Test that make_request records cache status, timings and payload size"""
+        session = Mock()
+        session.get.return_value.content = b'{"ok": true}'
+        session.get.return_value.json.return_value = {"ok": True}
+        mock_session_class.return_value = session
+        set_upstream_limiter(UpstreamLimiter([TokenBucket(1e6, 1e6)]))
+        trace = RequestTrace("GET", "/seasons")
+        token = diagnostics._current_trace.set(trace)
+        try:
+            F1APIService().make_request("seasons.json")
+        finally:
+            diagnostics._current_trace.reset(token)
+            set_upstream_limiter(None)
+
+        [call] = trace.upstream
+        assert call["endpoint"] == "seasons.json"
+        assert call["cache"] == "BYPASS"
+        assert call["bytes"] == len(b'{"ok": true}')
+        assert call["ms"] >= call["fetch_ms"]
+
+
+class TestProfiling:
+    """Test cases for on-demand request profiling"""
+
+    def test_profile_captured_with_token(self):
+        """Test that a request with the token is sampled and stored"""
+        store = ProfileStore()
+        client = TestClient(build_app(profile_token="secret", profile_interval=0.001,
+                                      profiles=store))
+        response = client.get("/items/3?spin=0.1", headers={"X-Profile-Token": "secret"})
+
+        profile_id = response.headers["x-profile-id"]
+        profile = store.get(profile_id)
+        assert profile["trace"]["route"] == "/items/{item}"
+        collapsed = to_collapsed(profile["samples"])
+        assert "busy_handler_work" in collapsed
+        for line in collapsed.splitlines():
+            stack, count = line.rsplit(" ", 1)
+            assert int(count) >= 1
+            assert ";" in stack
+
+    @pytest.mark.parametrize("headers", [{}, {"X-Profile-Token": "wrong"}])
+    def test_no_profile_without_valid_token(self, headers):
+        """Test that profiling needs the exact token"""
+        store = ProfileStore()
+        client = TestClient(build_app(profile_token="secret", profiles=store))
+        response = client.get("/items/3", headers=headers)
+        assert "x-profile-id" not in response.headers
+        assert store.list() == []
+
+    def test_profiling_disabled_without_configured_token(self):
+        """Test that no header enables profiling when no token is configured"""
+        store = ProfileStore()
+        client = TestClient(build_app(profiles=store))
+        response = client.get("/items/3", headers={"X-Profile-Token": ""})
+        assert "x-profile-id" not in response.headers
+
+    def test_store_is_bounded(self):
+        """Test that only the most recent profiles are kept"""
+        store = ProfileStore(max_profiles=2)
+        ids = [store.add(RequestTrace("GET", f"/{i}"), {"a;b": 1}) for i in range(3)]
+        assert store.get(ids[0]) is None
+        assert [p["id"] for p in store.list()] == [ids[2], ids[1]]
+
+
+class TestDiagnosticsEndpoints:
+    """Test cases for the token-guarded /debug endpoints"""
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(api_app)
+
+    def test_hidden_when_profiling_disabled(self, client, monkeypatch):
+        """Test that debug endpoints do not exist without a configured token"""
+        monkeypatch.delenv("F1_API_PROFILE_TOKEN", raising=False)
+        assert client.get("/debug/profiles").status_code == 404
+
+    def test_wrong_token_rejected(self, client, monkeypatch):
+        """Test that a wrong token is refused"""
+        monkeypatch.setenv("F1_API_PROFILE_TOKEN", "secret")
+        response = client.get("/debug/slow-requests", headers={"X-Profile-Token": "nope"})
+        assert response.status_code == 403
+
+    def test_profile_served_as_collapsed_stacks(self, client, monkeypatch):
+        """Test that stored profiles are listed and served in collapsed format"""
+        monkeypatch.setenv("F1_API_PROFILE_TOKEN", "secret")
+        headers = {"X-Profile-Token": "secret"}
+        profile_id = diagnostics.profile_store.add(RequestTrace("GET", "/seasons"),
+                                                   {"MainThread;handler;fetch": 3})
+
+        listing = client.get("/debug/profiles", headers=headers)
+        assert listing.status_code == 200
+        assert listing.json()[0]["id"] == profile_id
+
+        response = client.get(f"/debug/profiles/{profile_id}", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert response.text == "MainThread;handler;fetch 3\n"
+        assert client.get("/debug/profiles/missing", headers=headers).status_code == 404
@@ -0,0 +1,348 @@
+"""
+Test suite for live standings and results updates over server-sent events
+"""
+
+import asyncio
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from src.api.live import LiveHub, diff_rows, format_event, topic_rows
+from src.api.main import app, live_fetcher, set_live_hub
+from src.api.prefetch import RequestBudget
+
+
+def standings(round_num, points):
+    """Build an Ergast driver standings response from {driverId: points}"""
+    ordered = sorted(points.items(), key=lambda item: -item[1])
+    return {"MRData": {"StandingsTable": {"StandingsLists": [{
+        "season": "2024", "round": str(round_num),
+        "DriverStandings": [
+            {"position": str(i), "points": str(pts), "Driver": {"driverId": driver}}
+            for i, (driver, pts) in enumerate(ordered, 1)
+        ]
+    }]}}}
+
+
+def parse_events(text):
+    """Parse server-sent event text into (event, data) pairs"""
+    events = []
+    for block in text.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":")
+                      and ": " in line)
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class ScriptedFetch:
+    """Blocking fetch returning scripted responses per topic, repeating the last one"""
+
+    def __init__(self, responses):
+        self.responses = {topic: list(items) for topic, items in responses.items()}
+        self.calls = []
+
+    def __call__(self, topic):
+        self.calls.append(topic)
+        items = self.responses[topic]
+        return items.pop(0) if len(items) > 1 else items[0]
+
+
+class TestRowDiffs:
+    """Test cases for row extraction and diffs"""
+
+    def test_topic_rows_for_standings_and_results(self):
+        """Test that rows are keyed by driver for standings and results"""
+        context, rows = topic_rows(standings(3, {"hamilton": 40, "verstappen": 50}))
+        assert context == {"season": "2024", "round": "3"}
+        assert list(rows) == ["verstappen", "hamilton"]
+
+        results = {"MRData": {"RaceTable": {"Races": [{
+            "season": "2024", "round": "3", "raceName": "Australian Grand Prix",
+            "Results": [{"position": "1", "Driver": {"driverId": "sainz"}}]
+        }]}}}
+        context, rows = topic_rows(results)
+        assert context["raceName"] == "Australian Grand Prix"
+        assert list(rows) == ["sainz"]
+        assert topic_rows(None) == ({}, {})
+
+    def test_diff_rows(self):
+        """Test that only changed and removed rows are reported"""
+        old = {"a": {"points": "1"}, "b": {"points": "2"}, "c": {"points": "3"}}
+        new = {"a": {"points": "1"}, "b": {"points": "5"}, "d": {"points": "0"}}
+        changed, removed = diff_rows(old, new)
+        assert changed == [{"points": "5"}, {"points": "0"}]
+        assert removed == ["c"]
+
+    def test_format_event(self):
+        """Test the server-sent event wire format"""
+        assert format_event("diff", {"a": 1}, "abc") == 'event: diff\nid: abc\ndata: {"a":1}\n\n'
+
+
+class TestLiveHub:
+    """Test cases for LiveHub"""
+
+    def test_many_subscribers_share_one_poll(self):
+        """Test that subscribers get a snapshot, then only the changed rows"""
+        topic = "2024/driverStandings.json"
+        fetch = ScriptedFetch({topic: [
+            standings(1, {"hamilton": 25, "verstappen": 18}),
+            standings(1, {"hamilton": 25, "verstappen": 18}),
+            standings(2, {"hamilton": 43, "verstappen": 18}),
+        ]})
+        hub = LiveHub(fetch, poll_interval=0.01)
+
+        async def scenario():
+            subscribers = [hub.subscribe([topic]) for _ in range(100)]
+            events = [[], []]
+            for received in events:
+                for subscriber in subscribers:
+                    event = await asyncio.wait_for(subscriber.queue.get(), 1)
+                    received.append(event)
+            polls = len(fetch.calls)
+            for subscriber in subscribers:
+                hub.unsubscribe(subscriber)
+            await hub.stop()
+            return events, polls
+
+        (snapshots, diffs), polls = asyncio.run(scenario())
+        assert len(set(snapshots)) == 1 and len(set(diffs)) == 1
+        [(kind, data)] = parse_events(snapshots[0])
+        assert kind == "snapshot" and len(data["rows"]) == 2
+        [(kind, data)] = parse_events(diffs[0])
+        assert kind == "diff" and data["round"] == "2"
+        assert data["changed"] == [{"position": "1", "points": "43", "Driver": {"driverId": "hamilton"}}]
+        # One poller for 100 subscribers, and the unchanged poll sent nothing
+        assert polls >= 3 and polls < 100
+        assert hub.stats["changes"] == 2
+        assert hub.stats["events"] == 200
+
+    def test_late_subscriber_gets_current_snapshot(self):
+        """Test that a new subscriber to a polled topic is sent the latest rows at once"""
+        topic = "2024/driverStandings.json"
+        hub = LiveHub(ScriptedFetch({topic: [standings(1, {"hamilton": 25})]}), poll_interval=60)
+
+        async def scenario():
+            first = hub.subscribe([topic])
+            await asyncio.wait_for(first.queue.get(), 1)
+            second = hub.subscribe([topic])
+            event = second.queue.get_nowait()
+            await hub.stop()
+            return event
+
+        [(kind, data)] = parse_events(asyncio.run(scenario()))
+        assert kind == "snapshot" and data["rows"][0]["Driver"]["driverId"] == "hamilton"
+
+    def test_slow_subscriber_is_resynchronised(self):
+        """Test that a full queue is replaced by a fresh snapshot"""
+        topic = "2024/driverStandings.json"
+        hub = LiveHub(ScriptedFetch({topic: [{}]}), poll_interval=60, queue_size=2)
+
+        async def scenario():
+            subscriber = hub.subscribe([topic])
+            for points in range(5):
+                hub.publish(topic, standings(points, {"hamilton": points}))
+            queued = [subscriber.queue.get_nowait() for _ in range(subscriber.queue.qsize())]
+            await hub.stop()
+            return queued
+
+        # snapshot, diff fill the queue; the next two overflows each leave one snapshot
+        queued = [event for text in asyncio.run(scenario()) for event in parse_events(text)]
+        assert queued == [("snapshot", {"topic": topic, "season": "2024", "round": "4",
+                                        "rows": [{"position": "1", "points": "4",
+                                                  "Driver": {"driverId": "hamilton"}}]})]
+        assert hub.stats["resyncs"] == 2
+
+    def test_resync_fits_more_topics_than_queue_size(self):
+        """Test that a resync over several topics never overflows the queue"""
+        topics = ["2024/driverStandings.json", "2024/constructorStandings.json"]
+        hub = LiveHub(ScriptedFetch({topic: [{}] for topic in topics}), poll_interval=60,
+                      queue_size=1)
+
+        async def scenario():
+            subscriber = hub.subscribe(topics)
+            for points in range(3):
+                for topic in topics:
+                    hub.publish(topic, standings(points, {"hamilton": points}))
+            queued = [subscriber.queue.get_nowait() for _ in range(subscriber.queue.qsize())]
+            await hub.stop()
+            return queued
+
+        queued = [event for text in asyncio.run(scenario()) for event in parse_events(text)]
+        assert {data["topic"] for _, data in queued} == set(topics)
+        assert {kind for kind, _ in queued} == {"snapshot"}
+
+    def test_last_unsubscribe_stops_poller(self):
+        """Test that topics nobody listens to are no longer polled"""
+        topic = "2024/1/results.json"
+        fetch = ScriptedFetch({topic: [{}]})
+        hub = LiveHub(fetch, poll_interval=0.01)
+
+        async def scenario():
+            subscriber = hub.subscribe([topic])
+            await asyncio.sleep(0.05)
+            hub.unsubscribe(subscriber)
+            polls = len(fetch.calls)
+            await asyncio.sleep(0.05)
+            return polls
+
+        polls = asyncio.run(scenario())
+        assert len(fetch.calls) == polls
+        assert hub.summary()["subscribers"] == 0
+
+    def test_poll_errors_keep_polling(self):
+        """Test that a failed poll is counted and the next one still runs"""
+        topic = "2024/driverStandings.json"
+        responses = [RuntimeError("upstream down"), standings(1, {"hamilton": 25})]
+
+        def fetch(endpoint):
+            response = responses.pop(0) if len(responses) > 1 else responses[0]
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        hub = LiveHub(fetch, poll_interval=0.01)
+
+        async def scenario():
+            subscriber = hub.subscribe([topic])
+            event = await asyncio.wait_for(subscriber.queue.get(), 1)
+            await hub.stop()
+            return event
+
+        assert parse_events(asyncio.run(scenario()))[0][0] == "snapshot"
+        assert hub.stats["errors"] == 1
+
+    def test_publish_errors_keep_polling(self):
+        """Test that a response that cannot be published does not stop the poller"""
+        topic = "2024/driverStandings.json"
+        hub = LiveHub(ScriptedFetch({topic: [["not", "a", "response"],
+                                             standings(1, {"hamilton": 25})]}),
+                      poll_interval=0.01)
+
+        async def scenario():
+            subscriber = hub.subscribe([topic])
+            event = await asyncio.wait_for(subscriber.queue.get(), 1)
+            await hub.stop()
+            return event
+
+        assert parse_events(asyncio.run(scenario()))[0][0] == "snapshot"
+        assert hub.stats["errors"] == 1
+
+    def test_skipped_polls_publish_nothing(self):
+        """Test that a fetch returning None is counted and leaves the topic unchanged"""
+        topic = "2024/driverStandings.json"
+        hub = LiveHub(ScriptedFetch({topic: [standings(1, {"hamilton": 25}), None]}),
+                      poll_interval=0.01)
+
+        async def scenario():
+            subscriber = hub.subscribe([topic])
+            event = await asyncio.wait_for(subscriber.queue.get(), 1)
+            await asyncio.sleep(0.05)
+            await hub.stop()
+            return event, subscriber.queue.qsize()
+
+        (event, backlog) = asyncio.run(scenario())
+        assert parse_events(event)[0][0] == "snapshot" and backlog == 0
+        assert hub.stats["skipped"] >= 1
+
+    def test_live_fetcher_charges_budget(self):
+        """Test that cached topics are free and upstream polls stop when the budget is spent"""
+        service = Mock()
+        service.get_cached.side_effect = lambda endpoint, max_age: (
+            {"cached": True} if endpoint == "cached.json" else None)
+        service.refresh.return_value = {"fresh": True}
+        fetch = live_fetcher(service, RequestBudget(1, 3600), interval=60)
+
+        assert fetch("cached.json") == {"cached": True}
+        assert fetch("2024/driverStandings.json") == {"fresh": True}
+        assert fetch("2024/constructorStandings.json") is None
+        assert service.refresh.call_count == 1
+
+    def test_stream_subscribes_when_started(self):
+        """Test that a stream that never starts leaves no subscriber behind"""
+        topic = "2024/driverStandings.json"
+        hub = LiveHub(ScriptedFetch({topic: [{}]}), poll_interval=60)
+
+        async def scenario():
+            unstarted = hub.stream([topic])
+            assert hub.summary()["subscribers"] == 0
+            stream = hub.stream([topic])
+            assert (await stream.__anext__()).startswith("retry:")
+            assert hub.summary()["subscribers"] == 1
+            await stream.aclose()
+            await unstarted.aclose()
+            await hub.stop()
+
+        asyncio.run(scenario())
+        assert hub.summary()["subscribers"] == 0
+
+
+class TestLiveEndpoints:
+    """Test cases for the /live endpoints"""
+
+    @pytest.fixture
+    def hub(self):
+        fetch = ScriptedFetch({
+            "2024/driverStandings.json": [standings(1, {"hamilton": 25}),
+                                          standings(2, {"hamilton": 25, "norris": 18})],
+            "2024/constructorStandings.json": [{}],
+        })
+        hub = LiveHub(fetch, poll_interval=0.01)
+        set_live_hub(hub)
+        yield hub
+        set_live_hub(None)
+
+    def stream(self, path, until):
+        """Read a live stream through the ASGI app until enough events arrive"""
+        async def scenario():
+            done = asyncio.Event()
+            start, body = {}, []
+
+            async def receive():
+                await done.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    start.update(message)
+                elif message["type"] == "http.response.body":
+                    body.append(message.get("body", b"").decode())
+                    if len(parse_events("".join(body))) >= until:
+                        done.set()
+
+            scope = {"type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"},
+                     "http_version": "1.1", "method": "GET", "scheme": "http", "path": path,
+                     "raw_path": path.encode(), "root_path": "", "query_string": b"",
+                     "headers": [(b"host", b"testserver")], "client": ("test", 1),
+                     "server": ("testserver", 80)}
+            await asyncio.wait_for(app(scope, receive, send), 5)
+            return start, "".join(body)
+
+        return asyncio.run(scenario())
+
+    def test_season_stream(self, hub):
+        """Test that a season stream sends standings snapshots, then diffs"""
+        start, body = self.stream("/live/seasons/2024", until=3)
+        headers = dict(start["headers"])
+        assert start["status"] == 200
+        assert headers[b"content-type"].startswith(b"text/event-stream")
+        assert body.startswith("retry: 10\n\n")
+
+        events = parse_events(body)
+        topics = {data["topic"]: kind for kind, data in events[:2]}
+        assert topics == {"2024/driverStandings.json": "snapshot",
+                          "2024/constructorStandings.json": "snapshot"}
+        kind, data = events[2]
+        assert kind == "diff"
+        assert [row["Driver"]["driverId"] for row in data["changed"]] == ["norris"]
+        # Disconnecting unsubscribes the client and stops the pollers
+        assert hub.summary()["subscribers"] == 0
+
+    def test_live_stats(self, hub):
+        """Test that stats report poller activity"""
+        from fastapi.testclient import TestClient
+
+        response = TestClient(app).get("/live/stats")
+        assert response.status_code == 200
+        assert response.json()["subscribers"] == 0
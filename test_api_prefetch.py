@@ -0,0 +1,288 @@
+"""
+Test suite for API cache warming and predictive prefetch
+"""
+
+import asyncio
+import threading
+from datetime import datetime, timezone
+from unittest.mock import Mock
+
+import pytest
+from fastapi.testclient import TestClient
+
+import src.api.main as api_main
+from src.api.main import app, get_f1_service
+from src.api.cache import NullCache, SQLiteCache
+from src.api.prefetch import (
+    PrefetchScheduler, RequestBudget, SharedRequestBudget, has_results, race_start
+)
+from src.api.results_store import ResultsStore, set_results_store
+
+NOW = datetime(2024, 3, 20, 12, 0, tzinfo=timezone.utc)
+
+SCHEDULE = {"MRData": {"RaceTable": {"season": "2024", "Races": [
+    {"round": "1", "date": "2024-03-02", "time": "15:00:00Z"},
+    {"round": "2", "date": "2024-03-09", "time": "17:00:00Z"},
+    {"round": "3", "date": "2024-03-20", "time": "08:00:00Z"},
+    {"round": "4", "date": "2024-04-07", "time": "05:00:00Z"},
+]}}}
+
+
+def results(round_num):
+    """Build a results response with one classified driver"""
+    return {"MRData": {"RaceTable": {"Races": [
+        {"round": str(round_num), "Results": [{"position": "1"}]}
+    ]}}}
+
+
+EMPTY_RESULTS = {"MRData": {"RaceTable": {"Races": []}}}
+
+
+class FakeService:
+    """In-memory stand-in for a cache-backed F1APIService"""
+
+    def __init__(self, upstream):
+        self.upstream = upstream
+        self.cache = {}
+        self.calls = []
+
+    def get_cached(self, endpoint, allow_stale=False):
+        return self.cache.get(endpoint)
+
+    def make_request(self, endpoint):
+        if endpoint in self.cache:
+            return self.cache[endpoint]
+        return self.refresh(endpoint)
+
+    def refresh(self, endpoint):
+        self.calls.append(endpoint)
+        self.cache[endpoint] = self.upstream.get(endpoint, EMPTY_RESULTS)
+        return self.cache[endpoint]
+
+
+def make_scheduler(service, max_requests=100):
+    return PrefetchScheduler(service, RequestBudget(max_requests, 3600), season=2024,
+                             poll_interval=3600, now=lambda: NOW)
+
+
+def run_scheduler(scheduler, action=None):
+    """Start the scheduler, optionally act on it, and wait for the queue to drain"""
+    async def scenario():
+        await scheduler.start()
+        await scheduler.join()
+        if action is not None:
+            action()
+            # Let items queued from other threads reach the queue
+            await asyncio.sleep(0)
+            await scheduler.join()
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def upstream():
+    return {
+        "2024/races.json": SCHEDULE,
+        "2024/driverStandings.json": {"MRData": {"standings": "drivers"}},
+        "2024/constructorStandings.json": {"MRData": {"standings": "constructors"}},
+        "2024/1/results.json": results(1),
+        "2024/2/results.json": results(2),
+        "2024/3/results.json": results(3),
+    }
+
+
+class TestRequestBudget:
+    """Test cases for the sliding-window request budget"""
+
+    def test_budget_is_strict(self):
+        """Test that no more than max_requests are granted per period"""
+        clock = Mock(return_value=0.0)
+        budget = RequestBudget(2, period=10, clock=clock)
+        assert budget.try_acquire()
+        assert budget.try_acquire()
+        assert not budget.try_acquire()
+        assert budget.remaining() == 0
+
+    def test_budget_recovers_after_period(self):
+        """Test that requests older than the period no longer count"""
+        clock = Mock(return_value=0.0)
+        budget = RequestBudget(1, period=10, clock=clock)
+        assert budget.try_acquire()
+        clock.return_value = 10.0
+        assert budget.try_acquire()
+
+    def test_shared_budget_spans_workers(self, tmp_path):
+        """Test that budgets on the same cache draw from one allowance"""
+        clock = Mock(return_value=0.0)
+        path = str(tmp_path / "cache.sqlite3")
+        first = SharedRequestBudget(SQLiteCache(path), 3, period=10, clock=clock)
+        second = SharedRequestBudget(SQLiteCache(path), 3, period=10, clock=clock)
+        assert first.try_acquire() and second.try_acquire() and first.try_acquire()
+        assert not second.try_acquire()
+        assert first.remaining() == 0
+        clock.return_value = 10.0
+        assert second.try_acquire()
+        assert first.remaining() == 2
+
+    def test_shared_budget_falls_back_to_local(self):
+        """Test that a backend without counters gets a per-worker budget"""
+        budget = SharedRequestBudget(NullCache(), 1, period=10)
+        assert budget.try_acquire()
+        assert not budget.try_acquire()
+        assert budget.remaining() == 0
+
+
+class TestScheduleHelpers:
+    """Test cases for parsing Ergast race entries"""
+
+    def test_race_start(self):
+        """Test that race start times are parsed as UTC"""
+        assert race_start({"date": "2024-03-02", "time": "15:00:00Z"}) == \
+            datetime(2024, 3, 2, 15, tzinfo=timezone.utc)
+        assert race_start({"date": "1950-05-13"}) == datetime(1950, 5, 13, tzinfo=timezone.utc)
+        assert race_start({}) is None
+
+    def test_has_results(self):
+        """Test detection of published results"""
+        assert has_results(results(1))
+        assert not has_results(EMPTY_RESULTS)
+        assert not has_results(None)
+
+
+class TestPrefetchScheduler:
+    """Test cases for warming, predictive prefetch and polling"""
+
+    def test_warm_on_start(self, upstream):
+        """Test that the hot keys and latest completed results are warmed"""
+        service = FakeService(upstream)
+        run_scheduler(make_scheduler(service))
+        assert set(service.calls) == {
+            "2024/races.json", "2024/driverStandings.json",
+            "2024/constructorStandings.json", "2024/3/results.json",
+        }
+
+    def test_cached_keys_cost_nothing(self, upstream):
+        """Test that already cached keys are not fetched or charged to the budget"""
+        service = FakeService(upstream)
+        service.cache["2024/races.json"] = SCHEDULE
+        service.cache["2024/driverStandings.json"] = {}
+        scheduler = make_scheduler(service, max_requests=2)
+        run_scheduler(scheduler)
+        assert set(service.calls) == {"2024/constructorStandings.json", "2024/3/results.json"}
+        assert scheduler.stats["skipped_cached"] == 2
+        assert scheduler.stats["skipped_budget"] == 0
+
+    def test_budget_limits_upstream_requests(self, upstream):
+        """Test that prefetch never exceeds its request budget"""
+        service = FakeService(upstream)
+        scheduler = make_scheduler(service, max_requests=2)
+        run_scheduler(scheduler)
+        assert len(service.calls) == 2
+        assert scheduler.stats["skipped_budget"] >= 1
+
+    def test_notify_results_prefetches_neighbours(self, upstream):
+        """Test that requesting round N prefetches rounds N-1 and N+1"""
+        service = FakeService(upstream)
+        scheduler = make_scheduler(service)
+        run_scheduler(scheduler, lambda: scheduler.notify_results(2024, 2))
+        assert "2024/1/results.json" in service.calls
+        assert service.calls.count("2024/3/results.json") == 1
+
+    def test_notify_results_skips_future_rounds(self, upstream):
+        """Test that rounds that have not been raced are not prefetched"""
+        service = FakeService(upstream)
+        scheduler = make_scheduler(service)
+        run_scheduler(scheduler, lambda: scheduler.notify_results(2024, 3))
+        assert "2024/4/results.json" not in service.calls
+        assert "2024/2/results.json" in service.calls
+
+    def test_poll_refreshes_recent_race_results(self, upstream):
+        """Test that results are polled after a race ends and standings refreshed"""
+        service = FakeService(upstream)
+        service.cache["2024/races.json"] = SCHEDULE
+        service.cache["2024/3/results.json"] = EMPTY_RESULTS
+        scheduler = PrefetchScheduler(service, RequestBudget(100, 3600), warm_keys=[],
+                                      season=2024, poll_interval=3600, now=lambda: NOW)
+        run_scheduler(scheduler, scheduler.poll_results)
+        assert service.calls == [
+            "2024/3/results.json", "2024/driverStandings.json", "2024/constructorStandings.json",
+        ]
+        assert has_results(service.cache["2024/3/results.json"])
+
+    def test_poll_ignores_races_with_results(self, upstream):
+        """Test that races with cached results are not polled"""
+        service = FakeService(upstream)
+        service.cache["2024/races.json"] = SCHEDULE
+        service.cache["2024/3/results.json"] = results(3)
+        scheduler = PrefetchScheduler(service, RequestBudget(100, 3600), warm_keys=[],
+                                      season=2024, poll_interval=3600, now=lambda: NOW)
+        run_scheduler(scheduler, scheduler.poll_results)
+        assert service.calls == []
+
+    def test_season_follows_the_clock(self, upstream):
+        """Test that a long-running scheduler moves on to the new season"""
+        clock = Mock(return_value=datetime(2023, 12, 31, 23, tzinfo=timezone.utc))
+        scheduler = PrefetchScheduler(FakeService(upstream), RequestBudget(100, 3600), now=clock)
+        assert scheduler.season == 2023
+        clock.return_value = NOW
+        assert scheduler.season == 2024
+
+    def test_enqueue_from_many_threads(self, upstream):
+        """Test that concurrent duplicate requests are fetched once"""
+        service = FakeService(upstream)
+        scheduler = make_scheduler(service)
+
+        def notify_from_threads():
+            threads = [threading.Thread(target=scheduler.notify_results, args=(2024, 2))
+                       for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        run_scheduler(scheduler, notify_from_threads)
+        assert service.calls.count("2024/1/results.json") == 1
+
+
+class TestPrefetchIntegration:
+    """Test cases for the scheduler hooks in the API app"""
+
+    @pytest.fixture(autouse=True)
+    def results_store(self, tmp_path):
+        """Keep results ingested by the results route out of the real store"""
+        store = ResultsStore(str(tmp_path / "results.sqlite3"))
+        set_results_store(store)
+        yield store
+        set_results_store(None)
+
+    def test_results_route_notifies_scheduler(self, monkeypatch):
+        """Test that the results endpoint triggers predictive prefetch"""
+        scheduler = Mock()
+        service = Mock()
+        service.make_request.return_value = results(5)
+        monkeypatch.setattr(api_main, "prefetch_scheduler", scheduler)
+        app.dependency_overrides[get_f1_service] = lambda: service
+        try:
+            response = TestClient(app).get("/seasons/2024/5/results")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        scheduler.notify_results.assert_called_once_with(2024, 5)
+
+    def test_prefetch_can_be_disabled(self, monkeypatch):
+        """Test that F1_API_PREFETCH=0 disables the scheduler"""
+        monkeypatch.setenv("F1_API_PREFETCH", "0")
+        assert api_main.create_prefetch_scheduler() is None
+
+    def test_scheduler_configured_from_environment(self, monkeypatch):
+        """Test budget and warm keys come from the environment"""
+        monkeypatch.setenv("F1_API_PREFETCH_BUDGET", "5")
+        monkeypatch.setenv("F1_API_WARM_KEYS", "{season}/races.json,current/last/results.json")
+        monkeypatch.setenv("F1_API_CACHE_BACKEND", "none")
+        monkeypatch.setattr("src.api.cache._cache", None)
+        scheduler = api_main.create_prefetch_scheduler()
+        assert isinstance(scheduler.budget, SharedRequestBudget)
+        assert scheduler.budget.max_requests == 5
+        assert scheduler.warm_keys == ["{season}/races.json", "current/last/results.json"]
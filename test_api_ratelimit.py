@@ -0,0 +1,274 @@
+"""
+Test suite for the upstream rate limiter and inbound admission control
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from src.api.main import F1APIService, app
+from src.api.ratelimit import (
+    EXPORT, INTERACTIVE, PREFETCH, ConcurrencyLimit, ConcurrencyLimitMiddleware,
+    RateLimitExceeded, TokenBucket, UpstreamLimiter, create_upstream_limiter_from_env,
+    set_upstream_limiter
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    """Test cases for TokenBucket"""
+
+    def test_starts_full_and_refills(self):
+        """Test that the bucket starts at capacity and refills at its rate"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=4, clock=clock)
+        for _ in range(4):
+            assert bucket.wait_time() == 0
+            bucket.take()
+        assert bucket.wait_time() == pytest.approx(0.5)
+        clock.now = 1.0
+        assert bucket.tokens() == pytest.approx(2)
+        clock.now = 100.0
+        assert bucket.tokens() == 4
+
+    def test_invalid_configuration(self):
+        """Test that a non-positive rate is rejected"""
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0, capacity=1)
+
+
+class TestUpstreamLimiter:
+    """Test cases for UpstreamLimiter"""
+
+    def test_admits_burst_without_waiting(self):
+        """Test that requests within the burst are admitted immediately"""
+        limiter = UpstreamLimiter([TokenBucket(1, 3)], timeout=0)
+        for _ in range(3):
+            limiter.acquire()
+        with pytest.raises(RateLimitExceeded) as excinfo:
+            limiter.acquire()
+        assert excinfo.value.retry_after > 0
+        assert limiter.stats["admitted"] == 3
+
+    def test_all_buckets_must_allow(self):
+        """Test that the strictest bucket wins"""
+        limiter = UpstreamLimiter([TokenBucket(100, 100), TokenBucket(1, 1)], timeout=0)
+        limiter.acquire()
+        with pytest.raises(RateLimitExceeded):
+            limiter.acquire()
+
+    def test_queue_full_rejects_immediately(self):
+        """Test that requests beyond the queue bound are rejected without waiting"""
+        limiter = UpstreamLimiter([TokenBucket(0.01, 1)], max_queue=1, timeout=2)
+        limiter.acquire()
+        errors = []
+
+        def wait():
+            try:
+                limiter.acquire(timeout=0.5)
+            except RateLimitExceeded as e:
+                errors.append(e)
+
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        while limiter.queued() == 0:
+            time.sleep(0.001)
+
+        start = time.monotonic()
+        with pytest.raises(RateLimitExceeded):
+            limiter.acquire()
+        assert time.monotonic() - start < 0.1
+        assert limiter.stats["rejected_queue_full"] == 1
+        waiter.join()
+        assert len(errors) == 1
+        assert limiter.stats["rejected_timeout"] == 1
+        assert limiter.queued() == 0
+
+    def test_priority_order(self):
+        """Test that interactive requests are admitted ahead of prefetch and export"""
+        limiter = UpstreamLimiter([TokenBucket(20, 1)], timeout=5)
+        limiter.acquire()
+        order = []
+
+        def request(priority):
+            limiter.acquire(priority)
+            order.append(priority)
+
+        threads = []
+        for priority in (EXPORT, PREFETCH, INTERACTIVE):
+            thread = threading.Thread(target=request, args=(priority,))
+            thread.start()
+            threads.append(thread)
+            while limiter.queued() < len(threads):
+                time.sleep(0.001)
+        for thread in threads:
+            thread.join()
+        assert order == [INTERACTIVE, PREFETCH, EXPORT]
+
+    def test_configured_from_environment(self, monkeypatch):
+        """Test that the Ergast per-second and hourly limits are both applied"""
+        monkeypatch.setenv("F1_API_UPSTREAM_RATE", "2")
+        monkeypatch.setenv("F1_API_UPSTREAM_QUEUE", "5")
+        monkeypatch.delenv("F1_API_UPSTREAM_HOURLY", raising=False)
+        monkeypatch.delenv("F1_API_WORKERS", raising=False)
+        limiter = create_upstream_limiter_from_env()
+        assert [bucket.rate for bucket in limiter.buckets] == [2, pytest.approx(200 / 3600)]
+        assert limiter.max_queue == 5
+
+        monkeypatch.setenv("F1_API_UPSTREAM_HOURLY", "0")
+        assert len(create_upstream_limiter_from_env().buckets) == 1
+
+    def test_limits_split_between_workers(self, monkeypatch):
+        """Test that each worker enforces its share of the upstream limits"""
+        for name in ("F1_API_UPSTREAM_RATE", "F1_API_UPSTREAM_BURST", "F1_API_UPSTREAM_HOURLY"):
+            monkeypatch.delenv(name, raising=False)
+        monkeypatch.setenv("F1_API_WORKERS", "8")
+        per_second, hourly = create_upstream_limiter_from_env().buckets
+        assert (per_second.rate, per_second.capacity) == (0.5, 1)
+        assert hourly.rate * 3600 == pytest.approx(25)
+        assert hourly.capacity == 25
+
+
+class TestServiceRateLimiting:
+    """Test cases for F1APIService behind the upstream limiter"""
+
+    @pytest.fixture(autouse=True)
+    def limiter(self):
+        limiter = UpstreamLimiter([TokenBucket(0.01, 1)], max_queue=0, timeout=0)
+        set_upstream_limiter(limiter)
+        yield limiter
+        set_upstream_limiter(None)
+
+    @patch('requests.Session')
+    def test_saturated_upstream_returns_429(self, mock_session_class):
+        """Test that an exhausted limiter surfaces as 429 with Retry-After"""
+        session = Mock()
+        session.get.return_value.json.return_value = {"ok": True}
+        mock_session_class.return_value = session
+
+        service = F1APIService()
+        assert service.make_request("seasons.json") == {"ok": True}
+        with pytest.raises(HTTPException) as excinfo:
+            service.make_request("seasons.json")
+        assert excinfo.value.status_code == 429
+        assert int(excinfo.value.headers["Retry-After"]) >= 1
+        assert session.get.call_count == 1
+
+    @patch('requests.Session')
+    def test_priority_passed_to_limiter(self, mock_session_class, limiter):
+        """Test that the service priority and refresh overrides reach the limiter"""
+        limiter.acquire = Mock()
+        service = F1APIService(priority=PREFETCH)
+        service.make_request("seasons.json")
+        service.refresh("seasons.json", priority=EXPORT)
+        assert [c.args[0] for c in limiter.acquire.call_args_list] == [PREFETCH, EXPORT]
+
+    @patch('requests.Session')
+    def test_health_probe_spends_no_tokens(self, mock_session_class, limiter):
+        """Test that /health checks upstream without taking limiter tokens"""
+        session = Mock()
+        session.get.return_value.json.return_value = {"MRData": {}}
+        mock_session_class.return_value = session
+
+        client = TestClient(app)
+        for _ in range(3):
+            assert client.get("/health").json()["status"] == "healthy"
+        assert session.get.call_count == 3
+        assert limiter.stats["admitted"] == 0
+        assert F1APIService().make_request("seasons.json", use_cache=False) == {"MRData": {}}
+
+
+def build_app(**limits):
+    """Build a small app whose /slow route blocks until released"""
+    app = FastAPI()
+    release = asyncio.Event()
+
+    @app.get("/slow/{item}")
+    async def slow(item: int):
+        await release.wait()
+        return {"item": item}
+
+    @app.get("/fast")
+    async def fast():
+        return {"ok": True}
+
+    app.add_middleware(ConcurrencyLimitMiddleware, **limits)
+    return app, release
+
+
+class TestConcurrencyLimit:
+    """Test cases for ConcurrencyLimit and ConcurrencyLimitMiddleware"""
+
+    def test_limit_sheds_beyond_queue(self):
+        """Test that requests beyond running plus queued slots are shed at once"""
+        async def scenario():
+            limit = ConcurrencyLimit(max_concurrent=1, max_queue=1, queue_timeout=5)
+            assert await limit.acquire()
+            queued = asyncio.create_task(limit.acquire())
+            await asyncio.sleep(0)
+            assert limit.waiting == 1
+            assert await limit.acquire() is False
+            limit.release()
+            assert await queued
+            assert limit.active == 1
+
+        asyncio.run(scenario())
+
+    def test_limit_queue_timeout(self):
+        """Test that queued requests are shed after the queue timeout"""
+        async def scenario():
+            limit = ConcurrencyLimit(max_concurrent=1, max_queue=1, queue_timeout=0.01)
+            assert await limit.acquire()
+            assert await limit.acquire() is False
+            assert limit.waiting == 0
+
+        asyncio.run(scenario())
+
+    def test_middleware_sheds_with_503(self):
+        """Test that an overloaded route answers 503 with Retry-After while others still work"""
+        async def scenario():
+            import httpx
+
+            app, release = build_app(max_concurrent=1, max_queue=0, queue_timeout=1)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                first = asyncio.create_task(client.get("/slow/1"))
+                await asyncio.sleep(0.05)
+                # Path parameters share the route's limit
+                shed = await client.get("/slow/2")
+                other = await client.get("/fast")
+                release.set()
+                return await first, shed, other
+
+        first, shed, other = asyncio.run(scenario())
+        assert first.status_code == 200
+        assert shed.status_code == 503
+        assert shed.headers["retry-after"] == "1"
+        assert other.status_code == 200
+
+    def test_route_overrides_and_exemptions(self):
+        """Test per-route limits and exempt paths"""
+        middleware = ConcurrencyLimitMiddleware(None, max_concurrent=8, max_queue=16,
+                                                route_limits={"/slow/{item}": (2, 3)})
+        limit = middleware._limit_for("/slow/{item}")
+        assert (limit.max_concurrent, limit.max_queue) == (2, 3)
+        assert middleware._limit_for("/fast").max_concurrent == 8
+
+        app, _ = build_app(max_concurrent=0, exempt=("/fast",))
+        client = TestClient(app)
+        assert client.get("/fast").status_code == 200
+        assert client.get("/missing").status_code == 404
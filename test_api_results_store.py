@@ -0,0 +1,240 @@
+"""
+Test suite for the local results store and the /query/results endpoint
+"""
+
+import time
+from unittest.mock import Mock
+
+import pytest
+from fastapi.testclient import TestClient
+
+import src.api.main as api_main
+from src.api.main import app, get_f1_service
+from src.api.results_store import (
+    InvalidCursor, ResultsStore, decode_cursor, encode_cursor, result_rows,
+    set_results_store, sync_season
+)
+
+DRIVERS = ["hamilton", "verstappen", "leclerc", "norris"]
+CONSTRUCTORS = {"hamilton": "mercedes", "verstappen": "red_bull",
+                "leclerc": "ferrari", "norris": "mclaren"}
+
+
+def race(season, round_num, circuit, order, statuses=None):
+    """Build an Ergast race entry with drivers finishing in the given order"""
+    statuses = statuses or {}
+    return {
+        "season": str(season), "round": str(round_num), "raceName": f"{circuit} GP",
+        "date": f"{season}-05-01", "Circuit": {"circuitId": circuit},
+        "Results": [{
+            "position": str(position), "positionText": str(position),
+            "points": str(max(0, 26 - 7 * position)), "grid": str(5 - position),
+            "laps": "57", "status": statuses.get(driver, "Finished"),
+            "Driver": {"driverId": driver},
+            "Constructor": {"constructorId": CONSTRUCTORS[driver]},
+        } for position, driver in enumerate(order, start=1)]
+    }
+
+
+def results_response(*races, total=None):
+    return {"MRData": {"total": str(total if total is not None else 0),
+                       "RaceTable": {"Races": list(races)}}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.sqlite3"))
+    store.ingest(results_response(
+        race(2009, 1, "monza", ["hamilton", "leclerc", "norris", "verstappen"]),
+        race(2010, 1, "monza", ["leclerc", "hamilton", "verstappen", "norris"]),
+        race(2010, 2, "spa", ["verstappen", "leclerc", "hamilton", "norris"]),
+        race(2011, 1, "monza", ["norris", "verstappen", "leclerc", "hamilton"],
+             statuses={"hamilton": "Engine"}),
+        race(2012, 3, "monza", ["leclerc", "norris", "hamilton", "verstappen"]),
+    ))
+    yield store
+    store.close()
+
+
+class TestResultsStore:
+    """Test cases for ResultsStore"""
+
+    def test_result_rows_skip_incomplete_entries(self):
+        """Test that entries without a numeric position or driver are skipped"""
+        data = results_response(race(2010, 1, "monza", ["hamilton", "leclerc"]))
+        data["MRData"]["RaceTable"]["Races"][0]["Results"][1]["position"] = None
+        rows = result_rows(data)
+        assert len(rows) == 1
+        assert rows[0][:3] == (2010, 1, 1)
+
+    def test_podiums_for_constructor_at_circuit_since(self, store):
+        """Test the combined constructor, circuit, season and position filters"""
+        page = store.query(constructor="ferrari", circuit="monza", season_from=2010,
+                           position_to=3)
+        assert [(r["season"], r["round"], r["position"]) for r in page["results"]] == [
+            (2010, 1, 1), (2011, 1, 3), (2012, 3, 1)
+        ]
+        assert page["next_cursor"] is None
+
+    def test_driver_status_and_ranges(self, store):
+        """Test driver, status, season range and position range filters"""
+        assert [r["season"] for r in store.query(driver="hamilton", status="Engine")["results"]] \
+            == [2011]
+        page = store.query(driver="hamilton", season_from=2010, season_to=2011,
+                           position_from=2, position_to=3)
+        assert [(r["season"], r["round"]) for r in page["results"]] == [(2010, 1), (2010, 2)]
+        first = page["results"][0]
+        assert first["constructorId"] == "mercedes"
+        assert first["circuitId"] == "monza"
+        assert first["points"] == 12.0
+
+    def test_reingest_upserts(self, store):
+        """Test that ingesting a race again replaces its rows"""
+        before = store.count()
+        store.ingest(results_response(race(2010, 1, "monza", ["norris", "hamilton",
+                                                             "verstappen", "leclerc"])))
+        assert store.count() == before
+        winner = store.query(season_from=2010, season_to=2010, position_to=1)["results"][0]
+        assert winner["driverId"] == "norris"
+
+    def test_ingest_changed_skips_unchanged_races(self, store):
+        """Test that only races whose rows differ are rewritten"""
+        same = results_response(race(2010, 2, "spa", ["verstappen", "leclerc", "hamilton",
+                                                      "norris"]))
+        store.insert_rows = Mock(side_effect=AssertionError("unexpected write"))
+        assert store.ingest_changed(same) == []
+
+        amended = results_response(race(2010, 2, "spa", ["leclerc", "verstappen", "hamilton"]))
+        assert store.ingest_changed(amended) == [(2010, 2)]
+        assert [r["driverId"] for r in store.race_rows(2010, 2)] == \
+            ["leclerc", "verstappen", "hamilton"]
+        assert store.ingest_changed(amended) == []
+
+    def test_cursor_pagination_covers_everything_once(self, store):
+        """Test that paging with cursors returns every row exactly once, in order"""
+        everything = store.query(limit=1000)["results"]
+        seen = []
+        cursor = None
+        while True:
+            page = store.query(limit=3, cursor=cursor)
+            seen.extend(page["results"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == everything
+        assert len(seen) == store.count() == 20
+
+    def test_cursor_round_trip_and_validation(self):
+        """Test cursor encoding and rejection of malformed cursors"""
+        assert decode_cursor(encode_cursor((2010, 2, 3))) == (2010, 2, 3)
+        with pytest.raises(InvalidCursor):
+            decode_cursor("not-a-cursor")
+
+    def test_queries_use_indexes(self, store):
+        """Test that filtered queries are answered from an index, not a table scan"""
+        conn = store._connect()
+        for column in ("driverId", "constructorId", "circuitId"):
+            plan = " ".join(row[-1] for row in conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM results WHERE {column} = 'x' "
+                "ORDER BY season, round, position"
+            ))
+            assert "USING INDEX" in plan, plan
+            assert "TEMP B-TREE" not in plan, plan
+
+    def test_full_history_queries_are_fast(self, tmp_path):
+        """Test that filters over a full-history-sized store return in milliseconds"""
+        store = ResultsStore(str(tmp_path / "history.sqlite3"))
+        drivers = [f"driver{i}" for i in range(60)]
+        rows = []
+        for season in range(1950, 2025):
+            for round_num in range(1, 21):
+                for position in range(1, 21):
+                    driver = drivers[(season + round_num * 7 + position) % len(drivers)]
+                    rows.append((season, round_num, position, "GP", f"circuit{round_num}",
+                                 f"{season}-01-01", driver, f"team{position % 10}", position,
+                                 str(position), 0.0, "Finished", 50))
+        store.insert_rows(rows)
+        assert store.count() == 30000
+
+        start = time.perf_counter()
+        page = store.query(constructor="team3", circuit="circuit5", season_from=2010,
+                           position_to=3)
+        store.query(driver="driver7", limit=1000)
+        elapsed = time.perf_counter() - start
+        assert page["results"]
+        assert elapsed < 0.05
+        store.close()
+
+    def test_sync_season_pages_through_upstream(self, store):
+        """Test that a season is loaded page by page until the total is reached"""
+        service = Mock()
+        service.make_request.side_effect = [
+            results_response(race(2024, 1, "bahrain", ["verstappen", "leclerc"]), total=150),
+            results_response(race(2024, 2, "jeddah", ["leclerc", "norris"]), total=150),
+        ]
+        assert sync_season(service, store, 2024) == 4
+        assert [c.args[0] for c in service.make_request.call_args_list] == [
+            "2024/results.json?limit=100&offset=0", "2024/results.json?limit=100&offset=100"
+        ]
+        assert 2024 in store.seasons()
+
+
+class TestQueryEndpoint:
+    """Test cases for /query/results and results ingestion"""
+
+    @pytest.fixture
+    def client(self, store):
+        set_results_store(store)
+        yield TestClient(app)
+        set_results_store(None)
+        app.dependency_overrides.clear()
+
+    def test_query_endpoint(self, client):
+        """Test filtering and paging through the endpoint"""
+        response = client.get("/query/results", params={
+            "circuit": "monza", "position_to": 1, "limit": 2
+        })
+        assert response.status_code == 200
+        body = response.json()
+        assert [r["driverId"] for r in body["results"]] == ["hamilton", "leclerc"]
+
+        response = client.get("/query/results", params={
+            "circuit": "monza", "position_to": 1, "limit": 2, "cursor": body["next_cursor"]
+        })
+        assert [r["driverId"] for r in response.json()["results"]] == ["norris", "leclerc"]
+        assert response.json()["next_cursor"] is None
+
+    def test_invalid_parameters(self, client):
+        """Test that bad cursors and limits are rejected"""
+        assert client.get("/query/results", params={"cursor": "bogus"}).status_code == 400
+        assert client.get("/query/results", params={"limit": 0}).status_code == 422
+
+    def test_race_results_are_ingested(self, client, store):
+        """Test that results served by the API are added to the store"""
+        service = Mock()
+        service.make_request.return_value = results_response(
+            race(2024, 5, "miami", ["norris", "verstappen"])
+        )
+        app.dependency_overrides[get_f1_service] = lambda: service
+        assert client.get("/seasons/2024/5/results").status_code == 200
+        winners = client.get("/query/results", params={"circuit": "miami"}).json()["results"]
+        assert [r["driverId"] for r in winners] == ["norris", "verstappen"]
+
+    def test_unchanged_results_are_not_rewritten(self, client, store, monkeypatch):
+        """Test that serving the same results again makes no write"""
+        service = Mock()
+        service.make_request.return_value = results_response(
+            race(2024, 5, "miami", ["norris", "verstappen"])
+        )
+        app.dependency_overrides[get_f1_service] = lambda: service
+        assert client.get("/seasons/2024/5/results").status_code == 200
+
+        apply_round = Mock()
+        monkeypatch.setattr(api_main.get_circuit_stats(), "apply_round", apply_round)
+        written = []
+        ingest_changed = store.ingest_changed
+        monkeypatch.setattr(store, "ingest_changed",
+                            lambda data: written.append(ingest_changed(data)) or written[-1])
+        assert client.get("/seasons/2024/5/results").status_code == 200
+        assert written == [[]]
+        apply_round.assert_not_called()
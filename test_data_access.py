@@ -0,0 +1,258 @@
+"""
+Test suite for the cached DataFrame data-access library
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from src import data_access
+from src.data_access import (
+    load_qualifying, load_results, load_standings, parse_lap_time
+)
+
+CURRENT = datetime.now().year
+
+
+def paged(endpoint, rows, build):
+    """Serve one Ergast page of rows for a limit/offset endpoint"""
+    params = dict(part.split("=") for part in endpoint.split("?", 1)[1].split("&"))
+    offset, limit = int(params["offset"]), int(params["limit"])
+    return {"MRData": {"total": str(len(rows)), **build(rows[offset:offset + limit])}}
+
+
+def races_table(entries, key):
+    """Group (season, round, entry) tuples into an Ergast RaceTable"""
+    races = {}
+    for season, round_num, entry in entries:
+        race = races.setdefault((season, round_num), {
+            "season": str(season), "round": str(round_num), "raceName": f"GP {round_num}",
+            "date": f"{season}-03-{round_num:02d}", "Circuit": {"circuitId": f"circuit{round_num}"},
+            key: [],
+        })
+        race[key].append(entry)
+    return {"RaceTable": {"Races": list(races.values())}}
+
+
+class FakeErgast:
+    """Thread-safe stand-in for F1APIService serving synthetic seasons"""
+
+    def __init__(self, rounds=6, cars=20, delay=0.0):
+        self.rounds = rounds
+        self.cars = cars
+        self.delay = delay
+        self.calls = []
+        self.threads = set()
+        self.lock = threading.Lock()
+
+    def result(self, season, round_num, position):
+        return {
+            "number": str(position), "position": str(position),
+            "positionText": "R" if position == self.cars else str(position),
+            "points": str(max(0, 11 - position)), "grid": str(position), "laps": "57",
+            "status": "Engine" if position == self.cars else "Finished",
+            "Driver": {"driverId": f"driver{position}"},
+            "Constructor": {"constructorId": f"team{position % 10}"},
+            "Time": {"millis": str(5_400_000 + position * 1000)} if position < 5 else None,
+            "FastestLap": {"rank": str(position), "Time": {"time": "1:32.608"}},
+        }
+
+    def make_request(self, endpoint):
+        with self.lock:
+            self.calls.append(endpoint)
+            self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        season = int(endpoint.split("/", 1)[0])
+        if "/results.json" in endpoint:
+            rows = [(season, r, self.result(season, r, p))
+                    for r in range(1, self.rounds + 1) for p in range(1, self.cars + 1)]
+            return paged(endpoint, rows, lambda page: races_table(page, "Results"))
+        if "/qualifying.json" in endpoint:
+            rows = [(season, r, {"position": str(p), "number": str(p),
+                                 "Driver": {"driverId": f"driver{p}"},
+                                 "Constructor": {"constructorId": f"team{p % 10}"},
+                                 "Q1": "1:30.031", "Q2": "1:29.5" if p <= 15 else "",
+                                 "Q3": "1:29.179" if p <= 10 else None})
+                    for r in range(1, self.rounds + 1) for p in range(1, self.cars + 1)]
+            return paged(endpoint, rows, lambda page: races_table(page, "QualifyingResults"))
+        rows = [{"position": str(p), "points": str(100 - p), "wins": "0",
+                 "Driver": {"driverId": f"driver{p}"},
+                 "Constructors": [{"constructorId": f"team{p % 10}"}]}
+                for p in range(1, self.cars + 1)]
+        return paged(endpoint, rows, lambda page: {"StandingsTable": {"StandingsLists": [
+            {"season": str(season), "round": str(self.rounds), "DriverStandings": page}
+        ]}})
+
+
+class TestParsing:
+    """Test cases for flattening and typing"""
+
+    @pytest.mark.parametrize("value, seconds", [
+        ("1:23.456", 83.456), ("59.1", 59.1), ("", None), (None, None), ("DNF", None),
+    ])
+    def test_parse_lap_time(self, value, seconds):
+        """Test lap time strings are converted to seconds"""
+        assert parse_lap_time(value) == (pytest.approx(seconds) if seconds else None)
+
+    def test_results_are_typed(self):
+        """Test that ids are categorical and positions and times numeric"""
+        service = FakeErgast(rounds=2, cars=20)
+        results = load_results(2023, use_cache=False, service=service)
+
+        assert len(results) == 40
+        assert results["driverId"].dtype == "category"
+        assert results["status"].dtype == "category"
+        assert results["position"].dtype == "Int16"
+        assert results["points"].dtype == "float64"
+        assert results["date"].dtype == "datetime64[ns]"
+        winner = results.iloc[0]
+        assert winner["time"] == pytest.approx(5401.0)
+        assert winner["fastestLapTime"] == pytest.approx(92.608)
+        assert pd.isna(results.iloc[19]["time"])
+        assert results.iloc[19]["positionText"] == "R"
+
+    def test_qualifying_sessions_in_seconds(self):
+        """Test that missing qualifying sessions are NaN"""
+        qualifying = load_qualifying(2023, use_cache=False, service=FakeErgast(rounds=1))
+        assert qualifying["q1"].iloc[0] == pytest.approx(90.031)
+        assert qualifying["q3"].isna().sum() == 10
+        assert qualifying["q2"].isna().sum() == 5
+
+    def test_standings(self):
+        """Test driver standings with their latest constructor"""
+        standings = load_standings(2023, use_cache=False, service=FakeErgast(cars=22))
+        assert list(standings["position"]) == list(range(1, 23))
+        assert standings["constructorId"].iloc[0] == "team1"
+        with pytest.raises(ValueError):
+            load_standings(2023, kind="teams", use_cache=False, service=FakeErgast())
+
+
+class TestFetching:
+    """Test cases for fetching from the Ergast API"""
+
+    def test_every_page_is_fetched(self):
+        """Test that seasons larger than one Ergast page are paged through"""
+        service = FakeErgast(rounds=12, cars=20)
+        results = load_results(2023, use_cache=False, service=service)
+        assert len(results) == 240
+        assert len(service.calls) == 3
+        assert results.groupby("round", observed=True).size().eq(20).all()
+
+    def test_missing_seasons_fetched_in_parallel(self):
+        """Test that several seasons are fetched at once, returned in season order"""
+        service = FakeErgast(rounds=1, delay=0.05)
+        results = load_results([2003, 2001, 2002, 2000], use_cache=False, service=service,
+                               max_workers=4)
+        assert list(results["season"].unique()) == [2000, 2001, 2002, 2003]
+        assert len(service.threads) > 1
+
+    def test_rate_limited_requests_are_retried(self):
+        """Test that 429 responses are waited out rather than failing the load"""
+        service = FakeErgast(rounds=1)
+        rejections = [HTTPException(status_code=429, detail="slow down",
+                                    headers={"Retry-After": "0"})]
+        make_request = service.make_request
+
+        def limited(endpoint):
+            if rejections:
+                raise rejections.pop()
+            return make_request(endpoint)
+
+        service.make_request = limited
+        assert len(load_results(2023, use_cache=False, service=service)) == 20
+
+    def test_other_errors_propagate(self):
+        """Test that upstream failures are not retried"""
+        service = FakeErgast()
+        service.make_request = lambda endpoint: (_ for _ in ()).throw(
+            HTTPException(status_code=503, detail="down"))
+        with pytest.raises(HTTPException):
+            load_results(2023, use_cache=False, service=service)
+
+    def test_cache_freshness(self, tmp_path):
+        """Test that files written during their season expire and later ones do not"""
+        path = str(tmp_path / "2023.parquet")
+        assert not data_access._is_fresh(path, 2023)
+        open(path, "w").close()
+        assert data_access._is_fresh(path, CURRENT)
+
+        during = datetime(2023, 12, 31, 12).timestamp()
+        os.utime(path, (during, during))
+        assert not data_access._is_fresh(path, 2023)
+        after = datetime(2024, 1, 1, 12).timestamp()
+        os.utime(path, (after, after))
+        assert data_access._is_fresh(path, 2023)
+        assert not data_access._is_fresh(path, 2024)
+
+    def test_cache_needs_pyarrow(self, monkeypatch, tmp_path):
+        """Test that a missing Parquet engine is reported before any fetch"""
+        monkeypatch.setattr(data_access.importlib.util, "find_spec", lambda name: None)
+        service = FakeErgast()
+        with pytest.raises(ImportError, match="pyarrow"):
+            load_results(2023, cache_dir=str(tmp_path), service=service)
+        assert service.calls == []
+
+
+class TestParquetCache:
+    """Test cases for the on-disk Parquet cache"""
+
+    @pytest.fixture(autouse=True)
+    def parquet_engine(self):
+        pytest.importorskip("pyarrow")
+
+    def test_second_load_reads_cache(self, tmp_path):
+        """Test that cached seasons are not fetched again and keep their types"""
+        service = FakeErgast(rounds=2)
+        first = load_results(range(2000, 2004), cache_dir=str(tmp_path), service=service)
+        calls = len(service.calls)
+        second = load_results(range(2000, 2004), cache_dir=str(tmp_path), service=service)
+
+        assert len(service.calls) == calls
+        pd.testing.assert_frame_equal(first, second)
+        cached = sorted(os.listdir(tmp_path / "results"))
+        assert cached == [f"{season}.parquet" for season in range(2000, 2004)]
+
+    def test_only_missing_seasons_fetched(self, tmp_path):
+        """Test that a wider range fetches only the new seasons"""
+        service = FakeErgast(rounds=1)
+        load_results([2000, 2001], cache_dir=str(tmp_path), service=service)
+        service.calls.clear()
+        results = load_results([2000, 2001, 2002], cache_dir=str(tmp_path), service=service)
+        assert {call.split("/")[0] for call in service.calls} == {"2002"}
+        assert results["driverId"].dtype == "category"
+        assert len(results) == 60
+
+    def test_current_season_expires(self, tmp_path):
+        """Test that the current season is refetched once its file is old"""
+        service = FakeErgast(rounds=1)
+        load_results(CURRENT, cache_dir=str(tmp_path), service=service)
+        path = tmp_path / "results" / f"{CURRENT}.parquet"
+        stale = time.time() - data_access.CURRENT_SEASON_MAX_AGE - 1
+        os.utime(path, (stale, stale))
+        service.calls.clear()
+        load_results(CURRENT, cache_dir=str(tmp_path), service=service)
+        assert len(service.calls) == 1
+
+    def test_season_cached_before_it_ended_expires(self, tmp_path):
+        """Test that a past season cached mid-season is refetched once"""
+        service = FakeErgast(rounds=1)
+        load_results(2023, cache_dir=str(tmp_path), service=service)
+        path = tmp_path / "results" / "2023.parquet"
+        during = datetime(2023, 7, 1).timestamp()
+        os.utime(path, (during, during))
+        service.calls.clear()
+        load_results(2023, cache_dir=str(tmp_path), service=service)
+        load_results(2023, cache_dir=str(tmp_path), service=service)
+        assert len(service.calls) == 1
+
+    def test_refresh_refetches(self, tmp_path):
+        """Test that refresh=True ignores the cache"""
+        service = FakeErgast(rounds=1)
+        load_qualifying(2010, cache_dir=str(tmp_path), service=service)
+        load_qualifying(2010, cache_dir=str(tmp_path), service=service, refresh=True)
+        assert len(service.calls) == 2
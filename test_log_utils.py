@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for log_utils.py
+"""
+
+import logging
+import os
+import tempfile
+import unittest
+from logging.handlers import QueueHandler
+from unittest.mock import Mock
+
+from log_utils import BatchSummary, _stop_listener, setup_queue_logging
+
+
+class TestQueueLogging(unittest.TestCase):
+    """Test cases for background-thread log handling."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = logging.getLogger()
+        self.saved_handlers = list(self.root.handlers)
+        self.saved_level = self.root.level
+
+    def tearDown(self):
+        for handler in list(self.root.handlers):
+            self.root.removeHandler(handler)
+        for handler in self.saved_handlers:
+            self.root.addHandler(handler)
+        self.root.setLevel(self.saved_level)
+        self.tmpdir.cleanup()
+
+    def test_records_reach_log_file(self):
+        """Test that queued records are written once the listener stops."""
+        log_file = os.path.join(self.tmpdir.name, 'test.log')
+        listener = setup_queue_logging(log_file)
+        self.assertEqual(len(self.root.handlers), 1)
+        self.assertIsInstance(self.root.handlers[0], QueueHandler)
+        self.assertEqual(self.root.level, logging.INFO)
+
+        logging.info("queued %s", "message")
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+        with open(log_file) as fh:
+            self.assertIn("INFO - queued message", fh.read())
+
+    def test_replaced_handlers_are_closed(self):
+        """Test that the root handlers being replaced release their files."""
+        old_handler = logging.FileHandler(os.path.join(self.tmpdir.name, 'old.log'))
+        self.root.addHandler(old_handler)
+        listener = setup_queue_logging(os.path.join(self.tmpdir.name, 'test.log'))
+        self.assertIsNone(old_handler.stream)
+        self.assertNotIn(old_handler, self.saved_handlers)
+
+        # Stopping again, as the exit hook does after a manual stop, is safe
+        listener.stop()
+        self.assertFalse(listener.running)
+        _stop_listener(listener, listener.handlers)
+
+
+class TestBatchSummary(unittest.TestCase):
+    """Test cases for batched summary logging."""
+
+    def test_logs_once_per_batch(self):
+        """Test that a summary line is logged every `every` calls."""
+        logger = Mock()
+        summary = BatchSummary("words", every=3, logger=logger)
+        for _ in range(7):
+            summary.record(10)
+        self.assertEqual(logger.info.call_count, 2)
+        summary.flush()
+        self.assertEqual(logger.info.call_count, 3)
+        self.assertEqual(summary.calls, 7)
+        self.assertEqual(summary.items, 70)
+
+    def test_flush_without_records_is_silent(self):
+        """Test that flushing an empty batch logs nothing."""
+        logger = Mock()
+        with BatchSummary("colors", logger=logger):
+            pass
+        logger.info.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
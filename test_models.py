@@ -0,0 +1,126 @@
+"""
+Test suite for the lap-time and race-winner models
+"""
+
+import numpy as np
+import pytest
+
+from src.models.lap_times import (
+    LapTimeModel, predict_lap_time_batch, predict_lap_times, train_lap_time_model
+)
+from src.models.race_winner import (
+    RaceWinnerModel, predict_race_winners, segment_softmax, train_race_winner_model
+)
+
+BASE = {"monza": 82.0, "spa": 106.0}
+COMPOUND_OFFSET = {"SOFT": -0.8, "MEDIUM": 0.0, "HARD": 0.5}
+
+
+def synthetic_laps(n, seed=0):
+    """Generate laps whose times follow a known formula"""
+    rng = np.random.default_rng(seed)
+    laps, times = [], []
+    for _ in range(n):
+        circuit = rng.choice(list(BASE))
+        compound = rng.choice(list(COMPOUND_OFFSET))
+        lap = int(rng.integers(1, 54))
+        tyre_age = int(rng.integers(0, 30))
+        laps.append({"circuit": str(circuit), "lap": lap, "total_laps": 53,
+                     "tyre_age": tyre_age, "compound": str(compound)})
+        times.append(BASE[circuit] + 3.0 * (1 - lap / 53) + 0.05 * tyre_age
+                     + 0.001 * tyre_age ** 2 + COMPOUND_OFFSET[compound])
+    return laps, times
+
+
+def synthetic_races(n, seed=0):
+    """Generate races where a better grid slot makes winning more likely"""
+    rng = np.random.default_rng(seed)
+    races, winners = [], []
+    for _ in range(n):
+        entrants = [{"grid": grid, "qualifying_gap": 0.1 * (grid - 1) + rng.normal(0, 0.05),
+                     "recent_form": rng.uniform(0, 10)} for grid in range(1, 11)]
+        scores = -0.8 * np.arange(10) + rng.gumbel(size=10)
+        races.append(entrants)
+        winners.append(int(np.argmax(scores)))
+    return races, winners
+
+
+class TestLapTimeModel:
+    """Test cases for the lap-time model"""
+
+    def test_training_recovers_lap_times(self):
+        """Test that a fitted model reproduces the generating formula"""
+        laps, times = synthetic_laps(500)
+        model = train_lap_time_model(laps, times)
+        new_laps, expected = synthetic_laps(50, seed=1)
+        assert np.allclose(predict_lap_times(model, new_laps), expected, atol=0.01)
+
+    def test_batch_prediction_splits_per_request(self):
+        """Test that batched requests get their own predictions back"""
+        laps, times = synthetic_laps(200)
+        model = train_lap_time_model(laps, times)
+        requests = [laps[:3], laps[3:4], [], laps[4:10]]
+        batched = predict_lap_time_batch(model, requests)
+        assert [len(r) for r in batched] == [3, 1, 0, 6]
+        assert batched[3] == pytest.approx(predict_lap_times(model, laps[4:10]))
+
+    def test_unknown_circuit(self):
+        """Test that laps at circuits the model has not seen are rejected"""
+        laps, times = synthetic_laps(50)
+        model = train_lap_time_model(laps, times)
+        with pytest.raises(ValueError):
+            predict_lap_times(model, [{"circuit": "monaco", "lap": 1, "total_laps": 78}])
+
+    def test_save_and_load(self, tmp_path):
+        """Test that a saved model predicts identically after loading"""
+        laps, times = synthetic_laps(100)
+        model = train_lap_time_model(laps, times)
+        path = str(tmp_path / "lap_times.npz")
+        model.save(path)
+        loaded = LapTimeModel.load(path)
+        assert loaded.circuits == model.circuits
+        assert predict_lap_times(loaded, laps[:5]) == pytest.approx(predict_lap_times(model, laps[:5]))
+
+
+class TestRaceWinnerModel:
+    """Test cases for the race-winner model"""
+
+    def test_segment_softmax(self):
+        """Test that probabilities sum to one within each race"""
+        scores = np.array([1.0, 2.0, 3.0, 1000.0, 1000.0])
+        probabilities = segment_softmax(scores, np.array([0, 3]))
+        assert probabilities[:3].sum() == pytest.approx(1.0)
+        assert probabilities[3:] == pytest.approx([0.5, 0.5])
+
+    def test_training_favours_front_of_grid(self):
+        """Test that the fitted model ranks pole sitters as favourites"""
+        races, winners = synthetic_races(300)
+        model = train_race_winner_model(races, winners)
+        [probabilities] = predict_race_winners(model, races[:1])
+        assert np.argmax(probabilities) == 0
+        assert sum(probabilities) == pytest.approx(1.0)
+
+    def test_batched_races_match_single_races(self):
+        """Test that races scored together equal races scored alone"""
+        races, winners = synthetic_races(100)
+        model = train_race_winner_model(races, winners)
+        batch = [races[0], races[1][:3], races[2][:1]]
+        together = predict_race_winners(model, batch)
+        for race, probabilities in zip(batch, together):
+            assert probabilities == pytest.approx(predict_race_winners(model, [race])[0])
+        assert together[2] == [1.0]
+
+    def test_empty_race_rejected(self):
+        """Test that a race without entrants is an error"""
+        model = RaceWinnerModel(np.zeros(3), np.zeros(3), np.ones(3))
+        with pytest.raises(ValueError):
+            predict_race_winners(model, [[]])
+
+    def test_save_and_load(self, tmp_path):
+        """Test that a saved model predicts identically after loading"""
+        races, winners = synthetic_races(50)
+        model = train_race_winner_model(races, winners)
+        path = str(tmp_path / "race_winner.npz")
+        model.save(path)
+        loaded = RaceWinnerModel.load(path)
+        assert predict_race_winners(loaded, races[:2]) == predict_race_winners(model, races[:2])
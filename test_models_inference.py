@@ -0,0 +1,244 @@
+"""
+Test suite for micro-batched inference and the prediction endpoints
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+import src.api.main as api_main
+from src.api.main import app, set_predictor
+from src.models.inference import MicroBatcher, percentile
+from src.models.lap_times import train_lap_time_model
+from src.models.race_winner import train_race_winner_model
+from test_models import synthetic_laps, synthetic_races
+
+
+def doubling_batch(calls):
+    """Return a batch function doubling each input and recording batch sizes"""
+    def predict_batch(items):
+        calls.append(len(items))
+        return [item * 2 for item in items]
+    return predict_batch
+
+
+class TestMicroBatcher:
+    """Test cases for MicroBatcher"""
+
+    def test_concurrent_requests_are_batched(self):
+        """Test that concurrent requests share batches and get their own results"""
+        calls = []
+        batcher = MicroBatcher(doubling_batch(calls), max_batch_size=16, max_wait=0.05)
+
+        async def scenario():
+            results = await asyncio.gather(*(batcher.predict(i) for i in range(40)))
+            await batcher.stop()
+            return results
+
+        assert asyncio.run(scenario()) == [i * 2 for i in range(40)]
+        assert sum(calls) == 40
+        assert max(calls) <= 16
+        assert len(calls) < 40
+        metrics = batcher.metrics()
+        assert metrics["requests"] == 40
+        assert metrics["batches"] == len(calls)
+        assert metrics["mean_batch_size"] == pytest.approx(40 / len(calls), abs=0.01)
+        assert metrics["latency_ms"]["p99"] >= metrics["latency_ms"]["p50"] > 0
+
+    def test_lone_request_waits_at_most_max_wait(self):
+        """Test that a single request is dispatched after the wait window"""
+        calls = []
+        batcher = MicroBatcher(doubling_batch(calls), max_batch_size=64, max_wait=0.01)
+
+        async def scenario():
+            start = time.perf_counter()
+            result = await batcher.predict(21)
+            elapsed = time.perf_counter() - start
+            await batcher.stop()
+            return result, elapsed
+
+        result, elapsed = asyncio.run(scenario())
+        assert result == 42
+        assert calls == [1]
+        assert elapsed < 0.5
+
+    def test_runs_off_the_event_loop(self):
+        """Test that batches run on worker threads, not the event loop thread"""
+        threads = []
+
+        def predict_batch(items):
+            threads.append(threading.get_ident())
+            return items
+
+        batcher = MicroBatcher(predict_batch, max_wait=0)
+
+        async def scenario():
+            await batcher.predict(1)
+            await batcher.stop()
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(scenario())
+        assert threads and threads[0] != loop_thread
+
+    def test_bad_input_fails_only_its_request(self):
+        """Test that one failing input does not fail the rest of its batch"""
+        def predict_batch(items):
+            if any(item < 0 for item in items):
+                raise ValueError("negative input")
+            return [item + 1 for item in items]
+
+        batcher = MicroBatcher(predict_batch, max_batch_size=8, max_wait=0.05)
+
+        async def scenario():
+            results = await asyncio.gather(*(batcher.predict(i) for i in (1, -1, 2)),
+                                           return_exceptions=True)
+            await batcher.stop()
+            return results
+
+        ok, failed, ok2 = asyncio.run(scenario())
+        assert (ok, ok2) == (2, 3)
+        assert isinstance(failed, ValueError)
+        metrics = batcher.metrics()
+        assert metrics["errors"] == 1
+        assert (metrics["requests"], metrics["batches"]) == (3, 1)
+        assert metrics["batch_sizes"] == {3: 1}
+        assert metrics["latency_ms"]["p99"] is not None
+
+    def test_failed_isolation_fails_the_whole_batch(self):
+        """Test that callers are released when the one-by-one rerun cannot be scheduled"""
+        executor = ThreadPoolExecutor(max_workers=1)
+
+        def predict_batch(items):
+            executor.shutdown(wait=False)
+            raise ValueError("bad batch")
+
+        batcher = MicroBatcher(predict_batch, max_batch_size=8, max_wait=0.05,
+                               executor=executor)
+
+        async def scenario():
+            results = await asyncio.wait_for(
+                asyncio.gather(*(batcher.predict(i) for i in range(3)),
+                               return_exceptions=True),
+                timeout=5,
+            )
+            await batcher.stop()
+            return results
+
+        results = asyncio.run(scenario())
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert batcher.metrics()["errors"] == 3
+
+    def test_stop_fails_queued_requests(self):
+        """Test that stop() fails requests that were still waiting for a batch"""
+        release = threading.Event()
+
+        def predict_batch(items):
+            release.wait(5)
+            return items
+
+        batcher = MicroBatcher(predict_batch, max_batch_size=1, max_wait=0, workers=1)
+
+        async def scenario():
+            tasks = [asyncio.ensure_future(batcher.predict(i)) for i in range(4)]
+            await asyncio.sleep(0.05)
+            stopping = asyncio.ensure_future(batcher.stop())
+            await asyncio.sleep(0.05)
+            release.set()
+            await stopping
+            return await asyncio.wait_for(
+                asyncio.gather(*tasks, return_exceptions=True), timeout=5
+            )
+
+        results = asyncio.run(scenario())
+        assert results[0] == 0
+        assert all(isinstance(result, RuntimeError) for result in results[1:])
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        assert percentile([], 50) is None
+        assert percentile([3, 1, 2], 50) == 2
+        assert percentile(list(range(1, 101)), 99) == 99
+
+
+class TestPredictionEndpoints:
+    """Test cases for /predict endpoints"""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        laps, times = synthetic_laps(300)
+        lap_path = str(tmp_path / "lap_times.npz")
+        train_lap_time_model(laps, times).save(lap_path)
+        races, winners = synthetic_races(200)
+        winner_path = str(tmp_path / "race_winner.npz")
+        train_race_winner_model(races, winners).save(winner_path)
+        monkeypatch.setenv("F1_API_LAP_TIME_MODEL", lap_path)
+        monkeypatch.setenv("F1_API_RACE_WINNER_MODEL", winner_path)
+        set_predictor("lap_times", None)
+        set_predictor("race_winner", None)
+        yield TestClient(app)
+        set_predictor("lap_times", None)
+        set_predictor("race_winner", None)
+
+    def test_predict_lap_times(self, client):
+        """Test lap-time predictions and their metrics"""
+        laps, expected = synthetic_laps(3, seed=5)
+        response = client.post("/predict/lap-times", json={"laps": laps})
+        assert response.status_code == 200
+        assert response.json()["lap_times"] == pytest.approx(expected, abs=0.01)
+
+        metrics = client.get("/predict/metrics").json()
+        assert metrics["lap_times"]["requests"] == 1
+        assert metrics["lap_times"]["batch_sizes"] == {"1": 1}
+
+    def test_unknown_circuit_is_422(self, client):
+        """Test that laps the model cannot score are rejected"""
+        response = client.post("/predict/lap-times", json={"laps": [
+            {"circuit": "monaco", "lap": 1, "total_laps": 78}
+        ]})
+        assert response.status_code == 422
+
+    def test_predict_race_winner(self, client):
+        """Test that entrants are returned ordered by win probability"""
+        response = client.post("/predict/race-winner", json={"entrants": [
+            {"driverId": "back", "grid": 10, "qualifying_gap": 1.2},
+            {"driverId": "pole", "grid": 1},
+        ]})
+        assert response.status_code == 200
+        predictions = response.json()["predictions"]
+        assert predictions[0]["driverId"] == "pole"
+        assert sum(p["probability"] for p in predictions) == pytest.approx(1.0)
+        assert client.post("/predict/race-winner", json={"entrants": []}).status_code == 422
+
+    def test_model_not_configured(self, client, monkeypatch):
+        """Test that prediction endpoints answer 503 without a model"""
+        monkeypatch.delenv("F1_API_LAP_TIME_MODEL")
+        set_predictor("lap_times", None)
+        response = client.post("/predict/lap-times", json={"laps": []})
+        assert response.status_code == 503
+        assert "lap_times" not in api_main._predictors
+
+    def test_missing_model_file(self, client, monkeypatch, tmp_path):
+        """Test that a configured but missing model file answers 503"""
+        monkeypatch.setenv("F1_API_RACE_WINNER_MODEL", str(tmp_path / "missing.npz"))
+        set_predictor("race_winner", None)
+        response = client.post("/predict/race-winner", json={"entrants": [
+            {"driverId": "pole", "grid": 1},
+        ]})
+        assert response.status_code == 503
+        assert "race_winner" not in api_main._predictors
+
+    def test_race_winner_model_errors_are_422(self, client):
+        """Test that inputs the model rejects answer 422"""
+        def predict_batch(races):
+            raise ValueError("grid must be positive")
+
+        set_predictor("race_winner", MicroBatcher(predict_batch, name="race_winner"))
+        response = client.post("/predict/race-winner", json={"entrants": [
+            {"driverId": "pole", "grid": 0},
+        ]})
+        assert response.status_code == 422
+        assert response.json()["detail"] == "grid must be positive"
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for parallel_random.py and the parallel generation modes
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from parallel_random import iter_shards, shard_sizes
+from random_colors import (
+    generate_random_colors_parallel, get_color_list, write_random_colors_parallel,
+)
+from random_words import generate_random_words_parallel, get_word_list, write_random_words_parallel
+
+
+def _seed_shard(size, seed):
+    """Return the first size draws of a shard's stream."""
+    return np.random.default_rng(seed).integers(0, 1 << 30, size=size)
+
+
+class TestShards(unittest.TestCase):
+    """Test cases for shard planning and dispatch."""
+
+    def test_shard_sizes(self):
+        """Test that shard sizes cover the count exactly."""
+        self.assertEqual(shard_sizes(10, 4), [4, 4, 2])
+        self.assertEqual(shard_sizes(8, 4), [4, 4])
+        self.assertEqual(shard_sizes(0, 4), [])
+
+    def test_shard_sizes_rejects_invalid(self):
+        """Test that invalid counts and shard sizes raise ValueError."""
+        with self.assertRaises(ValueError):
+            shard_sizes(-1)
+        with self.assertRaises(ValueError):
+            shard_sizes(10, 0)
+
+    def test_shards_use_independent_streams(self):
+        """Test that every shard gets a different stream."""
+        shards = list(iter_shards(_seed_shard, 40, seed=1, workers=1, shard_size=10))
+        self.assertEqual(len(shards), 4)
+        self.assertFalse(np.array_equal(shards[0], shards[1]))
+
+    def test_output_independent_of_workers(self):
+        """Test that results and their order do not depend on worker count."""
+        serial = list(iter_shards(_seed_shard, 50, seed=2, workers=1, shard_size=7))
+        parallel = list(iter_shards(_seed_shard, 50, seed=2, workers=3, shard_size=7))
+        self.assertEqual(len(serial), len(parallel))
+        for left, right in zip(serial, parallel):
+            np.testing.assert_array_equal(left, right)
+
+
+class TestParallelGeneration(unittest.TestCase):
+    """Test cases for parallel word and color generation."""
+
+    def test_parallel_words_reproducible(self):
+        """Test that (seed, count) reproduces the same words across worker counts."""
+        serial = generate_random_words_parallel(1000, seed=3, workers=1, shard_size=128)
+        parallel = generate_random_words_parallel(1000, seed=3, workers=2, shard_size=128)
+        self.assertEqual(len(serial), 1000)
+        self.assertEqual(list(serial), list(parallel))
+        self.assertTrue(set(serial) <= set(get_word_list()))
+
+    def test_parallel_colors_reproducible(self):
+        """Test that (seed, count) reproduces the same colors across worker counts."""
+        serial = generate_random_colors_parallel(1000, seed=4, workers=1, shard_size=128)
+        parallel = generate_random_colors_parallel(1000, seed=4, workers=2, shard_size=128)
+        self.assertEqual(list(serial), list(parallel))
+        self.assertTrue(set(serial) <= set(get_color_list()))
+
+    def test_parallel_zero_count(self):
+        """Test that a zero count yields an empty result."""
+        self.assertEqual(len(generate_random_words_parallel(0, workers=2)), 0)
+        self.assertEqual(len(generate_random_colors_parallel(0, workers=2)), 0)
+
+    def test_parallel_writes_match_generation(self):
+        """Test that parallel file output matches in-memory generation."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            words_path = os.path.join(tmpdir, 'words.txt')
+            colors_path = os.path.join(tmpdir, 'colors.txt')
+            write_random_words_parallel(words_path, 500, seed=5, workers=2, shard_size=64)
+            write_random_colors_parallel(colors_path, 500, seed=5, workers=2, shard_size=64)
+            with open(words_path, encoding='utf-8') as fh:
+                words = fh.read().splitlines()
+            with open(colors_path, encoding='utf-8') as fh:
+                colors = fh.read().splitlines()
+        self.assertEqual(words, list(generate_random_words_parallel(500, seed=5, workers=1, shard_size=64)))
+        self.assertEqual(colors, list(generate_random_colors_parallel(500, seed=5, workers=1, shard_size=64)))
+
+    def test_parallel_writes_return_lines_written(self):
+        """Test that parallel writers count the lines their shards actually wrote."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'out.txt')
+            self.assertEqual(write_random_words_parallel(path, 300, seed=6, workers=2,
+                                                         shard_size=64), 300)
+            self.assertEqual(write_random_colors_parallel(path, 0, workers=2), 0)
+            short_shards = lambda *args, **kwargs: iter([b'a\nb\n', b'c\n'])
+            with patch('random_words.iter_shards', short_shards):
+                self.assertEqual(write_random_words_parallel(path, 10), 3)
+            with patch('random_colors.iter_shards', short_shards):
+                self.assertEqual(write_random_colors_parallel(path, 10), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,8 +6,16 @@ Tests for random_colors.py script
 import unittest
 import logging
 import io
-from unittest.mock import patch
-from random_colors import get_color_list, generate_random_colors, setup_logging
+import os
+import tempfile
+
+import numpy as np
+from unittest.mock import Mock, patch
+from random_colors import (
+    get_color_list, generate_random_colors, setup_logging, get_palette,
+    generate_color_array, generate_hex_buffer, encode_csv, distinct_palette,
+    rgb_to_lab, write_colors, parse_args,
+)
 
 
 class TestRandomColors(unittest.TestCase):
@@ -114,5 +122,122 @@ class TestRandomColors(unittest.TestCase):
         self.assertIn("blue", unique_colors, "Should generate blue over multiple runs")
 
 
+class TestColorsHighThroughputLogging(unittest.TestCase):
+    """Test cases for the summary-logged fast path."""
+
+    def test_summary_skips_per_call_logging(self):
+        """Test that passing a summary suppresses per-call log lines."""
+        generate_random_colors(1, summary=Mock())  # the list is loaded and logged once
+        summary = Mock()
+        with patch('random_colors.logging') as mock_logging:
+            result = generate_random_colors(3, summary=summary)
+        self.assertEqual(len(result), 3)
+        summary.record.assert_called_once_with(3)
+        mock_logging.info.assert_not_called()
+
+    @patch('random_colors.logging')
+    def test_debug_join_skipped_when_disabled(self, mock_logging):
+        """Test that the debug listing is not built when DEBUG is off."""
+        mock_logging.getLogger.return_value.isEnabledFor.return_value = False
+        generate_random_colors(3)
+        mock_logging.debug.assert_not_called()
+
+
+class TestBulkColorEngine(unittest.TestCase):
+    """Test cases for vectorized RGB generation and output."""
+
+    def test_get_palette_named(self):
+        """Test that named palettes resolve to RGB tables."""
+        table = get_palette('red_blue')
+        np.testing.assert_array_equal(table, [[255, 0, 0], [0, 0, 255]])
+        self.assertEqual(table.dtype, np.uint8)
+        self.assertIsNone(get_palette(None))
+
+    def test_get_palette_rejects_unknown(self):
+        """Test that unknown palette names raise ValueError."""
+        with self.assertRaises(ValueError):
+            get_palette('no_such_palette')
+
+    def test_get_palette_rejects_bad_hex(self):
+        """Test that hex values must be exactly #RRGGBB."""
+        np.testing.assert_array_equal(get_palette(['#A0b1C2']), [[160, 177, 194]])
+        for value in ('#fff', '#12345678', '123456', '#12345g'):
+            with self.assertRaisesRegex(ValueError, '#RRGGBB'):
+                get_palette([value])
+
+    def test_get_palette_rejects_out_of_range_rgb(self):
+        """Test that RGB rows must hold integers from 0 to 255."""
+        for palette in ([[256, 0, 0]], [[-1, 0, 0]], [[0.5, 0, 0]]):
+            with self.assertRaisesRegex(ValueError, '0 to 255'):
+                get_palette(palette)
+
+    def test_distinct_requires_rgb_output(self):
+        """Test that --distinct is rejected where it would be ignored."""
+        self.assertEqual(parse_args(['--out', 'x.csv', '--format', 'csv',
+                                     '--distinct', '4']).distinct, 4)
+        for argv in (['--out', 'x.txt', '--distinct', '4'], ['--distinct', '4']):
+            with patch('sys.stderr', io.StringIO()), self.assertRaises(SystemExit):
+                parse_args(argv)
+
+    def test_color_array_shape_and_values(self):
+        """Test that colors are drawn from the palette as uint8 rows."""
+        rgb = generate_color_array(1000, palette=['#112233', '#445566'], seed=1)
+        self.assertEqual(rgb.shape, (1000, 3))
+        self.assertEqual(rgb.dtype, np.uint8)
+        self.assertEqual({tuple(row) for row in rgb}, {(0x11, 0x22, 0x33), (0x44, 0x55, 0x66)})
+
+    def test_color_array_reproducible(self):
+        """Test that a seed reproduces the same colors."""
+        np.testing.assert_array_equal(generate_color_array(100, palette=None, seed=2),
+                                      generate_color_array(100, palette=None, seed=2))
+
+    def test_hex_buffer_format(self):
+        """Test that the hex buffer holds fixed-width #rrggbb lines."""
+        buffer = generate_hex_buffer(50, palette='tableau10', seed=3)
+        lines = buffer.decode('ascii').splitlines()
+        self.assertEqual(len(buffer), 50 * 8)
+        self.assertEqual(len(lines), 50)
+        rgb = generate_color_array(50, palette='tableau10', seed=3)
+        self.assertEqual(lines[0], '#%02x%02x%02x' % tuple(rgb[0]))
+
+    def test_encode_csv_strips_leading_zeros(self):
+        """Test that CSV rows use plain variable-width integers."""
+        rgb = np.array([[0, 5, 255], [100, 10, 9]], dtype=np.uint8)
+        self.assertEqual(encode_csv(rgb), b'0,5,255\n100,10,9\n')
+
+    def test_distinct_palette_separation(self):
+        """Test that distinct palettes meet the requested separation."""
+        palette = distinct_palette(8, seed=4, min_distance=30)
+        self.assertEqual(palette.shape, (8, 3))
+        lab = rgb_to_lab(palette)
+        distances = np.linalg.norm(lab[:, None] - lab[None], axis=-1)
+        self.assertGreaterEqual(distances[np.triu_indices(8, 1)].min(), 30)
+
+    def test_distinct_palette_impossible_separation(self):
+        """Test that an unreachable separation raises ValueError."""
+        with self.assertRaises(ValueError):
+            distinct_palette(50, seed=5, min_distance=200)
+
+    def test_write_colors_formats(self):
+        """Test binary, hex and CSV output round-trips."""
+        expected = generate_color_array(300, palette='tableau10', seed=6)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = {fmt: os.path.join(tmpdir, f'colors.{fmt}') for fmt in ('rgb', 'hex', 'csv')}
+            for fmt, path in paths.items():
+                write_colors(path, 300, fmt=fmt, palette='tableau10', seed=6, chunk_size=300)
+            binary = np.fromfile(paths['rgb'], dtype=np.uint8).reshape(-1, 3)
+            with open(paths['hex']) as fh:
+                hex_lines = fh.read().splitlines()
+            csv_rows = np.loadtxt(paths['csv'], delimiter=',', skiprows=1, dtype=np.uint8)
+        np.testing.assert_array_equal(binary, expected)
+        self.assertEqual(hex_lines, ['#%02x%02x%02x' % tuple(row) for row in expected])
+        np.testing.assert_array_equal(csv_rows, expected)
+
+    def test_write_colors_rejects_unknown_format(self):
+        """Test that an unknown output format raises ValueError."""
+        with self.assertRaises(ValueError):
+            write_colors(os.devnull, 1, fmt='png')
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -6,8 +6,14 @@ Tests for random_words.py script
 import unittest
 import logging
 import io
-from unittest.mock import patch
-from random_words import get_word_list, generate_random_words, setup_logging
+import os
+import tempfile
+from unittest.mock import Mock, patch
+from random_words import (
+    get_word_list, generate_random_words, setup_logging, get_word_array,
+    iter_random_words, iter_random_word_chunks, generate_random_word_array,
+    write_random_words,
+)
 
 
 class TestRandomWords(unittest.TestCase):
@@ -86,5 +92,82 @@ class TestRandomWords(unittest.TestCase):
         mock_logging.info.assert_any_call("Successfully generated 5 random words")
 
 
+class TestBulkRandomWords(unittest.TestCase):
+    """Test cases for streaming and batch word generation."""
+
+    def test_word_array_is_cached(self):
+        """Test that the word array is built once and reused."""
+        self.assertIs(get_word_array(), get_word_array())
+        self.assertEqual(list(get_word_array()), get_word_list())
+
+    def test_iter_random_words_count(self):
+        """Test that iter_random_words yields exactly count words."""
+        words = list(iter_random_words(1000, seed=1, chunk_size=64))
+        self.assertEqual(len(words), 1000)
+        word_list = set(get_word_list())
+        for word in words:
+            self.assertIn(word, word_list)
+
+    def test_iter_random_word_chunks_bounded(self):
+        """Test that chunks never exceed chunk_size."""
+        sizes = [len(chunk) for chunk in iter_random_word_chunks(1000, seed=1, chunk_size=300)]
+        self.assertEqual(sizes, [300, 300, 300, 100])
+
+    def test_seeded_stream_is_reproducible(self):
+        """Test that the same seed reproduces the same stream."""
+        first = list(iter_random_words(500, seed=42, chunk_size=100))
+        second = list(iter_random_words(500, seed=42, chunk_size=100))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, list(iter_random_words(500, seed=43, chunk_size=100)))
+
+    def test_batch_matches_single_chunk_stream(self):
+        """Test that a batch equals a stream read in one chunk with the same seed."""
+        batch = generate_random_word_array(200, seed=7)
+        self.assertEqual(list(batch), list(iter_random_words(200, seed=7, chunk_size=200)))
+
+    def test_zero_count(self):
+        """Test that a zero count produces no words."""
+        self.assertEqual(list(iter_random_words(0)), [])
+        self.assertEqual(len(generate_random_word_array(0)), 0)
+
+    def test_negative_count_rejected(self):
+        """Test that a negative count raises ValueError."""
+        with self.assertRaises(ValueError):
+            generate_random_word_array(-1)
+        with self.assertRaises(ValueError):
+            list(iter_random_words(-1))
+
+    def test_write_random_words(self):
+        """Test that write_random_words streams one word per line."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'words.txt')
+            written = write_random_words(path, 1000, seed=3, chunk_size=128)
+            with open(path, encoding='utf-8') as fh:
+                lines = fh.read().splitlines()
+        self.assertEqual(written, 1000)
+        self.assertEqual(lines, list(iter_random_words(1000, seed=3, chunk_size=128)))
+
+
+class TestWordsHighThroughputLogging(unittest.TestCase):
+    """Test cases for the summary-logged fast path."""
+
+    def test_summary_skips_per_call_logging(self):
+        """Test that passing a summary suppresses per-call log lines."""
+        generate_random_words(1, summary=Mock())  # the list is loaded and logged once
+        summary = Mock()
+        with patch('random_words.logging') as mock_logging:
+            result = generate_random_words(5, summary=summary)
+        self.assertEqual(len(result), 5)
+        summary.record.assert_called_once_with(5)
+        mock_logging.info.assert_not_called()
+
+    @patch('random_words.logging')
+    def test_debug_join_skipped_when_disabled(self, mock_logging):
+        """Test that the debug listing is not built when DEBUG is off."""
+        mock_logging.getLogger.return_value.isEnabledFor.return_value = False
+        generate_random_words(5)
+        mock_logging.debug.assert_not_called()
+
+
 if __name__ == '__main__':
     unittest.main()
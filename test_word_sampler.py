@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Tests for the WordSampler and bulk generation in src/random_words.py
+"""
+
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from src.random_words import (
+    WordSampler, generate_random_word_array, generate_random_words, get_vocabulary,
+    get_word_array, get_word_list, iter_random_word_chunks, iter_random_words, main,
+    write_random_words
+)
+
+
+class TestVocabulary(unittest.TestCase):
+    """Test cases for the deduplicated vocabulary."""
+
+    def test_vocabulary_has_no_duplicates(self):
+        """Test that the vocabulary removes repeated words."""
+        vocabulary = get_vocabulary()
+        self.assertEqual(len(vocabulary), len(set(vocabulary)))
+        self.assertEqual(set(vocabulary), set(get_word_list()))
+
+    def test_generate_random_words_uses_vocabulary(self):
+        """Test that generated words come from the vocabulary."""
+        vocabulary = set(get_vocabulary())
+        for word in generate_random_words(50):
+            self.assertIn(word, vocabulary)
+
+
+class TestWordSampler(unittest.TestCase):
+    """Test cases for alias-table sampling."""
+
+    def test_default_sampler_deduplicates(self):
+        """Test that the default sampler is built over unique words."""
+        sampler = WordSampler(seed=0)
+        self.assertEqual(len(sampler), len(get_vocabulary()))
+        self.assertTrue(np.allclose(sampler.probabilities, 1.0 / len(sampler)))
+
+    def test_duplicate_weights_are_summed(self):
+        """Test that sequence weights for repeated words are combined."""
+        sampler = WordSampler(["a", "b", "a"], weights=[1, 2, 1])
+        self.assertEqual(list(sampler.vocabulary), ["a", "b"])
+        self.assertTrue(np.allclose(sampler.probabilities, [0.5, 0.5]))
+
+    def test_mapping_weights(self):
+        """Test that mapping weights apply per word and default to zero."""
+        sampler = WordSampler(["a", "b", "c"], weights={"a": 3, "b": 1}, seed=1)
+        self.assertTrue(np.allclose(sampler.probabilities, [0.75, 0.25, 0.0]))
+        self.assertNotIn("c", set(sampler.sample(10000)))
+
+    def test_weighted_frequencies(self):
+        """Test that draw frequencies follow the weights."""
+        sampler = WordSampler(["a", "b", "c", "d"], weights=[1, 2, 3, 4], seed=2)
+        draws = sampler.sample(200000)
+        words, counts = np.unique(draws, return_counts=True)
+        frequencies = dict(zip(words, counts / len(draws)))
+        for word, expected in zip("abcd", [0.1, 0.2, 0.3, 0.4]):
+            self.assertAlmostEqual(frequencies[word], expected, delta=0.01)
+
+    def test_seeded_sampler_is_reproducible(self):
+        """Test that two samplers with the same seed draw the same words."""
+        first = WordSampler(seed=5).sample(1000)
+        second = WordSampler(seed=5).sample(1000)
+        self.assertEqual(list(first), list(second))
+
+    def test_draw_returns_vocabulary_word(self):
+        """Test that single draws come from the vocabulary."""
+        sampler = WordSampler(["x", "y"], weights=[1, 9], seed=3)
+        for _ in range(100):
+            self.assertIn(sampler.draw(), ("x", "y"))
+
+    def test_sample_without_replacement_distinct(self):
+        """Test that sampling without replacement returns distinct words."""
+        sampler = WordSampler(seed=4)
+        draws = sampler.sample_without_replacement(len(sampler))
+        self.assertEqual(len(set(draws)), len(sampler))
+
+    def test_sample_without_replacement_skips_zero_weight(self):
+        """Test that zero-weight words are never drawn without replacement."""
+        sampler = WordSampler(["a", "b", "c"], weights=[1, 1, 0], seed=6)
+        self.assertEqual(set(sampler.sample_without_replacement(2)), {"a", "b"})
+        with self.assertRaises(ValueError):
+            sampler.sample_without_replacement(3)
+
+    def test_sample_without_replacement_prefers_heavy_words(self):
+        """Test that heavier words are picked first more often."""
+        sampler = WordSampler(["light", "heavy"], weights=[1, 99], seed=7)
+        firsts = [sampler.sample_without_replacement(1)[0] for _ in range(200)]
+        self.assertGreater(firsts.count("heavy"), 180)
+
+    def test_invalid_weights_rejected(self):
+        """Test that invalid weights raise ValueError."""
+        with self.assertRaises(ValueError):
+            WordSampler(["a"], weights=[-1])
+        with self.assertRaises(ValueError):
+            WordSampler(["a", "b"], weights=[0, 0])
+        with self.assertRaises(ValueError):
+            WordSampler(["a", "b"], weights=[1])
+        with self.assertRaises(ValueError):
+            WordSampler([])
+
+
+class TestBulkRandomWords(unittest.TestCase):
+    """Test cases for streaming and batch word generation."""
+
+    def test_word_array_is_cached(self):
+        """Test that the word array is built once over the vocabulary."""
+        self.assertIs(get_word_array(), get_word_array())
+        self.assertEqual(list(get_word_array()), list(get_vocabulary()))
+
+    def test_iter_random_words_count(self):
+        """Test that iter_random_words yields exactly count words."""
+        words = list(iter_random_words(1000, seed=1, chunk_size=64))
+        self.assertEqual(len(words), 1000)
+        self.assertTrue(set(words) <= set(get_vocabulary()))
+
+    def test_iter_random_word_chunks_bounded(self):
+        """Test that chunks never exceed chunk_size."""
+        sizes = [len(chunk) for chunk in iter_random_word_chunks(1000, seed=1, chunk_size=300)]
+        self.assertEqual(sizes, [300, 300, 300, 100])
+
+    def test_seeded_stream_is_reproducible(self):
+        """Test that the same seed reproduces the same stream."""
+        first = list(iter_random_words(500, seed=42, chunk_size=100))
+        second = list(iter_random_words(500, seed=42, chunk_size=100))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, list(iter_random_words(500, seed=43, chunk_size=100)))
+
+    def test_batch_matches_single_chunk_stream(self):
+        """Test that a batch equals a stream read in one chunk with the same seed."""
+        batch = generate_random_word_array(200, seed=7)
+        self.assertEqual(list(batch), list(iter_random_words(200, seed=7, chunk_size=200)))
+
+    def test_zero_count(self):
+        """Test that a zero count produces no words."""
+        self.assertEqual(list(iter_random_words(0)), [])
+        self.assertEqual(len(generate_random_word_array(0)), 0)
+
+    def test_invalid_arguments_rejected(self):
+        """Test that a negative count or empty chunk raises ValueError."""
+        with self.assertRaises(ValueError):
+            generate_random_word_array(-1)
+        with self.assertRaises(ValueError):
+            list(iter_random_words(-1))
+        with self.assertRaises(ValueError):
+            list(iter_random_words(10, chunk_size=0))
+
+    def test_write_random_words(self):
+        """Test that write_random_words streams one word per line."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'words.txt')
+            written = write_random_words(path, 1000, seed=3, chunk_size=128)
+            with open(path, encoding='utf-8') as fh:
+                lines = fh.read().splitlines()
+        self.assertEqual(written, 1000)
+        self.assertEqual(lines, list(iter_random_words(1000, seed=3, chunk_size=128)))
+
+    def test_main_writes_to_file(self):
+        """Test that --count/--out/--seed streams a reproducible file."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'words.txt')
+            output = io.StringIO()
+            with redirect_stdout(output):
+                main(['--count', '250', '--out', path, '--seed', '9', '--chunk-size', '100'])
+            with open(path, encoding='utf-8') as fh:
+                lines = fh.read().splitlines()
+        self.assertIn("Wrote 250 words", output.getvalue())
+        self.assertEqual(lines, list(iter_random_words(250, seed=9, chunk_size=100)))
+
+
+if __name__ == '__main__':
+    unittest.main()
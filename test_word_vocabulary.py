@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for word_vocabulary.py
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from word_vocabulary import MappedVocabulary, build_vocabulary
+from random_words import generate_random_words, iter_random_words, write_random_words
+
+
+class TestMappedVocabulary(unittest.TestCase):
+    """Test cases for building and memory-mapping packed vocabularies."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmpdir.name, 'words.txt')
+        self.packed = os.path.join(self.tmpdir.name, 'words.vocab')
+        self.words = ["alpha", "beta", "gamma", "délta", "epsilon"]
+        with open(self.source, 'w', encoding='utf-8') as fh:
+            fh.write("\n".join(self.words[:2]) + "\n\n  " + "\n".join(self.words[2:]) + "\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_build_skips_blank_lines(self):
+        """Test that blank lines are not packed as words."""
+        self.assertEqual(build_vocabulary(self.source, self.packed), len(self.words))
+
+    def test_round_trip(self):
+        """Test that every packed word reads back unchanged."""
+        build_vocabulary(self.source, self.packed)
+        with MappedVocabulary(self.packed) as vocabulary:
+            self.assertEqual(len(vocabulary), len(self.words))
+            self.assertEqual([vocabulary[i] for i in range(len(vocabulary))], self.words)
+            self.assertEqual(vocabulary[-1], "epsilon")
+            self.assertEqual(list(vocabulary.take([4, 0, 3])), ["epsilon", "alpha", "délta"])
+            with self.assertRaises(IndexError):
+                vocabulary[len(self.words)]
+
+    def test_build_in_small_chunks(self):
+        """Test that offset buffering across chunk boundaries is correct."""
+        with patch('word_vocabulary.BUILD_CHUNK_SIZE', 2):
+            build_vocabulary(self.source, self.packed)
+        with MappedVocabulary(self.packed) as vocabulary:
+            self.assertEqual(list(vocabulary.take(range(len(self.words)))), self.words)
+
+    def test_rejects_unpacked_file(self):
+        """Test that opening a plain text file raises ValueError."""
+        with self.assertRaises(ValueError):
+            MappedVocabulary(self.source)
+
+    def test_rejects_truncated_file(self):
+        """Test that truncated files raise a clear error and release the file."""
+        build_vocabulary(self.source, self.packed)
+        size = os.path.getsize(self.packed)
+        with open(self.packed, 'rb') as fh:
+            packed = fh.read()
+
+        handles = []
+        real_open = open
+
+        def tracking_open(*args, **kwargs):
+            handles.append(real_open(*args, **kwargs))
+            return handles[-1]
+
+        # Cut inside the offsets table, then inside the word data
+        for length in (20, size - 3):
+            with open(self.packed, 'wb') as fh:
+                fh.write(packed[:length])
+            with patch('builtins.open', tracking_open):
+                with self.assertRaisesRegex(ValueError, "truncated") as caught:
+                    MappedVocabulary(self.packed)
+            self.assertIn(self.packed, str(caught.exception))
+            self.assertTrue(handles[-1].closed)
+
+    def test_generate_random_words_from_vocabulary(self):
+        """Test that the generators draw from an external vocabulary."""
+        build_vocabulary(self.source, self.packed)
+        with MappedVocabulary(self.packed) as vocabulary:
+            words = generate_random_words(200, vocabulary=vocabulary)
+            streamed = list(iter_random_words(200, seed=1, chunk_size=50, vocabulary=vocabulary))
+        self.assertEqual(len(words), 200)
+        self.assertTrue(set(words) <= set(self.words))
+        self.assertTrue(set(streamed) <= set(self.words))
+
+    def test_write_random_words_from_vocabulary(self):
+        """Test streaming an external vocabulary to disk."""
+        build_vocabulary(self.source, self.packed)
+        out = os.path.join(self.tmpdir.name, 'out.txt')
+        with MappedVocabulary(self.packed) as vocabulary:
+            write_random_words(out, 100, seed=2, vocabulary=vocabulary)
+        with open(out, encoding='utf-8') as fh:
+            lines = fh.read().splitlines()
+        self.assertEqual(len(lines), 100)
+        self.assertTrue(set(lines) <= set(self.words))
+
+
+if __name__ == '__main__':
+    unittest.main()
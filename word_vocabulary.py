@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped external word vocabularies.
+
+Large word lists are packed once into an offset-indexed binary file and then
+memory-mapped, so opening a 100M-word vocabulary costs a header read rather
+than a parse, and only the pages holding sampled words are ever touched.
+
+Packed layout (all integers little-endian uint64):
+
+    magic    8 bytes  b"RWVOCAB1"
+    count    8 bytes  number of words
+    offsets  8 * (count + 1) bytes, word i spans data[offsets[i]:offsets[i + 1]]
+    data     UTF-8 bytes of every word, concatenated
+
+Build a packed file from a text file with one word per line:
+
+    python word_vocabulary.py words.txt words.vocab
+"""
+
+import argparse
+import logging
+import mmap
+import sys
+
+import numpy as np
+
+MAGIC = b"RWVOCAB1"
+HEADER_SIZE = 16
+OFFSET_DTYPE = np.dtype('<u8')
+
+# Number of offsets buffered before each write while building
+BUILD_CHUNK_SIZE = 1 << 20
+
+
+def _iter_source_words(source_path):
+    """Yield each non-blank line of source_path as stripped UTF-8 bytes."""
+    with open(source_path, 'rb') as fh:
+        for line in fh:
+            word = line.strip()
+            if word:
+                yield word
+
+
+def build_vocabulary(source_path, output_path):
+    """Pack a one-word-per-line text file into the memory-mappable format.
+
+    The source is read twice, once to count words and once to write them,
+    so memory use stays bounded by BUILD_CHUNK_SIZE regardless of size.
+
+    Args:
+        source_path: Text file with one word per line
+        output_path: Destination for the packed vocabulary
+
+    Returns:
+        Number of words written
+    """
+    logging.info(f"Building vocabulary from {source_path}")
+    count = sum(1 for _ in _iter_source_words(source_path))
+    data_start = HEADER_SIZE + OFFSET_DTYPE.itemsize * (count + 1)
+
+    with open(output_path, 'wb') as offsets_fh, open(output_path, 'r+b') as data_fh:
+        offsets_fh.write(MAGIC)
+        offsets_fh.write(np.array([count], dtype=OFFSET_DTYPE).tobytes())
+        data_fh.seek(data_start)
+
+        position = 0
+        pending = [0]
+        for word in _iter_source_words(source_path):
+            data_fh.write(word)
+            position += len(word)
+            pending.append(position)
+            if len(pending) >= BUILD_CHUNK_SIZE:
+                offsets_fh.write(np.array(pending, dtype=OFFSET_DTYPE).tobytes())
+                pending = []
+        offsets_fh.write(np.array(pending, dtype=OFFSET_DTYPE).tobytes())
+
+    logging.info(f"Packed {count} words into {output_path}")
+    return count
+
+
+class MappedVocabulary:
+    """A read-only, memory-mapped packed vocabulary.
+
+    Supports len(), indexing and take(indices), which is all the random word
+    generators need, without loading the word data into memory.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Path to a file produced by build_vocabulary()
+        """
+        self.path = path
+        self._mmap = None
+        self._offsets = None
+        self._fh = open(path, 'rb')
+        try:
+            self._map()
+        except BaseException:
+            self.close()
+            raise
+
+    def _map(self):
+        """Map the file and validate its header against the file size."""
+        path = self.path
+        try:
+            self._mmap = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError(f"{path} is not a packed vocabulary")
+
+        size = len(self._mmap)
+        if size < HEADER_SIZE or self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a packed vocabulary")
+
+        self._count = int.from_bytes(self._mmap[len(MAGIC):HEADER_SIZE], 'little')
+        if self._count == 0:
+            raise ValueError(f"{path} contains no words")
+        self._data_start = HEADER_SIZE + OFFSET_DTYPE.itemsize * (self._count + 1)
+        if size < self._data_start:
+            raise ValueError(f"{path} is truncated: its header declares {self._count} words "
+                             f"but the file is only {size} bytes")
+
+        self._offsets = np.frombuffer(self._mmap, dtype=OFFSET_DTYPE,
+                                      count=self._count + 1, offset=HEADER_SIZE)
+        if int(self._offsets[-1]) > size - self._data_start:
+            raise ValueError(f"{path} is truncated: its word data ends before the last offset")
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("vocabulary index out of range")
+        start = self._data_start + int(self._offsets[index])
+        end = self._data_start + int(self._offsets[index + 1])
+        return self._mmap[start:end].decode('utf-8')
+
+    def take(self, indices):
+        """Return the words at the given indices.
+
+        Args:
+            indices: Sequence or NumPy array of word indices
+
+        Returns:
+            NumPy object array of words
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        starts = (self._offsets[indices] + self._data_start).tolist()
+        ends = (self._offsets[indices + 1] + self._data_start).tolist()
+        data = self._mmap
+        words = np.empty(len(starts), dtype=object)
+        words[:] = [data[start:end].decode('utf-8') for start, end in zip(starts, ends)]
+        return words
+
+    def close(self):
+        """Release the memory map and file handle."""
+        self._offsets = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def main(argv=None):
+    """Build a packed vocabulary from the command line."""
+    parser = argparse.ArgumentParser(description="Pack a word list for memory-mapped sampling.")
+    parser.add_argument('source', help="text file with one word per line")
+    parser.add_argument('output', help="packed vocabulary file to write")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s',
+                        handlers=[logging.StreamHandler(sys.stdout)])
+    count = build_vocabulary(args.source, args.output)
+    print(f"Packed {count} words into {args.output}")
+
+
+if __name__ == "__main__":
+    main()